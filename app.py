@@ -1,362 +1,703 @@
-import sys, time, random, threading
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+import sys, time, random, bisect, argparse, threading, importlib.util
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Iterable
+
+# Açılış raporu bu ana göre ölçülür (Qt ve proje modüllerinin yüklenmesi dahil)
+_BASLANGIC = time.perf_counter()
 
 # Qt
-from PySide6.QtCore import Qt, QTimer, QThread, Signal
-from PySide6.QtGui import QFont
+from PySide6.QtCore import (
+    Qt, QTimer, QObject, Signal, QAbstractTableModel, QAbstractListModel, QSortFilterProxyModel,
+    QModelIndex, QEvent, QRectF,
+)
+from PySide6.QtGui import QFont, QColor, QPainter
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel,
     QPushButton, QTableWidget, QTableWidgetItem, QSplitter,
-    QListWidget, QProgressBar, QMessageBox, QTabWidget,
+    QListView, QProgressBar, QMessageBox, QTabWidget,
     QSpinBox, QHBoxLayout, QHeaderView, QLineEdit, QFormLayout,
-    QGroupBox, QComboBox
+    QGroupBox, QComboBox, QTableView, QStyledItemDelegate, QAbstractItemView, QStyle,
+    QFileDialog, QCompleter
 )
 
-import pymysql
-
-# ---- (Opsiyonel) Matplotlib embed: stok grafiği için
-try:
-    from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-    from matplotlib.figure import Figure
-    MATPLOTLIB_OK = True
-except Exception:
-    MATPLOTLIB_OK = False
-
-
-# ===================== DB yardımcıları =====================
-def baglanti_ac():
-    return pymysql.connect(
-        host="localhost",
-        user="root",
-        password="gulsuf201",
-        database="yeni_proje",
-        charset="utf8mb4",
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=True,
-    )
-
-def musteri_listesi():
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.execute("""
-            SELECT CustomerID, CustomerName, CustomerType, Budget, TotalSpent
-            FROM Customers ORDER BY CustomerID
-        """)
-        return cur.fetchall()
-
-def musteri_getir(mid: int):
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.execute("""
-            SELECT CustomerID, CustomerName, CustomerType, Budget, TotalSpent
-            FROM Customers WHERE CustomerID=%s
-        """, (mid,))
-        return cur.fetchone()
-
-def urunleri_getir() -> List[Dict]:
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.execute("SELECT ProductID, ProductName, Stock, Price, Category FROM Products ORDER BY ProductID")
-        return cur.fetchall()
-
-
-def urun_bilgi_adla(urun_ad: str) -> Optional[Dict]:
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.execute("""
-            SELECT ProductID, ProductName, Stock, Price
-            FROM Products WHERE ProductName=%s
-        """, (urun_ad,))
-        return cur.fetchone()
-
-def urun_bilgi_idyle(pid: int) -> Optional[Dict]:
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.execute("""
-            SELECT ProductID, ProductName, Stock, Price
-            FROM Products WHERE ProductID=%s
-        """, (pid,))
-        return cur.fetchone()
-
-def urun_ekle(product_name: str, stock: int, price: float, category: str):
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.execute("""
-            INSERT INTO Products (ProductName, Stock, Price, Category)
-            VALUES (%s, %s, %s, %s)
-        """, (product_name, stock, price, category))
-
-
-def urun_stok_guncelle(product_id: int, new_stock: int):
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.execute("UPDATE Products SET Stock=%s WHERE ProductID=%s", (new_stock, product_id))
-
-def urun_sil(product_id: int):
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        # Order bağımlılığı varsa RESTRICT olabilir; hata yakalayalım
-        cur.execute("DELETE FROM Products WHERE ProductID=%s", (product_id,))
-
-def siparis_olustur_processing(musteri_id: int, urun_id: int, adet: int) -> int:
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.callproc("sp_siparis_ver", (musteri_id, urun_id, adet))
-        cur.execute("""
-            SELECT OrderID FROM Orders
-             WHERE CustomerID=%s ORDER BY OrderID DESC LIMIT 1
-        """, (musteri_id,))
-        r = cur.fetchone()
-        return int(r["OrderID"]) if r else -1
-
-def siparisi_tamamla(order_id: int):
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.callproc("sp_siparis_tamamla", (order_id,))
-
-def oncelik_view_al() -> List[Dict]:
-    """vw_siparis_oncelik'ten bekleme/öncelik bilgisini alır."""
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.execute("""
-            SELECT CustomerID, CustomerName, CustomerType,
-                   BeklemeSuresiSn, OncelikSkoru
-            FROM vw_siparis_oncelik
-        """)
-        return cur.fetchall()
+from veritabani import (
+    KATALOG, MUSTERILER, musteri_listesi, musteri_getir, urun_bilgi_adla, urun_ara,
+    urun_bilgi_idyle, urun_ekle, urun_stok_guncelle, urun_sil,
+    ensure_initial_customers, kaynaklari_kapat, depo_sec, musteri_paneli, dusuk_stoklu_urunler,
+)
+from veritabani import LOG_YAZICI, aktif_depo
+from siparis_motoru import SiparisTalebi, SiparisMotoru
+from depo import SiparisHatasi
+from metrikler import METRIKLER
+from toplu_aktarim import urunleri_ice_aktar, urunleri_disa_aktar
+
+# ---- (Opsiyonel) Matplotlib embed: stok grafiği için.
+# Açılışta yalnızca kurulu olup olmadığına bakılır; modül grafik sekmesi ilk açıldığında yüklenir.
+MATPLOTLIB_OK = importlib.util.find_spec("matplotlib") is not None
+
 
-def log_yaz(log_type: str, customer_id: Optional[int], customer_type: Optional[str],
-            product_name: Optional[str], qty: Optional[int], result_text: str,
-            order_id: Optional[int] = None):
+class BaslangicRaporu:
     """
-    Logs tablosu (varsa) için bir yardımcı.
-    Schema: LogType, CustomerID, CustomerType, ProductName, Qty, ResultText, OrderID, LogDate (DEFAULT).
+    Açılış aşamalarının süreç başlangıcından itibaren geçen süresi. Beklenen
+    aşamaların hepsi işaretlenince bitince(ozet) bir kez çağrılır.
     """
-    try:
-        with baglanti_ac() as bag, bag.cursor() as cur:
-            cur.execute("""
-                INSERT INTO Logs (LogType, CustomerID, CustomerType, ProductName, Qty, ResultText, OrderID)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (log_type, customer_id, customer_type, product_name, qty, result_text, order_id))
-    except Exception:
-        # Logs tablosu yoksa projeyi kırmamak için yutuyoruz.
-        pass
-
-def ensure_initial_customers():
+
+    def __init__(self, beklenen: Iterable[str], bitince=None):
+        self._sureler: Dict[str, float] = {}      # aşama → ms
+        self._beklenen = set(beklenen)
+        self._bitince = bitince
+
+    def isaretle(self, asama: str):
+        if asama in self._sureler:
+            return
+        gecen = time.perf_counter() - _BASLANGIC
+        self._sureler[asama] = gecen * 1000.0
+        METRIKLER.sure_ekle(f"baslangic_{asama}", gecen)
+        self._beklenen.discard(asama)
+        if not self._beklenen and self._bitince is not None:
+            bitince, self._bitince = self._bitince, None
+            bitince(self.ozet())
+
+    def ozet(self) -> str:
+        return ", ".join(f"{a} {ms:.0f} ms" for a, ms in sorted(self._sureler.items(), key=lambda x: x[1]))
+
+
+class SiparisIslemeMerkezi(QObject):
     """
-    Veritabanında yeterli müşteri yoksa tek seferlik başlangıç verisi ekler.
-    Koşul: Başlangıçta atanan Premium müşterilerin TotalSpent (ToplamHarcama) >= 2000 olmalı.
+    SiparisMotoru olaylarını Qt sinyallerine çeviren köprü; AnaPencere motorun
+    abonelerinden yalnızca biridir. Sinyaller işçi thread'lerinden yayınlanır,
+    Qt bunları GUI thread'ine kuyruklu bağlantıyla taşır.
     """
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        cur.execute("SELECT COUNT(*) AS c FROM Customers")
-        sayi = cur.fetchone()["c"]
+    log = Signal(str, str)
+    kuyruk_farki = Signal(dict)       # {"eklenen": [...], "silinen": [...], "guncel": [...]}
+    islem_sonucu = Signal(str, dict)  
+    is_processing = Signal(bool)     
 
-    
-    if sayi >= 5:
-        return
-
-    import random
-    hedef_adet = random.randint(5, 10)
-    musteri_adlari = [f"Müşteri {chr(65+i)}" for i in range(hedef_adet)]
-    eklenen_idler = []
-
-
-    with baglanti_ac() as bag, bag.cursor() as cur:
-        for ad in musteri_adlari:
-            butce = random.randint(500, 3000)              
-            cur.execute(
-                """
-                INSERT INTO Customers(CustomerName, Budget, CustomerType, TotalSpent)
-                VALUES (%s, %s, 'Standard', 0.00)
-                """,
-                (ad, butce)
-            )
-            eklenen_idler.append(cur.lastrowid)
+    def __init__(self, motor: Optional[SiparisMotoru] = None, parent=None):
+        super().__init__(parent)
+        self.motor = motor or SiparisMotoru()
+        self.motor.abone_ol("log", self.log.emit)
+        self.motor.abone_ol("kuyruk_farki", self.kuyruk_farki.emit)
+        self.motor.abone_ol("islem_sonucu", self.islem_sonucu.emit)
+        self.motor.abone_ol("isleniyor", self.is_processing.emit)
 
-    
-    premium_adet = min(2, len(eklenen_idler))
-    premium_idler = random.sample(eklenen_idler, k=premium_adet)
-
-    for cid in premium_idler:
-        toplam_harcama = random.randint(2000, 5000)       
-        with baglanti_ac() as bag, bag.cursor() as cur:
-            cur.execute(
-                """
-                UPDATE Customers
-                   SET CustomerType = 'Premium',
-                       TotalSpent   = %s
-                 WHERE CustomerID   = %s
-                """,
-                (toplam_harcama, cid)
-            )
+    def start(self):
+        self.motor.baslat()
 
+    def durdur(self):
+        self.motor.durdur()
 
+    def wait(self):
+        self.motor.bekle()
 
+    def kuyruga_ekle(self, t: SiparisTalebi):
+        self.motor.kuyruga_ekle(t)
 
-@dataclass
-class SiparisTalebi:
-    musteri_id: int; musteri_ad: str; musteri_tip: str
-    urun_id: int; urun_ad: str; adet: int; fiyat: float
-    kuyruga_giris: float = field(default_factory=lambda: time.time())
-    isleme_baslangic: Optional[float] = None  
-    
-    @property
-    def temel(self) -> int:
-        return 20 if self.musteri_tip == "Premium" else 10
+    def urun_kilidi(self, urun_id: int):
+        return self.motor.urun_kilidi(urun_id)
 
-    def skor(self) -> float:
-        bekleme = max(0.0, time.time() - self.kuyruga_giris)
-        return self.temel + 0.5 * bekleme
 
 
 
-class SiparisIslemeMerkezi(QThread):
-    log = Signal(str, str)
-    kuyruk_snapshot = Signal(list)
-    islem_sonucu = Signal(str, dict)  
-    is_processing = Signal(bool)     
+class VeriYukleyici(QObject):
+    """
+    Veritabanı okumalarını GUI thread'i dışında, küçük bir thread havuzunda
+    çalıştırır; sonuç geri çağrısı sinyal üzerinden GUI thread'inde çağrılır.
+
+    Aynı anahtarlı istekler birleştirilir: bir anahtarın sorgusu sürerken gelen
+    istekler tek bir "yeniden çalıştır" işaretine dönüşür ve mevcut sorgu bitince
+    en son istenen iş bir kez daha çalışır. iste() yalnızca GUI thread'inden çağrılır.
+    Sorgu hata verirse hata_bildir'e ek olarak isteğin hata geri çağrısı çalışır;
+    istek sahibi "bekleniyor" durumunu buradan temizler.
+    """
+    _tamamlandi = Signal(str, object, object)   # anahtar, sonuç, hata
 
-    def __init__(self, timeout_s=15, parent=None):
+    def __init__(self, isci_sayisi: int = 3, parent=None):
         super().__init__(parent)
-        self._lock = threading.Lock()
-        self._kuyruk: List[SiparisTalebi] = []
-        self._run = True
-        self.timeout_s = timeout_s
-        self._admin_lock = threading.RLock()
+        self._havuz = ThreadPoolExecutor(max_workers=isci_sayisi, thread_name_prefix="veri")
+        self._suren: Dict[str, tuple] = {}          # anahtar → (iş, geri çağrı, hata çağrısı) çalışan
+        self._bekleyen: Dict[str, tuple] = {}       # anahtar → en son istenen (iş, geri çağrı, hata çağrısı)
+        self._kapandi = False
+        self.hata_bildir = None                      # fn(anahtar, mesaj)
+        self._tamamlandi.connect(self._bitti)
+
+    def iste(self, anahtar: str, is_, geri_cagri=None, hata_cagri=None):
+        if self._kapandi:
+            return
+        if anahtar in self._suren:
+            self._bekleyen[anahtar] = (is_, geri_cagri, hata_cagri)
+            METRIKLER.say("yukleyici_birlesen")
+            return
+        self._gonder(anahtar, is_, geri_cagri, hata_cagri)
 
-    def kuyruga_ekle(self, t: SiparisTalebi):
-        with self._lock:
-            self._kuyruk.append(t)
-        self.log.emit("Bilgi", f"Kuyruğa eklendi → {t.musteri_ad}/{t.urun_ad} x{t.adet}")
-        log_yaz("Bilgi", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Kuyruğa eklendi")
-        self._emit_snapshot()
+    def _gonder(self, anahtar: str, is_, geri_cagri, hata_cagri):
+        self._suren[anahtar] = (is_, geri_cagri, hata_cagri)
 
-    def durdur(self):
-        self._run = False
+        def calis():
+            try:
+                with METRIKLER.olc(f"yukle_{anahtar}"):
+                    sonuc = is_()
+            except Exception as e:
+                self._tamamlandi.emit(anahtar, None, e)
+            else:
+                self._tamamlandi.emit(anahtar, sonuc, None)
 
-    def _sec(self) -> Optional[SiparisTalebi]:
-        if not self._kuyruk:
-            return None
-        self._kuyruk.sort(key=lambda x: x.skor(), reverse=True)
-        return self._kuyruk.pop(0)
-
-    def _emit_snapshot(self):
-        with self._lock:
-            snap = [{
-                "musteri": t.musteri_ad, "tip": t.musteri_tip,
-                "urun": t.urun_ad, "adet": t.adet,
-                "bekleme": int(time.time() - t.kuyruga_giris),
-                "skor": round(t.skor(), 1)
-            } for t in sorted(self._kuyruk, key=lambda x: x.skor(), reverse=True)]
-        self.kuyruk_snapshot.emit(snap)
-
-    def run(self):
-        while self._run:
-            t = None
-            with self._lock:
-                if self._kuyruk:
-                    t = self._sec()
-            if not t:
-                self.msleep(200)
-                continue
-
-            
-            t.isleme_baslangic = time.time()
-            self.is_processing.emit(True)
-            self.log.emit("Bilgi", f"İşleniyor: {t.musteri_ad} → {t.urun_ad} x{t.adet}")
-            log_yaz("Bilgi", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "İşleme alındı")
+        self._havuz.submit(calis)
 
-           
-            self.msleep(2000)
+    def _bitti(self, anahtar: str, sonuc, hata):
+        _, geri_cagri, hata_cagri = self._suren.pop(anahtar, (None, None, None))
+        if self._kapandi:
+            return
+        sonraki = self._bekleyen.pop(anahtar, None)
+        if sonraki is not None:
+            # Sorgu sürerken veri değişmiş olabilir: bu sonuç bayat, yalnızca yeniden çalıştır
+            self._gonder(anahtar, *sonraki)
+            return
+        if hata is not None:
+            if self.hata_bildir:
+                self.hata_bildir(anahtar, str(hata))
+            if hata_cagri is not None:
+                hata_cagri(hata)
+            return
+        if geri_cagri is not None:
+            geri_cagri(sonuc)
 
-           
-            if (time.time() - (t.isleme_baslangic or t.kuyruga_giris)) >= self.timeout_s:
-                msg = f"Zaman aşımı: {t.musteri_ad} / {t.urun_ad}"
-                self.log.emit("Hata", msg)
-                log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Zaman aşımı")
-                self.islem_sonucu.emit("timeout", {"mesaj": msg})
-                self._emit_snapshot()
-                self.is_processing.emit(False)
-                continue
-
-            
-            try:
-                with self._admin_lock:
-                    oid = siparis_olustur_processing(t.musteri_id, t.urun_id, t.adet)
-                    siparisi_tamamla(oid)
-
-                ok_msg = f"Tamamlandı: {t.musteri_ad} → {t.urun_ad} x{t.adet}"
-                self.log.emit("Bilgi", ok_msg)
-                log_yaz("Bilgi", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, ok_msg, order_id=oid)
-                self.islem_sonucu.emit("basari", {"mesaj": ok_msg})
-
-               
-                mus = musteri_getir(t.musteri_id)
-                if mus and float(mus["TotalSpent"]) >= 2000 and mus["CustomerType"] != "Premium":
-                    with baglanti_ac() as bag, bag.cursor() as cur:
-                        cur.execute("""
-                            UPDATE Customers
-                            SET CustomerType='Premium'
-                            WHERE CustomerID=%s
-                        """, (t.musteri_id,))
-                    self.log.emit("Bilgi", f"{mus['CustomerName']} artık Premium müşteri oldu! 🎉")
-                    log_yaz("Bilgi", t.musteri_id, mus["CustomerType"], None, None, "Premium'a yükseltildi")
+    def kapat(self):
+        self._kapandi = True
+        self._bekleyen.clear()
+        self._havuz.shutdown(wait=True, cancel_futures=True)
+
+
+class TopluAktarimIsci(QObject):
+    """
+    CSV içe / dışa aktarmayı arka plan thread'inde çalıştırır; ilerleme ve
+    sonuç sinyallerle GUI thread'ine taşınır (arayüz donmaz).
+    """
+    ilerleme = Signal(int, int)      # yüzde, işlenen satır
+    bitti = Signal(str, dict)        # "ice" | "disa", rapor
+    hata = Signal(str, str)          # "ice" | "disa", mesaj
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread: Optional[threading.Thread] = None
+
+    def calisiyor(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
 
+    def ice_aktar(self, yol: str):
+        self._baslat("ice", lambda: urunleri_ice_aktar(yol, ilerleme=self._ilerle))
+
+    def disa_aktar(self, yol: str):
+        self._baslat("disa", lambda: {"yazilan": urunleri_disa_aktar(yol, ilerleme=self._ilerle)})
+
+    def _ilerle(self, oran: float, islenen: int):
+        self.ilerleme.emit(int(oran * 100), islenen)
+
+    def _baslat(self, yon: str, is_):
+        def calis():
+            try:
+                self.bitti.emit(yon, is_())
             except Exception as e:
-                err = str(e)
-                self.log.emit("Hata", err)
-                if "stock" in err.lower() or "stok" in err.lower():
-                    log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Yetersiz stok")
-                elif "balance" in err.lower() or "bakiye" in err.lower() or "budget" in err.lower():
-                    log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Yetersiz bakiye")
-                else:
-                    log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Veritabanı hatası: " + err)
-                self.islem_sonucu.emit("hata", {"mesaj": err})
+                self.hata.emit(yon, str(e))
+        self._thread = threading.Thread(target=calis, name=f"toplu-{yon}", daemon=True)
+        self._thread.start()
+
+
+class UrunTabloModeli(QAbstractTableModel):
+    """
+    Ürünler sekmesindeki tablo modeli. Satırlar katalogdan gelir; stok
+    değişiminde yalnızca ilgili satır için dataChanged yayınlanır.
+    """
+    BASLIKLAR = ["Ad", "Stok", "Fiyat", "Stok Durumu", "Adet", "Sipariş"]
+    SUTUN_DURUM, SUTUN_ADET, SUTUN_SIPARIS = 3, 4, 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._satirlar: List[Dict] = []
+        self._satir_no: Dict[int, int] = {}     # ProductID → satır
+        self._adetler: Dict[int, int] = {}      # ProductID → seçili adet
+
+    def yukle(self, urunler: List[Dict]):
+        self.beginResetModel()
+        self._satirlar = urunler
+        self._satir_no = {int(u["ProductID"]): i for i, u in enumerate(urunler)}
+        self.endResetModel()
+
+    def stok_guncelle(self, pid: int, stok: int) -> bool:
+        i = self._satir_no.get(int(pid))
+        if i is None:
+            return False
+        if self._satirlar[i]["Stock"] != stok:
+            self._satirlar[i]["Stock"] = stok
+            self.dataChanged.emit(self.index(i, 1), self.index(i, self.SUTUN_DURUM))
+        return True
+
+    def urun(self, satir: int) -> Dict:
+        return self._satirlar[satir]
+
+    def adet(self, satir: int) -> int:
+        return self._adetler.get(int(self._satirlar[satir]["ProductID"]), 1)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._satirlar)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.BASLIKLAR)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.BASLIKLAR[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        u = self._satirlar[index.row()]
+        c = index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if c == 0:
+                return u["ProductName"]
+            if c == 1:
+                return str(u["Stock"])
+            if c == 2:
+                return str(u["Price"])
+            if c == self.SUTUN_DURUM:
+                return int(u["Stock"])
+            if c == self.SUTUN_ADET:
+                return self.adet(index.row())
+            if c == self.SUTUN_SIPARIS:
+                return "Sipariş Ver"
+        if role == Qt.TextAlignmentRole and c == self.SUTUN_ADET:
+            return int(Qt.AlignCenter)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role == Qt.EditRole and index.isValid() and index.column() == self.SUTUN_ADET:
+            self._adetler[int(self._satirlar[index.row()]["ProductID"])] = int(value)
+            self.dataChanged.emit(index, index)
+            return True
+        return False
+
+    def flags(self, index):
+        f = super().flags(index)
+        if index.isValid() and index.column() == self.SUTUN_ADET:
+            f |= Qt.ItemIsEditable
+        return f
+
+
+class MusteriTabloModeli(QAbstractTableModel):
+    """
+    Müşteri paneli modeli. Satırlar tek toplu sorgudan (musteri_paneli) sayfa
+    sayfa gelir: görünüm kaydırıldıkça fetchMore sonraki sayfayı ID'ye göre
+    (keyset) ister. Yenileme yalnızca verilen satır aralığını yeniden sorgular.
+    """
+    BASLIKLAR = ["ID", "Ad", "Tür", "Bütçe", "Toplam Harcama", "Bekleme(sn)", "Skor"]
+    SAYFA = 200
+
+    def __init__(self, yukleyici: VeriYukleyici, parent=None):
+        super().__init__(parent)
+        self._yukleyici = yukleyici
+        self._satirlar: List[Dict] = []
+        self._bitti = True
+        self._sayfa_bekleniyor = False
+        self._nesil = 0           # sifirla() sonrası gelen eski sayfa sonuçlarını ayıklamak için
+
+    def sifirla(self):
+        self._nesil += 1
+        nesil = self._nesil
+        self._sayfa_bekleniyor = True
+        self._yukleyici.iste("musteri_ilk_sayfa", lambda: musteri_paneli(0, self.SAYFA),
+                             lambda satirlar: self._sifirla_uygula(nesil, satirlar),
+                             lambda _: self._sayfa_hatasi(nesil))
+
+    def _sayfa_hatasi(self, nesil: int):
+        # Sorgu başarısız: bekleme işareti kalkar, sonraki yenileme / kaydırma yeniden dener
+        if nesil == self._nesil:
+            self._sayfa_bekleniyor = False
+
+    def _sifirla_uygula(self, nesil: int, satirlar: List[Dict]):
+        if nesil != self._nesil:
+            return
+        self.beginResetModel()
+        self._satirlar = satirlar
+        self._bitti = len(satirlar) < self.SAYFA
+        self._sayfa_bekleniyor = False
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._bitti and not self._sayfa_bekleniyor
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._bitti or self._sayfa_bekleniyor:
+            return
+        son_id = int(self._satirlar[-1]["CustomerID"]) if self._satirlar else 0
+        nesil = self._nesil
+        self._sayfa_bekleniyor = True
+        self._yukleyici.iste("musteri_sonraki_sayfa", lambda: musteri_paneli(son_id + 1, self.SAYFA),
+                             lambda yeni: self._sayfa_ekle(nesil, son_id, yeni),
+                             lambda _: self._sayfa_hatasi(nesil))
+
+    def _sayfa_ekle(self, nesil: int, son_id: int, yeni: List[Dict]):
+        if nesil != self._nesil:
+            return
+        self._sayfa_bekleniyor = False
+        if self._satirlar and int(self._satirlar[-1]["CustomerID"]) != son_id:
+            return
+        self._bitti = len(yeni) < self.SAYFA
+        if yeni:
+            n = len(self._satirlar)
+            self.beginInsertRows(QModelIndex(), n, n + len(yeni) - 1)
+            self._satirlar.extend(yeni)
+            self.endInsertRows()
+
+    def aralik_yenile(self, ilk: int, son: int):
+        """[ilk, son] satırlarını tek sorguyla (arka planda) tazeler."""
+        if not self._satirlar:
+            if not self._sayfa_bekleniyor:
+                self.sifirla()
+            return
+        ilk = max(0, ilk)
+        son = min(son, len(self._satirlar) - 1)
+        if son < ilk:
+            return
+        ilk_id = int(self._satirlar[ilk]["CustomerID"])
+        self._yukleyici.iste("musteri_aralik", lambda: musteri_paneli(ilk_id, son - ilk + 1),
+                             self._aralik_uygula)
+
+    def _aralik_uygula(self, satirlar: List[Dict]):
+        taze = {int(r["CustomerID"]): r for r in satirlar}
+        degisen = [i for i, m in enumerate(self._satirlar) if int(m["CustomerID"]) in taze]
+        if not degisen:
+            return
+        for i in degisen:
+            self._satirlar[i] = taze[int(self._satirlar[i]["CustomerID"])]
+        # ID sıralı keyset penceresi: güncellenen satırlar bitişiktir
+        self.dataChanged.emit(self.index(degisen[0], 0), self.index(degisen[-1], len(self.BASLIKLAR) - 1))
+
+    def musteri(self, satir: int) -> Dict:
+        return self._satirlar[satir]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._satirlar)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.BASLIKLAR)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.BASLIKLAR[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        m = self._satirlar[index.row()]
+        c = index.column()
+        if c == 0:
+            return str(m["CustomerID"])
+        if c == 1:
+            return m["CustomerName"]
+        if c == 2:
+            return m["CustomerType"]
+        if c == 3:
+            return str(m["Budget"])
+        if c == 4:
+            return str(m["TotalSpent"])
+        if c == 5:
+            return str(int(m["BeklemeSuresiSn"] or 0))
+        return str(round(float(m["OncelikSkoru"] or 0.0), 1))
+
+
+class UrunAramaModeli(QAbstractListModel):
+    """
+    Admin ürün seçicilerinin ortak modeli. Tüm katalog yerine yalnızca son
+    aramanın eşleşmeleri (en fazla LIMIT ürün) tutulur; arama yükleyicide,
+    katalog önbelleğinin sıralı ad indeksi üzerinde yapılır.
+    """
+    LIMIT = 50
+
+    def __init__(self, yukleyici: VeriYukleyici, parent=None):
+        super().__init__(parent)
+        self._yukleyici = yukleyici
+        self._satirlar: List[Dict] = []
+        self._son_onek = ""
+
+    @staticmethod
+    def metin(u: Dict) -> str:
+        return f"{u['ProductID']} - {u['ProductName']} (Stok: {u['Stock']})"
+
+    def ara(self, onek: str):
+        self._son_onek = onek
+        self._yukleyici.iste("urun_ara", lambda: urun_ara(onek, self.LIMIT), self._uygula)
+
+    def yenile(self):
+        """Son aramayı tekrarlar (ekleme / silme / toplu aktarım sonrası)."""
+        self.ara(self._son_onek)
+
+    def _uygula(self, satirlar: List[Dict]):
+        self.beginResetModel()
+        self._satirlar = satirlar
+        self.endResetModel()
+
+    def stok_guncelle(self, pid: int, stok: int):
+        for i, u in enumerate(self._satirlar):
+            if int(u["ProductID"]) == pid:
+                u["Stock"] = stok
+                ix = self.index(i)
+                self.dataChanged.emit(ix, ix, [Qt.DisplayRole])
+                return
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._satirlar)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        u = self._satirlar[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.metin(u)
+        if role == Qt.UserRole:
+            return u["ProductID"]
+        return None
+
+
+class UrunSecici(QLineEdit):
+    """
+    Yazdıkça ürün öneren seçici. Öneriler paylaşılan UrunAramaModeli'nden
+    gelir (yazım 150 ms durunca aranır); seçilen ürün secili_id() ile okunur.
+    """
+
+    def __init__(self, model: UrunAramaModeli, parent=None):
+        super().__init__(parent)
+        self._model = model
+        self.setPlaceholderText("Ürün adı ya da ID yazın…")
+        tamamlayici = QCompleter(model, self)
+        # Süzme modelde yapıldı: tamamlayıcı satırları olduğu gibi gösterir
+        tamamlayici.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setCompleter(tamamlayici)
+        self._arama_timer = QTimer(self)
+        self._arama_timer.setSingleShot(True)
+        self._arama_timer.setInterval(150)
+        self._arama_timer.timeout.connect(lambda: self._model.ara(self.text()))
+        self.textEdited.connect(lambda _: self._arama_timer.start())
+        model.modelReset.connect(self._onerileri_goster)
+
+    def _onerileri_goster(self):
+        # Sonuçlar eşzamansız gelir: odak bu seçicideyse açılır listeyi tazele
+        if self.hasFocus() and self.text() and self._model.rowCount():
+            self.completer().complete()
+
+    def secili_id(self) -> Optional[int]:
+        """Seçilen (ya da doğrudan yazılan) ürün ID'si; yoksa None."""
+        bas = self.text().split(" - ", 1)[0].strip()
+        return int(bas) if bas.isdigit() else None
+
+
+class LogListeModeli(QAbstractListModel):
+    """
+    Log paneli için sabit kapasiteli halka tampon. ekle() satırı bekletir;
+    aynı olay döngüsü turunda gelen satırlar tek seferde eklenir, kapasite
+    aşılırsa en eski satırlar tek bir removeRows ile düşürülür.
+    """
+    TIP_ROLU = Qt.UserRole + 1
+
+    def __init__(self, kapasite: int = 5000, parent=None):
+        super().__init__(parent)
+        self.kapasite = kapasite
+        self._satirlar: deque = deque()          # (tip, mesaj)
+        self._bekleyen: List[tuple] = []
+        self._bosaltma_planli = False
+
+    def ekle(self, tip: str, mesaj: str):
+        self._bekleyen.append((tip, mesaj))
+        if not self._bosaltma_planli:
+            self._bosaltma_planli = True
+            QTimer.singleShot(0, self._bosalt)
+
+    def _bosalt(self):
+        self._bosaltma_planli = False
+        yeni, self._bekleyen = self._bekleyen[-self.kapasite:], []
+        if not yeni:
+            return
+        tasma = len(self._satirlar) + len(yeni) - self.kapasite
+        if tasma > 0:
+            self.beginRemoveRows(QModelIndex(), 0, tasma - 1)
+            for _ in range(tasma):
+                self._satirlar.popleft()
+            self.endRemoveRows()
+        n = len(self._satirlar)
+        self.beginInsertRows(QModelIndex(), n, n + len(yeni) - 1)
+        self._satirlar.extend(yeni)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._satirlar)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        tip, mesaj = self._satirlar[index.row()]
+        if role == Qt.DisplayRole:
+            return f"({tip}) {mesaj}"
+        if role == self.TIP_ROLU:
+            return tip
+        if role == Qt.ForegroundRole and tip == "Hata":
+            return QColor("#c0392b")
+        return None
+
 
-            self._emit_snapshot()
-            
-            self.is_processing.emit(False)
+class LogFiltreModeli(QSortFilterProxyModel):
+    """Seviye (tip) ve metin aramasını doğrudan tampondaki satırlara uygular."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._seviye: Optional[str] = None
+        self._aranan = ""
+
+    def seviye_ayarla(self, seviye: Optional[str]):
+        self._seviye = seviye or None
+        self.invalidateFilter()
+
+    def arama_ayarla(self, metin: str):
+        self._aranan = metin.casefold()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, satir, parent):
+        if self._seviye is None and not self._aranan:
+            return True
+        idx = self.sourceModel().index(satir, 0, parent)
+        if self._seviye is not None and idx.data(LogListeModeli.TIP_ROLU) != self._seviye:
+            return False
+        return not self._aranan or self._aranan in idx.data(Qt.DisplayRole).casefold()
+
+
+class StokCubuguDelegate(QStyledItemDelegate):
+    """Stok Durumu sütununu widget oluşturmadan renkli çubuk olarak çizer."""
+
+    def paint(self, painter, option, index):
+        stok = int(index.data() or 0)
+        yuzde = min(100, max(0, stok))  # basit ölçek
+        if stok < 15:
+            renk = QColor("red")
+        elif stok < 50:
+            renk = QColor("yellow")
+        else:
+            renk = QColor("green")
+        r = option.rect.adjusted(4, 6, -4, -6)
+        painter.save()
+        painter.setPen(QColor("#bbbbbb"))
+        painter.setBrush(QColor("#f0f0f0"))
+        painter.drawRect(r)
+        dolu = r.adjusted(1, 1, 0, 0)
+        dolu.setWidth(int((r.width() - 1) * yuzde / 100))
+        painter.fillRect(dolu, renk)
+        painter.restore()
+
+
+class AdetDelegate(QStyledItemDelegate):
+    def createEditor(self, parent, option, index):
+        spn = QSpinBox(parent)
+        spn.setRange(1, 5)
+        spn.setFrame(False)
+        return spn
+
+    def setEditorData(self, editor, index):
+        editor.setValue(int(index.data(Qt.EditRole) or 1))
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.EditRole)
+
+
+class SiparisButonuDelegate(QStyledItemDelegate):
+    """Sipariş sütununu buton gibi çizer; tıklanınca satırı bildirir."""
+    tiklandi = Signal(int)
+
+    def paint(self, painter, option, index):
+        r = QRectF(option.rect.adjusted(6, 3, -6, -3))
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        ustunde = bool(option.state & QStyle.State_MouseOver)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#ff9336" if ustunde else "#ff7d14"))
+        painter.drawRoundedRect(r, 6, 6)
+        painter.setPen(QColor("white"))
+        painter.drawText(r, Qt.AlignCenter, index.data())
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and option.rect.contains(event.position().toPoint()):
+            self.tiklandi.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
 
 
 
 
 class AnaPencere(QMainWindow):
-    def __init__(self):
+    DUSUK_STOK_N = 10          # stok grafiğindeki ürün sayısı
+    YENIDEN_DENEME_MS = 3000   # başarısız açılış yüklemesinin yeniden deneme aralığı
+    VERI_YUKLENIYOR = "Müşteri ve ürün verileri henüz yükleniyor; birazdan tekrar deneyin."
+
+    def __init__(self, motor: Optional[SiparisMotoru] = None, baslangic_raporu_yazdir: bool = False):
         super().__init__()
+        self.baslangic_raporu_yazdir = baslangic_raporu_yazdir
+        self.baslangic = BaslangicRaporu(("pencere", "musteriler", "katalog", "musteri_paneli", "admin"),
+                                         self._baslangic_bitti)
         self.setWindowTitle("Sipariş & Stok Yönetim Sistemi")
         self.resize(1500, 900)
 
-        self.worker = SiparisIslemeMerkezi()
+        self.worker = SiparisIslemeMerkezi(motor)
         self.worker.log.connect(self._log)
-        self.worker.kuyruk_snapshot.connect(self._prio_guncelle)
+        self.worker.kuyruk_farki.connect(self._prio_guncelle)
         self.worker.islem_sonucu.connect(self._islem_sonucu_ele_al)
         self.worker.is_processing.connect(self._processing_anim_toggle)
         self.worker.start()
 
      
-        self.aktif_musteri = musteri_getir(1)
+        # Tüm okuma sorguları bu havuzda çalışır; GUI thread'i yalnızca sonucu uygular
+        self.yukleyici = VeriYukleyici(parent=self)
+        self.yukleyici.hata_bildir = lambda anahtar, mesaj: self._log("Hata", f"Yükleme hatası ({anahtar}): {mesaj}")
+
+        # Aktif müşteri yalnızca ID olarak tutulur; değerler her seferinde
+        # müşteri önbelleğinden okunur (siparişlerle güncel kalır).
+        self.aktif_musteri_id: Optional[int] = 1
         self.aktif_kategori: Optional[str] = None
 
         bolucu = QSplitter(Qt.Horizontal)
         self.setCentralWidget(bolucu)
 
-        orta = QTabWidget()
+        orta = self.orta = QTabWidget()
 
       
         wid_urun = QWidget(); lay = QVBoxLayout(wid_urun)
 
         
-        kat_lay = QHBoxLayout()
-        self.kategori_urunleri = self._kategori_listesi()
-        for kategori in self.kategori_urunleri.keys():
-            btn = QPushButton(kategori)
-            btn.setStyleSheet(
-                "QPushButton {background:#e67e22; color:white; font-weight:bold; padding:6px; border-radius:6px;}"
-                "QPushButton:hover { background:#ff9336; }"
-            )
-            btn.clicked.connect(lambda _, kat=kategori: self._urunleri_kategoriden_yukle(kat))
-            kat_lay.addWidget(btn)
-        kat_lay.addStretch()
-        lay.addLayout(kat_lay)
-
-        self.tbl_urun = QTableWidget(0, 5)
-        self.tbl_urun.setHorizontalHeaderLabels(["Ad", "Stok", "Fiyat", "Stok Durumu", "Sipariş"])
+        # Kategori düğmeleri katalog arka planda yüklenince kurulur
+        self.kat_lay = QHBoxLayout()
+        self.kategori_urunleri: Dict[str, List[str]] = {}
+        self.kat_lay.addWidget(QLabel("Kategoriler yükleniyor…"))
+        lay.addLayout(self.kat_lay)
+
+        self.urun_modeli = UrunTabloModeli(self)
+        self.tbl_urun = QTableView()
+        self.tbl_urun.setModel(self.urun_modeli)
+        self.tbl_urun.setMouseTracking(True)
+        self.tbl_urun.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        self.tbl_urun.setItemDelegateForColumn(UrunTabloModeli.SUTUN_DURUM, StokCubuguDelegate(self.tbl_urun))
+        self.tbl_urun.setItemDelegateForColumn(UrunTabloModeli.SUTUN_ADET, AdetDelegate(self.tbl_urun))
+        self.siparis_butonu = SiparisButonuDelegate(self.tbl_urun)
+        self.siparis_butonu.tiklandi.connect(
+            lambda satir: self._siparis_ver_urun(self.urun_modeli.urun(satir), self.urun_modeli.adet(satir)))
+        self.tbl_urun.setItemDelegateForColumn(UrunTabloModeli.SUTUN_SIPARIS, self.siparis_butonu)
         header = self.tbl_urun.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(3, QHeaderView.Stretch)
-        header.setSectionResizeMode(4, QHeaderView.Stretch)
+        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(5, QHeaderView.Stretch)
         self.tbl_urun.horizontalHeader().setStretchLastSection(False)
         lay.addWidget(self.tbl_urun)
 
@@ -367,8 +708,11 @@ class AnaPencere(QMainWindow):
 
        
         wid_mus = QWidget(); lay2 = QVBoxLayout(wid_mus)
-        self.tbl_mus = QTableWidget(0, 7)
-        self.tbl_mus.setHorizontalHeaderLabels(["ID", "Ad", "Tür", "Bütçe", "Toplam Harcama", "Bekleme(sn)", "Skor"])
+        self.musteri_modeli = MusteriTabloModeli(self.yukleyici, self)
+        self.tbl_mus = QTableView()
+        self.tbl_mus.setModel(self.musteri_modeli)
+        self.tbl_mus.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tbl_mus.setSelectionMode(QAbstractItemView.SingleSelection)
         self.tbl_mus.setAlternatingRowColors(True)
         self.tbl_mus.setStyleSheet("""
             QHeaderView::section {
@@ -377,29 +721,43 @@ class AnaPencere(QMainWindow):
                 font-weight: bold;
                 padding: 6px;
             }
-            QTableWidget {
+            QTableView {
                 font-size: 13px;
                 gridline-color: #ddd;
                 alternate-background-color: #f9f9f9;
             }
         """)
         self.tbl_mus.verticalHeader().setDefaultSectionSize(30)
-        self.tbl_mus.cellClicked.connect(self._musteri_sec)
+        self.tbl_mus.clicked.connect(self._musteri_sec)
         lay2.addWidget(self.tbl_mus)
         orta.addTab(wid_mus, "🧑 Müşteri Paneli")
 
         
-        wid_graf = QWidget(); graf_lay = QVBoxLayout(wid_graf)
-        if MATPLOTLIB_OK:
-            self.fig = Figure(figsize=(5, 3))
-            self.canvas = FigureCanvas(self.fig)
-            graf_lay.addWidget(self.canvas)
-            self.btn_graf_yenile = QPushButton("Grafiği Yenile")
-            self.btn_graf_yenile.clicked.connect(self._stok_grafik_guncelle)
-            graf_lay.addWidget(self.btn_graf_yenile)
-        else:
-            graf_lay.addWidget(QLabel("Matplotlib bulunamadı. (Grafik için matplotlib kurun)"))
-        orta.addTab(wid_graf, "📊 Stok Grafiği")
+        self.wid_graf = QWidget(); self.graf_lay = QVBoxLayout(self.wid_graf)
+        # En düşük stoklu ürünler (Stock, ProductID sırasında) ve çizilmiş son hali
+        self._dusuk_stok: List[Dict] = []
+        self.fig = None                # grafik sekmesi ilk açıldığında kurulur
+        self._grafik_ax = None
+        self._grafik_cubuklar = None
+        self._grafik_son: tuple = ((), ())
+        self.lbl_graf = QLabel("Grafik sekme açıldığında yüklenir." if MATPLOTLIB_OK
+                               else "Matplotlib bulunamadı. (Grafik için matplotlib kurun)")
+        self.graf_lay.addWidget(self.lbl_graf)
+        orta.addTab(self.wid_graf, "📊 Stok Grafiği")
+
+        wid_met = QWidget(); met_lay = QVBoxLayout(wid_met)
+        self.lbl_metrik = QLabel()
+        self.lbl_metrik.setStyleSheet("padding:6px; font-weight:bold;")
+        met_lay.addWidget(self.lbl_metrik)
+        self.tbl_metrik = QTableWidget(0, 7)
+        self.tbl_metrik.setHorizontalHeaderLabels(["Aşama", "Sayı", "Ort (ms)", "p50", "p90", "p99", "Max"])
+        self.tbl_metrik.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        met_lay.addWidget(self.tbl_metrik)
+        btn_met_disa = QPushButton("Dışa Aktar (JSON)")
+        btn_met_disa.clicked.connect(self._metrikleri_disa_aktar)
+        met_lay.addWidget(btn_met_disa)
+        orta.addTab(wid_met, "📈 Metrikler")
+        self.wid_metrik = wid_met
 
      
         wid_admin = QWidget(); admin_lay = QVBoxLayout(wid_admin)
@@ -432,31 +790,55 @@ class AnaPencere(QMainWindow):
      
         gb_stok = QGroupBox("Stok Güncelle")
         form2 = QFormLayout(gb_stok)
-        self.cmb_stok_p = QComboBox()
+        self.urun_arama_modeli = UrunAramaModeli(self.yukleyici, self)
+        self.sec_stok_p = UrunSecici(self.urun_arama_modeli)
         self.inp_new_stock2 = QLineEdit(); self.inp_new_stock2.setPlaceholderText("Yeni stok")
-        btn_stok = QPushButton("Güncelle")
-        btn_stok.clicked.connect(self._admin_stok_guncelle)
-        form2.addRow("Ürün:", self.cmb_stok_p)
+        self.btn_stok = QPushButton("Güncelle")
+        self.btn_stok.clicked.connect(self._admin_stok_guncelle)
+        form2.addRow("Ürün:", self.sec_stok_p)
         form2.addRow("Yeni Stok:", self.inp_new_stock2)
-        form2.addRow(btn_stok)
+        form2.addRow(self.btn_stok)
 
        
         gb_sil = QGroupBox("Ürün Sil")
         form3 = QFormLayout(gb_sil)
-        self.cmb_sil_p = QComboBox()
-        btn_del = QPushButton("Sil")
-        btn_del.clicked.connect(self._admin_urun_sil)
-        form3.addRow("Ürün:", self.cmb_sil_p)
-        form3.addRow(btn_del)
+        self.sec_sil_p = UrunSecici(self.urun_arama_modeli)
+        self.btn_del = QPushButton("Sil")
+        self.btn_del.clicked.connect(self._admin_urun_sil)
+        form3.addRow("Ürün:", self.sec_sil_p)
+        form3.addRow(self.btn_del)
+
+        gb_toplu = QGroupBox("Toplu Aktarım (CSV: ProductName, Stock, Price, Category)")
+        toplu_lay = QVBoxLayout(gb_toplu)
+        toplu_btn_lay = QHBoxLayout()
+        self.btn_ice_aktar = QPushButton("CSV'den İçe Aktar")
+        self.btn_ice_aktar.clicked.connect(self._admin_ice_aktar)
+        self.btn_disa_aktar = QPushButton("CSV'ye Dışa Aktar")
+        self.btn_disa_aktar.clicked.connect(self._admin_disa_aktar)
+        toplu_btn_lay.addWidget(self.btn_ice_aktar)
+        toplu_btn_lay.addWidget(self.btn_disa_aktar)
+        toplu_lay.addLayout(toplu_btn_lay)
+        self.pb_toplu = QProgressBar()
+        self.pb_toplu.setRange(0, 100)
+        self.lbl_toplu = QLabel("")
+        toplu_lay.addWidget(self.pb_toplu)
+        toplu_lay.addWidget(self.lbl_toplu)
+
+        self.toplu_isci = TopluAktarimIsci(self)
+        self.toplu_isci.ilerleme.connect(self._toplu_ilerleme)
+        self.toplu_isci.bitti.connect(self._toplu_bitti)
+        self.toplu_isci.hata.connect(self._toplu_hata)
 
         admin_lay.addWidget(gb_ekle)
         admin_lay.addWidget(gb_stok)
         admin_lay.addWidget(gb_sil)
+        admin_lay.addWidget(gb_toplu)
         admin_lay.addStretch(1)
 
         orta.addTab(wid_admin, "🛠️ Admin")
 
         bolucu.addWidget(orta)
+        orta.currentChanged.connect(self._sekme_degisti)
 
        
         sag = QWidget(); sag_l = QVBoxLayout(sag)
@@ -472,14 +854,36 @@ class AnaPencere(QMainWindow):
         self.pb_anim.setTextVisible(False)
         sag_l.addWidget(self.pb_anim)
 
-        sag_l.addWidget(QLabel("Log Paneli"))
-        self.lst_log = QListWidget()
-        self.lst_log.setStyleSheet("QListWidget { font-size: 13px; background:#fafafa; }")
+        log_ust = QHBoxLayout()
+        log_ust.addWidget(QLabel("Log Paneli"))
+        self.cmb_log_seviye = QComboBox()
+        self.cmb_log_seviye.addItem("Tümü", None)
+        self.cmb_log_seviye.addItem("Bilgi", "Bilgi")
+        self.cmb_log_seviye.addItem("Hata", "Hata")
+        self.txt_log_ara = QLineEdit()
+        self.txt_log_ara.setPlaceholderText("Logda ara…")
+        log_ust.addWidget(self.cmb_log_seviye)
+        log_ust.addWidget(self.txt_log_ara, 1)
+        sag_l.addLayout(log_ust)
+
+        self.log_modeli = LogListeModeli(parent=self)
+        self.log_filtre = LogFiltreModeli(self)
+        self.log_filtre.setSourceModel(self.log_modeli)
+        self.cmb_log_seviye.currentIndexChanged.connect(
+            lambda _: self.log_filtre.seviye_ayarla(self.cmb_log_seviye.currentData()))
+        self.txt_log_ara.textChanged.connect(self.log_filtre.arama_ayarla)
+
+        self.lst_log = QListView()
+        self.lst_log.setModel(self.log_filtre)
+        self.lst_log.setUniformItemSizes(True)      # yalnızca görünen satırlar ölçülür/çizilir
+        self.lst_log.setStyleSheet("QListView { font-size: 13px; background:#fafafa; }")
+        self.log_filtre.rowsInserted.connect(self._log_sona_kaydir)
         sag_l.addWidget(self.lst_log, 2)
 
         sag_l.addWidget(QLabel("Dinamik Öncelik"))
         self.tbl_prio = QTableWidget(0, 6)
         self.tbl_prio.setHorizontalHeaderLabels(["Müşteri", "Tür", "Ürün", "Adet", "Bekleme", "Skor"])
+        self._prio_sira: List[tuple] = []   # tablo satır sırası: (-sabit_skor, talep_id)
         sag_l.addWidget(self.tbl_prio, 1)
 
         bolucu.addWidget(sag)
@@ -488,14 +892,51 @@ class AnaPencere(QMainWindow):
         self.sim_timer = QTimer(self)
         self.sim_timer.timeout.connect(self._simulasyon)
 
+        # Sipariş sonuçları görünümleri yalnızca kirli işaretler; bu pencerede bir kez çizilir
+        self._kirli_urunler: Dict[int, int] = {}     # ProductID → son stok
+        self._kirli_musteriler: set = set()
+        self._yenileme_timer = QTimer(self)
+        self._yenileme_timer.setSingleShot(True)
+        self._yenileme_timer.setInterval(250)
+        self._yenileme_timer.timeout.connect(self._kirlileri_yenile)
+
+        self.metrik_timer = QTimer(self)
+        self.metrik_timer.timeout.connect(self._metrikleri_guncelle)
+        self.metrik_timer.start(1000)
+
        
         QTimer.singleShot(0, self._ilk_yukleme)
 
     
   
+    @property
+    def aktif_musteri(self) -> Optional[Dict]:
+        # Önbellekten okur: çağıran önce _onbellekler_hazir() ile kontrol eder
+        return musteri_getir(self.aktif_musteri_id) if self.aktif_musteri_id is not None else None
+
+    def _onbellekler_hazir(self) -> bool:
+        """
+        Sipariş işlemleri müşteri ve ürün önbelleklerinden okur; soğuk önbellek
+        GUI thread'inde tam tablo yüklemesi olurdu. Biri yüklü değilse yüklemesi
+        havuzda istenir ve False döner: işlem yükleme bitene kadar yapılmaz.
+        """
+        hazir = True
+        if not MUSTERILER.yuklu:
+            self.yukleyici.iste("musteri_onbellegi", MUSTERILER.yukle)
+            hazir = False
+        if not KATALOG.yuklu:
+            self.yukleyici.iste("katalog_onbellegi", KATALOG.yukle)
+            hazir = False
+        return hazir
+
     def _log(self, tip, msg):
-        it = f"({tip}) {msg}"
-        self.lst_log.addItem(it)
+        self.log_modeli.ekle(tip, msg)
+
+    def _log_sona_kaydir(self, *_):
+        # Kullanıcı yukarıda geziniyorsa yerinden oynatma
+        kaydirma = self.lst_log.verticalScrollBar()
+        if kaydirma.value() >= kaydirma.maximum() - 2:
+            QTimer.singleShot(0, self.lst_log.scrollToBottom)
 
    
     def _processing_anim_toggle(self, is_on: bool):
@@ -509,80 +950,123 @@ class AnaPencere(QMainWindow):
 
     def _urunleri_kategoriden_yukle(self, kategori):
         self.aktif_kategori = kategori
-        urunler = urunleri_getir()
-        urunler = [u for u in urunler if u["Category"] == kategori]
-        self.tbl_urun.setRowCount(len(urunler))
-        for i, u in enumerate(urunler):
-            self.tbl_urun.setItem(i, 0, QTableWidgetItem(u["ProductName"]))
-            self.tbl_urun.setItem(i, 1, QTableWidgetItem(str(u["Stock"])))
-            self.tbl_urun.setItem(i, 2, QTableWidgetItem(str(u["Price"])))
-            pb = QProgressBar()
-            pb.setMaximum(100)
-            yuzde = min(100, int(u["Stock"]))  # basit ölçek
-            pb.setValue(yuzde)
-            if u["Stock"] < 15:
-                pb.setStyleSheet("QProgressBar::chunk { background-color: red; }")
-            elif u["Stock"] < 50:
-                pb.setStyleSheet("QProgressBar::chunk { background-color: yellow; }")
-            else:
-                pb.setStyleSheet("QProgressBar::chunk { background-color: green; }")
-            self.tbl_urun.setCellWidget(i, 3, pb)
-            cell = QWidget()
-            h = QHBoxLayout(cell); h.setContentsMargins(0,0,0,0)
-            spn = QSpinBox(); spn.setRange(1,5); spn.setFixedWidth(50)
-            btn = QPushButton("Sipariş Ver")
-            btn.setStyleSheet("QPushButton {background:#ff7d14; color:white; border-radius:6px; padding:4px;} "
-                              "QPushButton:hover { background:#ff9336; }")
-            btn.clicked.connect(lambda _, urun=u, spin=spn: self._siparis_ver_urun(urun, spin.value()))
-            h.addWidget(spn); h.addWidget(btn)
-            self.tbl_urun.setCellWidget(i, 4, cell)
+        # Katalog geçersiz kılındıysa (ör. toplu aktarım) yeniden yükleme arka planda olur
+        self.yukleyici.iste("kategori_urunleri", lambda: KATALOG.kategori(kategori), self.urun_modeli.yukle)
 
    
     def _musterileri_yukle(self):
-        mus = musteri_listesi()
-       
-        oncs = oncelik_view_al()
-        bekleme_map: Dict[int, int] = {}
-        skor_map: Dict[int, float] = {}
-        for r in oncs:
-            cid = int(r["CustomerID"])
-            bek = int(r["BeklemeSuresiSn"] or 0)
-            skor = float(r["OncelikSkoru"] or 0.0)
-            
-            if cid not in bekleme_map or bek > bekleme_map[cid]:
-                bekleme_map[cid] = bek
-            if cid not in skor_map or skor > skor_map[cid]:
-                skor_map[cid] = skor
-
-        self.tbl_mus.setRowCount(len(mus))
-        for i, m in enumerate(mus):
-            self.tbl_mus.setItem(i, 0, QTableWidgetItem(str(m["CustomerID"])))
-            self.tbl_mus.setItem(i, 1, QTableWidgetItem(m["CustomerName"]))
-            self.tbl_mus.setItem(i, 2, QTableWidgetItem(m["CustomerType"]))
-            self.tbl_mus.setItem(i, 3, QTableWidgetItem(str(m["Budget"])))
-            self.tbl_mus.setItem(i, 4, QTableWidgetItem(str(m["TotalSpent"])))
-            self.tbl_mus.setItem(i, 5, QTableWidgetItem(str(bekleme_map.get(m["CustomerID"], 0))))
-            self.tbl_mus.setItem(i, 6, QTableWidgetItem(str(round(skor_map.get(m["CustomerID"], 0.0), 1))))
+        self.musteri_modeli.sifirla()
+
+    def _gorunen_musteri_araligi(self) -> tuple:
+        """Ekranda görünen müşteri satırları (ilk, son); tablo boşsa (0, -1)."""
+        n = self.musteri_modeli.rowCount()
+        if n == 0:
+            return 0, -1
+        ilk = self.tbl_mus.rowAt(0)
+        son = self.tbl_mus.rowAt(self.tbl_mus.viewport().height() - 1)
+        return (0 if ilk < 0 else ilk), (n - 1 if son < 0 else son)
+
+    def _gorunen_musterileri_yenile(self):
+        """Yalnızca ekranda görünen müşteri satırlarını yeniden sorgular."""
+        if self.musteri_modeli.rowCount() == 0:
+            self.musteri_modeli.aralik_yenile(0, 0)
+            return
+        self.musteri_modeli.aralik_yenile(*self._gorunen_musteri_araligi())
 
     def _ilk_yukleme(self):
-        try:
-            ensure_initial_customers()   
+        # Pencere gösterildikten sonraki ilk olay döngüsü turunda çalışır
+        self.baslangic.isaretle("pencere")
+        self.musteri_modeli.modelReset.connect(lambda: self.baslangic.isaretle("musteri_paneli"))
+        self.urun_arama_modeli.modelReset.connect(lambda: self.baslangic.isaretle("admin"))
+
+        def musterileri_hazirla():
+            ensure_initial_customers()
+            musteri_listesi()        # müşteri önbelleğini doldur
+
+        def musteriler_hazir(_):
+            self.baslangic.isaretle("musteriler")
             self._musterileri_yukle()
-            self._admin_combo_doldur()
-            if MATPLOTLIB_OK:
-                self._stok_grafik_guncelle()
+
+        def katalog_hazir(kategoriler):
+            self.baslangic.isaretle("katalog")
+            self._kategori_butonlarini_kur(kategoriler)
+            self.urun_arama_modeli.ara("")
+
+        # Müşteriler ve ürün kataloğu birbirinden bağımsız: havuzda paralel yüklenir.
+        # Başarısız olan (ör. veritabanı henüz hazır değil) bir süre sonra yeniden denenir.
+        def musterileri_iste():
+            self.yukleyici.iste("ilk_musteriler", musterileri_hazirla, musteriler_hazir,
+                                lambda _: QTimer.singleShot(self.YENIDEN_DENEME_MS, musterileri_iste))
+
+        def katalog_iste():
+            self.yukleyici.iste("ilk_katalog", self._kategori_listesi, katalog_hazir,
+                                lambda _: QTimer.singleShot(self.YENIDEN_DENEME_MS, katalog_iste))
+
+        musterileri_iste()
+        katalog_iste()
+
+    def _baslangic_bitti(self, ozet: str):
+        self._log("Bilgi", f"Açılış tamamlandı → {ozet}")
+        if self.baslangic_raporu_yazdir:
+            print(f"Açılış: {ozet}", flush=True)
+
+    def _kategori_butonlarini_kur(self, kategoriler: Dict[str, List[str]]):
+        self.kategori_urunleri = kategoriler
+        while self.kat_lay.count():
+            w = self.kat_lay.takeAt(0).widget()
+            if w is not None:
+                w.deleteLater()
+        for kategori in kategoriler.keys():
+            btn = QPushButton(kategori)
+            btn.setStyleSheet(
+                "QPushButton {background:#e67e22; color:white; font-weight:bold; padding:6px; border-radius:6px;}"
+                "QPushButton:hover { background:#ff9336; }"
+            )
+            btn.clicked.connect(lambda _, kat=kategori: self._urunleri_kategoriden_yukle(kat))
+            self.kat_lay.addWidget(btn)
+        self.kat_lay.addStretch()
+
+    def _sekme_degisti(self, i: int):
+        if self.orta.widget(i) is self.wid_graf:
+            self._grafik_hazirla()
+
+    def _grafik_hazirla(self):
+        """Matplotlib'i ilk kullanımda yükler ve grafiği kurar."""
+        if self.fig is not None or not MATPLOTLIB_OK:
+            return
+        try:
+            with METRIKLER.olc("matplotlib_yukle"):
+                from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+                from matplotlib.figure import Figure
         except Exception as e:
-            self._log("Hata", str(e))
+            self.lbl_graf.setText(f"Matplotlib yüklenemedi: {e}")
+            return
+        self.lbl_graf.hide()
+        self.fig = Figure(figsize=(5, 3))
+        self.canvas = FigureCanvas(self.fig)
+        self.graf_lay.addWidget(self.canvas)
+        # Yeniden çizim hız sınırı: değişiklikler en fazla 500 ms'de bir çizilir
+        self._grafik_timer = QTimer(self)
+        self._grafik_timer.setSingleShot(True)
+        self._grafik_timer.setInterval(500)
+        self._grafik_timer.timeout.connect(self._grafik_ciz)
+        self.btn_graf_yenile = QPushButton("Grafiği Yenile")
+        self.btn_graf_yenile.clicked.connect(self._stok_grafik_guncelle)
+        self.graf_lay.addWidget(self.btn_graf_yenile)
+        self._stok_grafik_guncelle()
 
 
    
-    def _musteri_sec(self, row, col):
-        cid = int(self.tbl_mus.item(row, 0).text())
-        self.aktif_musteri = musteri_getir(cid)
-        self._log("Bilgi", f"Aktif müşteri değişti → {self.aktif_musteri['CustomerName']}")
+    def _musteri_sec(self, index):
+        m = self.musteri_modeli.musteri(index.row())
+        self.aktif_musteri_id = int(m["CustomerID"])
+        self._log("Bilgi", f"Aktif müşteri değişti → {m['CustomerName']}")
 
    
     def _siparis_ver_kategori(self, urun_ad, adet, fiyat):
+        if not self._onbellekler_hazir():
+            QMessageBox.warning(self, "Uyari", self.VERI_YUKLENIYOR)
+            return
         try:
             urun = urun_bilgi_adla(urun_ad)
             if not urun:
@@ -594,19 +1078,41 @@ class AnaPencere(QMainWindow):
             t = SiparisTalebi(musteri["CustomerID"], musteri["CustomerName"], musteri["CustomerType"],
                               product_id, urun_ad, adet, fiyat)
             self.worker.kuyruga_ekle(t)
+        except SiparisHatasi as e:
+            self._log("Hata", f"Sipariş reddedildi: {e}")
+            QMessageBox.warning(self, "Uyari", f"Sipariş reddedildi:\n{e}")
         except Exception as e:
             self._log("Hata", f"Sipariş verilemedi: {str(e)}")
             QMessageBox.critical(self, "Hata", f"Sipariş verilemedi:\n{str(e)}")
 
    
-    def _prio_guncelle(self, snap):
-        self.tbl_prio.setRowCount(len(snap))
-        for i, row in enumerate(snap):
-            for j, k in enumerate(["musteri","tip","urun","adet","bekleme","skor"]):
-                item = QTableWidgetItem(str(row[k]))
-                if k in ("adet","bekleme","skor"):
-                    item.setTextAlignment(Qt.AlignCenter)
-                self.tbl_prio.setItem(i, j, item)
+    def _prio_guncelle(self, fark):
+        """Kuyruk farkını tabloya artımlı uygular; satırlar yeniden yaratılmaz."""
+        sira = self._prio_sira
+        self.tbl_prio.setUpdatesEnabled(False)
+        try:
+            for r in fark["silinen"]:
+                i = bisect.bisect_left(sira, (-r["anahtar"], r["id"]))
+                if i < len(sira) and sira[i][1] == r["id"]:
+                    del sira[i]
+                    self.tbl_prio.removeRow(i)
+            for row in fark["eklenen"]:
+                anahtar = (-row["anahtar"], row["id"])
+                i = bisect.bisect_left(sira, anahtar)
+                sira.insert(i, anahtar)
+                self.tbl_prio.insertRow(i)
+                for j, k in enumerate(["musteri","tip","urun","adet","bekleme","skor"]):
+                    item = QTableWidgetItem(str(row[k]))
+                    if k in ("adet","bekleme","skor"):
+                        item.setTextAlignment(Qt.AlignCenter)
+                    self.tbl_prio.setItem(i, j, item)
+            for r in fark["guncel"]:
+                i = bisect.bisect_left(sira, (-r["anahtar"], r["id"]))
+                if i < len(sira) and sira[i][1] == r["id"]:
+                    self.tbl_prio.item(i, 4).setText(str(r["bekleme"]))
+                    self.tbl_prio.item(i, 5).setText(str(r["skor"]))
+        finally:
+            self.tbl_prio.setUpdatesEnabled(True)
 
 
     def _sim_toggle(self, acik: bool):
@@ -619,6 +1125,8 @@ class AnaPencere(QMainWindow):
 
    
     def _simulasyon(self):
+        if not self._onbellekler_hazir():
+            return      # bir sonraki turda yeniden denenir
         try:
             ms = musteri_listesi()
             if not ms:
@@ -630,6 +1138,8 @@ class AnaPencere(QMainWindow):
                 return
 
             m = random.choice(adaylar)
+            if not self.kategori_urunleri:
+                return
             kategori = random.choice(list(self.kategori_urunleri.keys()))
             urun_ad = random.choice(self.kategori_urunleri[kategori])
 
@@ -645,10 +1155,15 @@ class AnaPencere(QMainWindow):
             )
             self.worker.kuyruga_ekle(t)
             self._log("Bilgi", f"Simülasyon → Rastgele müşteri: {m['CustomerName']} / {urun_ad} x{adet}")
+        except SiparisHatasi as e:
+            self._log("Hata", f"Simülasyon → reddedildi: {e}")
         except Exception as e:
             self._log("Hata", f"Simülasyon hatası: {e}")
 
     def _siparis_ver_urun(self, urun, adet):
+        if not self._onbellekler_hazir():
+            QMessageBox.warning(self, "Uyari", self.VERI_YUKLENIYOR)
+            return
         try:
             urun_db = urun_bilgi_adla(urun["ProductName"])
             if not urun_db:
@@ -658,13 +1173,8 @@ class AnaPencere(QMainWindow):
             product_id = int(urun_db["ProductID"])
             fiyat = float(urun_db["Price"])
 
-          
+            # Stok ve bütçe kontrolü motorun ayırma defterinde yapılır (kuyruktakiler dahil)
             musteri = self.aktif_musteri
-            toplam_tutar = adet * fiyat
-            if musteri and float(musteri.get("Budget") or 0) < toplam_tutar:
-                QMessageBox.warning(self, "Uyari", f"{musteri['CustomerName']} için yeterli bütçe yok!")
-                return
-
             t = SiparisTalebi(
                 musteri["CustomerID"],
                 musteri["CustomerName"],
@@ -677,17 +1187,77 @@ class AnaPencere(QMainWindow):
             self.worker.kuyruga_ekle(t)
             self._log("Bilgi", f"Kuyruğa eklendi → {musteri['CustomerName']} / {urun['ProductName']} x{adet}")
 
+        except SiparisHatasi as e:
+            self._log("Hata", f"Sipariş reddedildi: {e}")
+            QMessageBox.warning(self, "Uyari", f"Sipariş reddedildi:\n{e}")
         except Exception as e:
             self._log("Hata", f"Sipariş verilemedi: {str(e)}")
             QMessageBox.critical(self, "Hata", f"Sipariş verilemedi:\n{str(e)}")
 
    
     def _islem_sonucu_ele_al(self, tip: str, detay: dict):
-        self._tablolari_yenile()
+        # Yalnızca neyin değiştiği işaretlenir; çizim yenileme penceresinin sonunda bir kez yapılır.
+        # Başarısız / zaman aşımına uğrayan siparişler hiçbir görünümü değiştirmez.
+        if "urun_id" in detay:
+            self._kirli_urunler[int(detay["urun_id"])] = int(detay["stok"])
+        if "musteri_id" in detay:
+            self._kirli_musteriler.add(int(detay["musteri_id"]))
+        if (self._kirli_urunler or self._kirli_musteriler) and not self._yenileme_timer.isActive():
+            self._yenileme_timer.start()
+
+    def _kirlileri_yenile(self):
+        urunler, self._kirli_urunler = self._kirli_urunler, {}
+        musteriler, self._kirli_musteriler = self._kirli_musteriler, set()
+        with METRIKLER.olc("gui_yenileme"):
+            for pid, stok in urunler.items():
+                # Ürün tablosu yeniden kurulmaz; yalnızca değişen satır güncellenir.
+                self.urun_modeli.stok_guncelle(pid, stok)
+                self._dusuk_stok_guncelle(pid, stok)
+                self.urun_arama_modeli.stok_guncelle(pid, stok)
+            if musteriler:
+                ilk, son = self._gorunen_musteri_araligi()
+                gorunen = {int(self.musteri_modeli.musteri(i)["CustomerID"]) for i in range(ilk, son + 1)}
+                if gorunen & musteriler:
+                    self.musteri_modeli.aralik_yenile(ilk, son)
+
+    def _metrikleri_guncelle(self):
+        hiz = METRIKLER.siparis_hizi()
+        if not self.wid_metrik.isVisible():
+            return
+        o = METRIKLER.ozet()
+        s, g = o["sayaclar"], o["gostergeler"]
+        self.lbl_metrik.setText(
+            f"Sipariş/sn: {hiz:.2f} (ort. {o['ort_siparis_s']:.2f})   "
+            f"Kuyruk: {int(g.get('kuyruk_derinligi', 0))}   Aktif işçi: {int(g.get('aktif_isci', 0))}   "
+            f"Tamamlanan: {s.get('siparis_tamamlanan', 0)}   Zaman aşımı: {s.get('zaman_asimi', 0)}   "
+            f"Stok hatası: {s.get('stok_hatasi', 0)}   Bütçe hatası: {s.get('butce_hatasi', 0)}   "
+            f"DB hatası: {s.get('db_hatasi', 0)}"
+        )
+        asamalar = o["asamalar"]
+        self.tbl_metrik.setRowCount(len(asamalar))
+        for i, (ad, h) in enumerate(asamalar.items()):
+            degerler = [ad] + [str(h.get(k, "-")) for k in ("sayi", "ort_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")]
+            for j, d in enumerate(degerler):
+                item = self.tbl_metrik.item(i, j)
+                if item is None:
+                    self.tbl_metrik.setItem(i, j, QTableWidgetItem(d))
+                else:
+                    item.setText(d)
+
+    def _metrikleri_disa_aktar(self):
+        yol, _ = QFileDialog.getSaveFileName(self, "Metrikleri Dışa Aktar", "metrikler.json", "JSON (*.json)")
+        if not yol:
+            return
+        try:
+            METRIKLER.disa_aktar(yol, ek={"depo": aktif_depo().istatistik(), "log_yazici": LOG_YAZICI.istatistik()})
+            self._log("Bilgi", f"Metrikler dışa aktarıldı → {yol}")
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Metrikler yazılamadı:\n{e}")
 
     def _tablolari_yenile(self):
+        """Admin işlemleri sonrası tam yenileme (siparişler _kirlileri_yenile ile artımlı işlenir)."""
         try:
-            self._musterileri_yukle()
+            self._gorunen_musterileri_yenile()
         except Exception as e:
             self._log("Hata", f"Müşteri yenileme hatası: {e}")
         try:
@@ -696,126 +1266,247 @@ class AnaPencere(QMainWindow):
         except Exception as e:
             self._log("Hata", f"Ürün yenileme hatası: {e}")
         try:
-            if MATPLOTLIB_OK:
-                self._stok_grafik_guncelle()
-            self._admin_combo_doldur()
+            self._stok_grafik_guncelle()
+            self.urun_arama_modeli.yenile()
         except Exception as e:
             self._log("Hata", f"Admin/grafik yenileme hatası: {e}")
 
     def _stok_grafik_guncelle(self):
-        if not MATPLOTLIB_OK:
-            return
-        urunler = urunleri_getir()
-        if not urunler:
+        """Listeyi tek bir ORDER BY Stock LIMIT sorgusuyla baştan kurar (ilk yükleme / admin)."""
+        if self.fig is None:
             return
+        self.yukleyici.iste("dusuk_stok", lambda: dusuk_stoklu_urunler(self.DUSUK_STOK_N), self._dusuk_stok_uygula)
 
-       
-        urunler_sorted = sorted(urunler, key=lambda x: x["Stock"])[:10]
-        adlar = [u["ProductName"] for u in urunler_sorted]
-        stoklar = [u["Stock"] for u in urunler_sorted]
+    def _dusuk_stok_uygula(self, urunler: List[Dict]):
+        self._dusuk_stok = [dict(u) for u in urunler]
+        self._grafik_planla()
 
-       
-        positions = list(range(len(adlar)))
-
-        self.fig.clear()
-        ax = self.fig.add_subplot(111)
-        ax.bar(positions, stoklar)  
-        ax.set_title("En Düşük Stoklu 10 Ürün")
-        ax.set_ylabel("Stok")
-
-       
-        ax.set_xticks(positions)
-        ax.set_xticklabels(adlar, rotation=45, ha="right")
-
-        self.fig.tight_layout()
+    def _dusuk_stok_guncelle(self, pid: int, stok: int):
+        """Tek ürünün stok değişimini listeye artımlı uygular; gerekmedikçe sorgu atmaz."""
+        if self.fig is None:
+            return
+        liste = self._dusuk_stok
+        i = next((k for k, u in enumerate(liste) if int(u["ProductID"]) == pid), None)
+        if i is not None:
+            if liste[i]["Stock"] == stok:
+                return
+            if len(liste) == self.DUSUK_STOK_N and stok > liste[-1]["Stock"]:
+                # Stok arttı ve sınırı geçti: yerine listede olmayan bir ürün girebilir
+                self._stok_grafik_guncelle()
+                return
+            liste[i]["Stock"] = stok
+        elif len(liste) < self.DUSUK_STOK_N or (stok, pid) < (liste[-1]["Stock"], int(liste[-1]["ProductID"])):
+            if not KATALOG.yuklu:
+                # Soğuk katalog GUI thread'inde yüklenmez: liste havuzda yeniden sorgulanır
+                self._stok_grafik_guncelle()
+                return
+            u = KATALOG.idyle(pid)
+            if u is None:
+                return
+            u["Stock"] = stok
+            liste.append(u)
+        else:
+            return
+        liste.sort(key=lambda u: (u["Stock"], int(u["ProductID"])))
+        del liste[self.DUSUK_STOK_N:]
+        self._grafik_planla()
+
+    def _grafik_planla(self):
+        if not self._grafik_timer.isActive():
+            self._grafik_timer.start()
+
+    def _grafik_ciz(self):
+        adlar = tuple(u["ProductName"] for u in self._dusuk_stok)
+        stoklar = tuple(u["Stock"] for u in self._dusuk_stok)
+        if (adlar, stoklar) == self._grafik_son:
+            return
+        if self._grafik_ax is None or len(self._grafik_cubuklar) != len(adlar):
+            # Çubuk sayısı değiştiyse eksenler bir kez yeniden kurulur
+            self.fig.clear()
+            ax = self._grafik_ax = self.fig.add_subplot(111)
+            positions = list(range(len(adlar)))
+            self._grafik_cubuklar = ax.bar(positions, stoklar)
+            ax.set_title(f"En Düşük Stoklu {self.DUSUK_STOK_N} Ürün")
+            ax.set_ylabel("Stok")
+            ax.set_xticks(positions)
+            ax.set_xticklabels(adlar, rotation=45, ha="right")
+            self.fig.tight_layout()
+        else:
+            # Yerinde güncelleme: yalnızca yükseklikler, gerekirse etiketler ve y ekseni
+            ax = self._grafik_ax
+            for cubuk, s in zip(self._grafik_cubuklar, stoklar):
+                cubuk.set_height(s)
+            if adlar != self._grafik_son[0]:
+                ax.set_xticklabels(adlar, rotation=45, ha="right")
+            ax.set_ylim(0, max(max(stoklar, default=0) * 1.1, 1))
+        self._grafik_son = (adlar, stoklar)
         self.canvas.draw_idle()
 
-
     #
-    def _admin_combo_doldur(self):
-        urunler = urunleri_getir()
-        self.cmb_stok_p.clear()
-        self.cmb_sil_p.clear()
-        for u in urunler:
-            text = f"{u['ProductID']} - {u['ProductName']} (Stok: {u['Stock']})"
-            self.cmb_stok_p.addItem(text, u["ProductID"])
-            self.cmb_sil_p.addItem(text, u["ProductID"])
-
- 
     def _admin_urun_ekle(self):
         try:
-            with self.worker._admin_lock:  
-                ad = self.inp_new_name.text().strip()
-                stok = int(self.inp_new_stock.text().strip())
-                fiyat = float(self.inp_new_price.text().strip())
-                kategori = self.cmb_new_category.currentText()  
-
-                if not ad:
-                    QMessageBox.warning(self, "Uyarı", "Ürün adı boş olamaz.")
-                    return
-                if stok < 0 or fiyat < 0:
-                    QMessageBox.warning(self, "Uyarı", "Stok ve fiyat negatif olamaz.")
-                    return
-                if not kategori or kategori.strip() == "":
-                    QMessageBox.warning(self, "Uyarı", "Kategori seçmek zorunludur.")
-                    return
-
-                urun_ekle(ad, stok, fiyat, kategori)   
-                self._log("Bilgi", f"Admin: Ürün eklendi → {ad} (Stok: {stok}, Fiyat: {fiyat}, Kategori: {kategori})")
-                self._tablolari_yenile()
-
-              
-                self.inp_new_name.clear()
-                self.inp_new_stock.clear()
-                self.inp_new_price.clear()
-                self.cmb_new_category.setCurrentIndex(0)  
+            ad = self.inp_new_name.text().strip()
+            stok = int(self.inp_new_stock.text().strip())
+            fiyat = float(self.inp_new_price.text().strip())
+            kategori = self.cmb_new_category.currentText()  
+
+            if not ad:
+                QMessageBox.warning(self, "Uyarı", "Ürün adı boş olamaz.")
+                return
+            if stok < 0 or fiyat < 0:
+                QMessageBox.warning(self, "Uyarı", "Stok ve fiyat negatif olamaz.")
+                return
+            if not kategori or kategori.strip() == "":
+                QMessageBox.warning(self, "Uyarı", "Kategori seçmek zorunludur.")
+                return
+
+            urun_ekle(ad, stok, fiyat, kategori)   
+            self._log("Bilgi", f"Admin: Ürün eklendi → {ad} (Stok: {stok}, Fiyat: {fiyat}, Kategori: {kategori})")
+            self._tablolari_yenile()
+
+          
+            self.inp_new_name.clear()
+            self.inp_new_stock.clear()
+            self.inp_new_price.clear()
+            self.cmb_new_category.setCurrentIndex(0)  
 
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"Ürün ekleme hatası:\n{e}")
 
 
     def _admin_stok_guncelle(self):
+        pid = self.sec_stok_p.secili_id()
+        if pid is None:
+            QMessageBox.warning(self, "Uyari", "Listeden bir ürün seçin.")
+            return
         try:
-            with self.worker._admin_lock:  
-                pid = int(self.cmb_stok_p.currentData())
-                yeni_stok = int(self.inp_new_stock2.text().strip())
-                if yeni_stok < 0:
-                    QMessageBox.warning(self, "Uyari", "Stok negatif olamaz.")
-                    return
-                urun_stok_guncelle(pid, yeni_stok)
-                u = urun_bilgi_idyle(pid)
-                self._log("Bilgi", f"Admin: Stok güncellendi → {u['ProductName']} = {yeni_stok}")
-                self._tablolari_yenile()
-                self.inp_new_stock2.clear()
-        except Exception as e:
+            yeni_stok = int(self.inp_new_stock2.text().strip())
+        except ValueError as e:
             QMessageBox.critical(self, "Hata", f"Stok güncelleme hatası:\n{e}")
+            return
+        if yeni_stok < 0:
+            QMessageBox.warning(self, "Uyari", "Stok negatif olamaz.")
+            return
+
+        def guncelle():
+            # Havuzda çalışır: katalog okuması (soğuksa tablo yüklemesi) ve ürün
+            # kilidi beklemesi GUI thread'ini durdurmaz
+            u = urun_bilgi_idyle(pid)
+            if u is not None:
+                with self.worker.urun_kilidi(pid):
+                    urun_stok_guncelle(pid, yeni_stok)
+            return u
+
+        def guncellendi(u):
+            self.btn_stok.setEnabled(True)
+            if u is None:
+                QMessageBox.warning(self, "Uyari", f"{pid} ID'li ürün bulunamadı.")
+                return
+            self._log("Bilgi", f"Admin: Stok güncellendi → {u['ProductName']} = {yeni_stok}")
+            self._tablolari_yenile()
+            self.inp_new_stock2.clear()
+
+        def guncellenemedi(e):
+            self.btn_stok.setEnabled(True)
+            if isinstance(e, TimeoutError):
+                QMessageBox.warning(self, "Uyari", f"Stok güncellenemedi:\n{e}\nBiraz sonra tekrar deneyin.")
+            else:
+                QMessageBox.critical(self, "Hata", f"Stok güncelleme hatası:\n{e}")
+
+        self.btn_stok.setEnabled(False)
+        self.yukleyici.iste("admin_stok_guncelle", guncelle, guncellendi, guncellenemedi)
 
  
     def _admin_urun_sil(self):
-        try:
-            with self.worker._admin_lock:   
-                pid = int(self.cmb_sil_p.currentData())
+        pid = self.sec_sil_p.secili_id()
+        if pid is None:
+            QMessageBox.warning(self, "Uyari", "Listeden bir ürün seçin.")
+            return
+
+        def sil():
+            # Havuzda çalışır: ürün kilidi beklenirken arayüz donmaz.
+            # Mesajlar için gereken ürün satırı kilit içinde alınır.
+            with self.worker.urun_kilidi(pid):
                 u = urun_bilgi_idyle(pid)
-                urun_sil(pid)
-                self._log("Bilgi", f"Admin: Ürün silindi → {u['ProductName']}")
-                self._tablolari_yenile()
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"Ürün silme hatası:\n{e}")
+                if u is not None:
+                    urun_sil(pid)
+            return u
+
+        def silindi(u):
+            # Kilit bırakıldı; diyaloglar yalnızca burada, GUI thread'inde açılır
+            self.btn_del.setEnabled(True)
+            if u is None:
+                QMessageBox.warning(self, "Uyari", f"{pid} ID'li ürün bulunamadı.")
+                return
+            self._log("Bilgi", f"Admin: Ürün silindi → {u['ProductName']}")
+            if self.sec_sil_p.secili_id() == pid:
+                self.sec_sil_p.clear()
+            self._tablolari_yenile()
+
+        def silinemedi(e):
+            self.btn_del.setEnabled(True)
+            if isinstance(e, TimeoutError):
+                QMessageBox.warning(self, "Uyari", f"Ürün silinemedi:\n{e}\nBiraz sonra tekrar deneyin.")
+            else:
+                QMessageBox.critical(self, "Hata", f"Ürün silme hatası:\n{e}")
+
+        # İşlem sürerken düğme kapalı: ikinci istek birleştirilip ilkinin sonucu kaybolmasın
+        self.btn_del.setEnabled(False)
+        self.yukleyici.iste("admin_urun_sil", sil, silindi, silinemedi)
+
+    def _admin_ice_aktar(self):
+        yol, _ = QFileDialog.getOpenFileName(self, "Ürünleri İçe Aktar", "", "CSV (*.csv)")
+        if yol:
+            self._toplu_baslat()
+            self.toplu_isci.ice_aktar(yol)
+
+    def _admin_disa_aktar(self):
+        yol, _ = QFileDialog.getSaveFileName(self, "Ürünleri Dışa Aktar", "urunler.csv", "CSV (*.csv)")
+        if yol:
+            self._toplu_baslat()
+            self.toplu_isci.disa_aktar(yol)
+
+    def _toplu_baslat(self):
+        self.btn_ice_aktar.setEnabled(False)
+        self.btn_disa_aktar.setEnabled(False)
+        self.pb_toplu.setValue(0)
+        self.lbl_toplu.setText("Çalışıyor…")
+
+    def _toplu_ilerleme(self, yuzde: int, islenen: int):
+        self.pb_toplu.setValue(yuzde)
+        self.lbl_toplu.setText(f"{islenen} satır")
+
+    def _toplu_son(self):
+        self.btn_ice_aktar.setEnabled(True)
+        self.btn_disa_aktar.setEnabled(True)
+
+    def _toplu_bitti(self, yon: str, rapor: dict):
+        self._toplu_son()
+        self.pb_toplu.setValue(100)
+        if yon == "disa":
+            msg = f"Dışa aktarıldı: {rapor['yazilan']} ürün"
+        else:
+            msg = (f"İçe aktarıldı: {rapor['eklenen']} eklendi, {rapor['guncellenen']} güncellendi, "
+                   f"{rapor['hatali']} hatalı satır ({rapor['sure_s']} sn)")
+            for satir_no, hata in rapor["hatalar"][:20]:
+                self._log("Hata", f"CSV satır {satir_no}: {hata}")
+            # Tüm aktarım için tek yenileme (katalog aktarımda geçersiz kılındı)
+            self._tablolari_yenile()
+            self.yukleyici.iste("kategoriler", self._kategori_listesi, self._kategori_butonlarini_kur)
+        self.lbl_toplu.setText(msg)
+        self._log("Bilgi", f"Admin: {msg}")
+
+    def _toplu_hata(self, yon: str, mesaj: str):
+        self._toplu_son()
+        self.lbl_toplu.setText("Hata")
+        if yon == "ice":
+            # Hata öncesi yazılan partiler kalıcıdır
+            self._tablolari_yenile()
+        QMessageBox.critical(self, "Hata", f"Toplu aktarım hatası:\n{mesaj}")
 
    
     def _kategori_listesi(self):
-        kategoriler = {}
-        with baglanti_ac() as bag, bag.cursor() as cur:
-            cur.execute("SELECT DISTINCT Category FROM Products ORDER BY Category")
-            for row in cur.fetchall():
-                kategoriler[row["Category"]] = []
-
-           
-            cur.execute("SELECT ProductName, Category FROM Products")
-            for row in cur.fetchall():
-                if row["Category"] in kategoriler:
-                    kategoriler[row["Category"]].append(row["ProductName"])
-        return kategoriler
+        return KATALOG.kategori_listesi()
 
 
 
@@ -823,13 +1514,26 @@ class AnaPencere(QMainWindow):
         try:
             self.worker.durdur()
             self.worker.wait()
+            self.yukleyici.kapat()
+            kaynaklari_kapat()
         finally:
             super().closeEvent(event)
 
 
 def main():
-    app = QApplication(sys.argv)
-    w = AnaPencere(); w.show()
+    # --depo mysql | sqlite | sqlite:dosya.db, --gecikme SN, --baslangic-raporu
+    # (Qt argümanlarından önce ayıklanır)
+    p = argparse.ArgumentParser(add_help=False)
+    p.add_argument("--depo")
+    p.add_argument("--gecikme", type=float, default=0)
+    p.add_argument("--baslangic-raporu", action="store_true", help="açılış süre raporunu konsola yaz")
+    args, qt_argv = p.parse_known_args(sys.argv[1:])
+    if args.depo:
+        depo_sec(args.depo)
+    app = QApplication(sys.argv[:1] + qt_argv)
+    w = AnaPencere(SiparisMotoru(isleme_gecikmesi_s=args.gecikme),
+                   baslangic_raporu_yazdir=args.baslangic_raporu)
+    w.show()
     sys.exit(app.exec())
 
 
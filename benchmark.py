@@ -0,0 +1,192 @@
+"""
+Sipariş motoru için yük üreteci ve verim / gecikme ölçümü.
+
+Siparişleri sabit hızda (açık döngü) üretir, SiparisMotoru'nu sürer ve
+verim, kuyruk bekleme ve uçtan uca gecikme yüzdeliklerini, zaman aşımı ve
+hata sayılarını ve kuyruğa girmeden reddedilen (stok / bütçe ayrılamayan)
+siparişleri raporlar. Siparişler gerçekten veritabanına yazılır; test
+veritabanında ya da gömülü SQLite deposuyla çalıştırın.
+
+    python benchmark.py --hiz 20 --sure 60 --premium-orani 0.3 --cikti sonuc.json
+    python benchmark.py --depo sqlite --hiz 50 --sure 20
+    python benchmark.py --hiz 40 --isci 8 --karsilastir sonuc.json
+"""
+import sys, time, json, math, random, argparse, threading
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Optional
+
+from veritabani import (
+    KATALOG, LOG_YAZICI, musteri_listesi, kaynaklari_kapat, depo_sec, aktif_depo, VARSAYILAN_DEPO,
+)
+from metrikler import METRIKLER
+from siparis_motoru import SiparisMotoru, talep_olustur, ISCI_SAYISI, PARTI_BOYUTU
+from depo import SiparisHatasi
+
+
+def yuzdelikler(degerler: List[float]) -> Dict[str, float]:
+    """Milisaniye cinsinden p50/p90/p95/p99/max/ortalama (en yakın sıra yöntemi)."""
+    if not degerler:
+        return {}
+    d = sorted(v * 1000.0 for v in degerler)
+
+    def p(q: float) -> float:
+        return round(d[min(len(d) - 1, max(0, math.ceil(q * len(d)) - 1))], 2)
+
+    return {"p50": p(0.50), "p90": p(0.90), "p95": p(0.95), "p99": p(0.99),
+            "max": round(d[-1], 2), "ort": round(sum(d) / len(d), 2)}
+
+
+class YukUreteci:
+    """Müşteri / ürün karışımına göre rastgele sipariş talepleri üretir."""
+
+    def __init__(self, musteriler: List[Dict], urunler: List[Dict], premium_orani: float,
+                 sicak_urun: int, sicak_oran: float, adet_min: int, adet_max: int,
+                 rnd: random.Random):
+        self.premium = [m for m in musteriler if m["CustomerType"] == "Premium"]
+        self.standart = [m for m in musteriler if m["CustomerType"] != "Premium"]
+        self.urunler = urunler
+        self.sicak = rnd.sample(urunler, k=min(sicak_urun, len(urunler)))
+        self.premium_orani = premium_orani
+        self.sicak_oran = sicak_oran
+        self.adet_min, self.adet_max = adet_min, adet_max
+        self.rnd = rnd
+
+    def talep(self):
+        r = self.rnd
+        havuz = self.premium if (self.premium and (r.random() < self.premium_orani or not self.standart)) \
+            else self.standart
+        urunler = self.sicak if (self.sicak and r.random() < self.sicak_oran) else self.urunler
+        return talep_olustur(r.choice(havuz), r.choice(urunler), r.randint(self.adet_min, self.adet_max))
+
+
+def calistir(args) -> Dict:
+    rnd = random.Random(args.tohum)
+    musteriler = musteri_listesi()
+    urunler = KATALOG.tum()
+    if not musteriler or not urunler:
+        raise SystemExit("Benchmark için veritabanında müşteri ve ürün olmalı.")
+    ureteci = YukUreteci(musteriler, urunler, args.premium_orani, args.sicak_urun, args.sicak_oran,
+                         args.adet_min, args.adet_max, rnd)
+
+    METRIKLER.sifirla()
+    motor = SiparisMotoru(timeout_s=args.timeout, isci_sayisi=args.isci, parti_boyutu=args.parti,
+                          isleme_gecikmesi_s=args.gecikme)
+    kilit = threading.Lock()
+    sonuclar: List[tuple] = []
+    son_sonuc = [0.0]
+
+    def sonuc_al(tip: str, detay: Dict):
+        with kilit:
+            sonuclar.append((tip, detay))
+            son_sonuc[0] = time.time()
+
+    motor.abone_ol("islem_sonucu", sonuc_al)
+    motor.baslat()
+
+    uretilen = 0
+    aralik = 1.0 / args.hiz
+    bas = time.time()
+    sonraki = time.monotonic()
+    bitis = sonraki + args.sure
+    try:
+        while time.monotonic() < bitis:
+            try:
+                motor.kuyruga_ekle(ureteci.talep())
+            except SiparisHatasi:
+                pass                    # "red" sonucu olarak sayılır
+            uretilen += 1
+            sonraki += aralik
+            bekle = sonraki - time.monotonic()
+            if bekle > 0:
+                time.sleep(bekle)
+        # Kalan siparişlerin bitmesini bekle (en fazla --bosalt saniye)
+        son = time.monotonic() + args.bosalt
+        while time.monotonic() < son:
+            with kilit:
+                if len(sonuclar) >= uretilen:
+                    break
+            time.sleep(0.05)
+    finally:
+        motor.durdur()
+        motor.bekle()
+        kaynaklari_kapat()
+
+    with kilit:
+        sonuclar = list(sonuclar)
+        bitis_zamani = son_sonuc[0] or time.time()
+    sure = max(1e-9, bitis_zamani - bas)
+    tipler = Counter(tip for tip, _ in sonuclar)
+    basarili = [d for tip, d in sonuclar if tip == "basari"]
+    kuyruga_giren = [d for tip, d in sonuclar if tip != "red"]
+    return {
+        "etiket": args.etiket,
+        "baslangic": datetime.fromtimestamp(bas).isoformat(timespec="seconds"),
+        "parametreler": {k: v for k, v in vars(args).items() if k not in ("cikti", "karsilastir")},
+        "uretilen": uretilen,
+        "tamamlanan": tipler.get("basari", 0),
+        "hata": tipler.get("hata", 0),
+        "zaman_asimi": tipler.get("timeout", 0),
+        "reddedilen": tipler.get("red", 0),
+        "red_nedenleri": dict(Counter(d["kod"] for tip, d in sonuclar if tip == "red")),
+        "sonuclanmayan": uretilen - len(sonuclar),
+        "sure_s": round(sure, 3),
+        "verim_siparis_s": round(tipler.get("basari", 0) / sure, 3),
+        "kuyruk_bekleme_ms": yuzdelikler([d["kuyruk_bekleme_s"] for d in kuyruga_giren]),
+        "uctan_uca_ms": yuzdelikler([d["sure_s"] for d in basarili]),
+        "ort_parti": round(METRIKLER.sayac("parti_siparis") / max(1, METRIKLER.sayac("parti")), 2),
+        "hata_mesajlari": dict(Counter(d["mesaj"] for tip, d in sonuclar if tip == "hata").most_common(10)),
+        "asamalar": METRIKLER.ozet()["asamalar"],
+        "depo": aktif_depo().istatistik(),
+        "log_yazici": LOG_YAZICI.istatistik(),
+    }
+
+
+def karsilastir(onceki: Dict, simdiki: Dict):
+    def fark(a: Optional[float], b: Optional[float]) -> str:
+        if a is None or b is None:
+            return "-"
+        return f"{a} → {b} ({(b - a) / a * 100:+.1f}%)" if a else f"{a} → {b}"
+
+    print(f"Karşılaştırma ({onceki.get('etiket') or onceki.get('baslangic')}):")
+    print(f"  verim (sipariş/sn): {fark(onceki.get('verim_siparis_s'), simdiki.get('verim_siparis_s'))}")
+    for alan in ("kuyruk_bekleme_ms", "uctan_uca_ms"):
+        for q in ("p50", "p99"):
+            print(f"  {alan} {q}: {fark(onceki.get(alan, {}).get(q), simdiki.get(alan, {}).get(q))}")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Sipariş motoru yük ve gecikme ölçümü.")
+    p.add_argument("--hiz", type=float, default=10, help="saniyedeki sipariş sayısı")
+    p.add_argument("--sure", type=float, default=30, help="yük üretme süresi (sn)")
+    p.add_argument("--bosalt", type=float, default=30, help="üretim bittikten sonra en fazla bekleme (sn)")
+    p.add_argument("--isci", type=int, default=ISCI_SAYISI, help="paralel işçi sayısı")
+    p.add_argument("--parti", type=int, default=PARTI_BOYUTU, help="transaction başına en fazla sipariş")
+    p.add_argument("--timeout", type=float, default=15, help="sipariş zaman aşımı (sn)")
+    p.add_argument("--gecikme", type=float, default=0, help="parti başına yapay işleme süresi (sn)")
+    p.add_argument("--premium-orani", type=float, default=0.3, help="Premium müşterilerden gelen sipariş oranı")
+    p.add_argument("--sicak-urun", type=int, default=5, help="sıcak (yoğun talep gören) ürün sayısı")
+    p.add_argument("--sicak-oran", type=float, default=0.5, help="sıcak ürünlere giden sipariş oranı")
+    p.add_argument("--adet-min", type=int, default=1)
+    p.add_argument("--adet-max", type=int, default=3)
+    p.add_argument("--tohum", type=int, default=None, help="rastgelelik tohumu (tekrarlanabilir koşular)")
+    p.add_argument("--depo", default=VARSAYILAN_DEPO, help="mysql, sqlite (bellek içi) ya da sqlite:dosya.db")
+    p.add_argument("--etiket", default="", help="koşuyu tanımlayan serbest metin")
+    p.add_argument("--cikti", help="sonuçların yazılacağı JSON dosyası")
+    p.add_argument("--karsilastir", help="önceki bir koşunun JSON dosyası")
+    args = p.parse_args(argv)
+
+    depo_sec(args.depo)
+    rapor = calistir(args)
+    print(json.dumps(rapor, ensure_ascii=False, indent=2))
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+    if args.karsilastir:
+        with open(args.karsilastir, encoding="utf-8") as f:
+            karsilastir(json.load(f), rapor)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple, Union
+
+
+# ===================== Depolama arayüzü =====================
+@dataclass
+class SiparisSonucu:
+    """Tamamlanan siparişin kesin OrderID'si ve güncel stok/müşteri değerleri."""
+    order_id: int
+    urun_id: int; stok: int
+    musteri_id: int; butce: float; toplam_harcama: float; musteri_tip: str
+
+
+class SiparisHatasi(RuntimeError):
+    """
+    Siparişin bir iş kuralı yüzünden reddi. kod makinece okunur nedendir;
+    çağıranlar hata metnine bakmadan buna göre dallanır.
+    """
+    STOK = "yetersiz_stok"
+    BUTCE = "yetersiz_butce"
+    URUN_YOK = "urun_yok"
+    MUSTERI_YOK = "musteri_yok"
+    GECERSIZ_ADET = "gecersiz_adet"
+
+    def __init__(self, kod: str, mesaj: str):
+        super().__init__(mesaj)
+        self.kod = kod
+
+
+class Depo(ABC):
+    """
+    Uygulamanın kullandığı veritabanı işlemleri. MySQL (depo_mysql) ve
+    SQLite (depo_sqlite) uygulamaları aynı satır biçimini (dict) döndürür.
+    """
+    ad = "?"
+
+    # ---- müşteriler
+    @abstractmethod
+    def musteri_listesi(self) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def musteri_getir(self, mid: int) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def musteri_sayisi(self) -> int:
+        ...
+
+    @abstractmethod
+    def musteri_ekle(self, ad: str, butce: float) -> int:
+        ...
+
+    @abstractmethod
+    def musteri_premium_ayarla(self, mid: int, toplam_harcama: Optional[float] = None):
+        """Müşteriyi Premium yapar; toplam_harcama verilirse TotalSpent'i de ayarlar."""
+
+    # ---- ürünler
+    @abstractmethod
+    def urunler(self) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def urun_idyle(self, pid: int) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def dusuk_stoklu_urunler(self, limit: int = 10) -> List[Dict]:
+        """Stoku en düşük `limit` ürün (Stock, ProductID sırasında); Products(Stock) indeksini kullanır."""
+
+    @abstractmethod
+    def urun_ekle(self, ad: str, stok: int, fiyat: float, kategori: str) -> int:
+        ...
+
+    @abstractmethod
+    def urun_stok_guncelle(self, pid: int, stok: int):
+        ...
+
+    @abstractmethod
+    def urun_sil(self, pid: int):
+        ...
+
+    @abstractmethod
+    def urun_sayisi(self) -> int:
+        ...
+
+    @abstractmethod
+    def urun_sayfasi(self, ilk_id: int = 0, limit: int = 1000) -> List[Dict]:
+        """ProductID >= ilk_id olan ilk `limit` ürün, ID sırasında (keyset sayfalama)."""
+
+    @abstractmethod
+    def urunleri_toplu_yaz(self, satirlar: List[Tuple[str, int, float, str]]) -> Tuple[int, int]:
+        """
+        (ProductName, Stock, Price, Category) satırlarını tek transaction'da ada
+        göre yazar: adı var olan ürünler güncellenir, diğerleri çok satırlı INSERT
+        ile eklenir. Aynı ad partide birden fazla geçerse son satır geçerlidir.
+        (eklenen, guncellenen) döner.
+        """
+
+    # ---- siparişler
+    @abstractmethod
+    def siparis_ver_ve_tamamla(self, musteri_id: int, urun_id: int, adet: int) -> SiparisSonucu:
+        ...
+
+    def siparisleri_toplu_tamamla(self, kalemler: List[Tuple[int, int, int]]
+                                  ) -> List[Union[SiparisSonucu, Exception]]:
+        """
+        (musteri_id, urun_id, adet) kalemlerini sırayla işler; her kalem için
+        SiparisSonucu ya da o kaleme ait hatayı döner. Varsayılan uygulama her
+        kalemi ayrı transaction'da işler; arka uçlar tek transaction'a indirger.
+        """
+        sonuclar: List[Union[SiparisSonucu, Exception]] = []
+        for mid, pid, adet in kalemler:
+            try:
+                sonuclar.append(self.siparis_ver_ve_tamamla(mid, pid, adet))
+            except Exception as e:
+                sonuclar.append(e)
+        return sonuclar
+
+    @abstractmethod
+    def musteri_paneli(self, ilk_id: int = 0, limit: int = 200) -> List[Dict]:
+        """
+        CustomerID >= ilk_id olan ilk `limit` müşteri (ID sırasında), bekleyen
+        siparişlerinin en uzun beklemesi ve en yüksek skoruyla (keyset sayfalama).
+        Alanlar: CustomerID, CustomerName, CustomerType, Budget, TotalSpent,
+        BeklemeSuresiSn, OncelikSkoru.
+        """
+
+    # ---- loglar
+    @abstractmethod
+    def loglari_yaz(self, satirlar: List[tuple]):
+        """(LogType, CustomerID, CustomerType, ProductName, Qty, ResultText, OrderID) satırları."""
+
+    # ---- yaşam döngüsü
+    def istatistik(self) -> Dict:
+        return {}
+
+    def kapat(self):
+        pass
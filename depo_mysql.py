@@ -0,0 +1,476 @@
+import time, threading
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple, Union
+
+import pymysql
+
+from depo import Depo, SiparisSonucu, SiparisHatasi
+from metrikler import METRIKLER
+
+
+# ===================== MySQL deposu =====================
+def baglanti_ac():
+    return pymysql.connect(
+        host="localhost",
+        user="root",
+        password="gulsuf201",
+        database="yeni_proje",
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.DictCursor,
+        autocommit=True,
+    )
+
+
+# Saklı yordamların SIGNAL SQLSTATE '45000' ile yükselttiği hatanın MySQL kodu
+ER_SIGNAL_EXCEPTION = 1644
+
+
+def sp_hatasi(e: pymysql.MySQLError) -> Exception:
+    """
+    sp_siparis_ver / sp_siparis_tamamla'nın SIGNAL hatasını neden kodlu
+    SiparisHatasi'na çevirir. Yordam yalnızca metin verdiğinden eşleme burada,
+    tek yerde yapılır; diğer MySQL hataları olduğu gibi döner.
+    """
+    if not e.args or e.args[0] != ER_SIGNAL_EXCEPTION:
+        return e
+    mesaj = str(e.args[1]) if len(e.args) > 1 else ""
+    m = mesaj.lower()
+    if "stock" in m or "stok" in m:
+        return SiparisHatasi(SiparisHatasi.STOK, mesaj)
+    if "balance" in m or "bakiye" in m or "budget" in m or "bütçe" in m:
+        return SiparisHatasi(SiparisHatasi.BUTCE, mesaj)
+    return e
+
+
+def ad_anahtari(ad: str) -> str:
+    """
+    ProductName'in MySQL'deki karşılaştırma anahtarı: utf8mb4 *_ci harmanlaması
+    büyük/küçük harfe, PAD SPACE de sondaki boşluklara bakmaz. Python tarafındaki
+    eşleme bununla yapılmazsa IN'in bulduğu ad partideki adla eşleşmez.
+    """
+    return ad.rstrip(" ").casefold()
+
+
+class BaglantiHavuzu:
+    """
+    Sınırlı boyutlu, thread-duyarlı bağlantı havuzu.
+    Aynı thread içindeki iç içe kullanımlar aynı bağlantıyı paylaşır; boşta uzun
+    kalan bağlantılar kapatılır, ödünç verilirken sağlık kontrolü (ping) yapılır.
+    """
+
+    def __init__(self, fabrika, max_boyut: int = 8, bosta_limit_s: float = 300.0,
+                 kontrol_esigi_s: float = 30.0, bekleme_limit_s: float = 10.0):
+        self._fabrika = fabrika
+        self.max_boyut = max_boyut
+        self.bosta_limit_s = bosta_limit_s
+        self.kontrol_esigi_s = kontrol_esigi_s
+        self.bekleme_limit_s = bekleme_limit_s
+        self._kosul = threading.Condition()
+        self._bosta: List[Tuple[object, float]] = []   # (bağlantı, son kullanım)
+        self._toplam = 0
+        self._yerel = threading.local()
+        self._istat = {
+            "olusturulan": 0, "yeniden_kullanim": 0, "kapatilan": 0,
+            "saglik_hatasi": 0, "bekleme_sayisi": 0,
+            "toplam_bekleme_s": 0.0, "max_bekleme_s": 0.0,
+        }
+
+    @contextmanager
+    def baglanti(self):
+        yerel = self._yerel
+        bag = getattr(yerel, "bag", None)
+        if bag is not None:
+            # Aynı thread zaten bir bağlantı tutuyor → onu paylaş
+            yerel.derinlik += 1
+            try:
+                yield bag
+            finally:
+                yerel.derinlik -= 1
+            return
+
+        bag = self._odunc_al()
+        yerel.bag, yerel.derinlik = bag, 1
+        try:
+            yield bag
+        finally:
+            yerel.bag, yerel.derinlik = None, 0
+            self._iade_et(bag)
+
+    def _odunc_al(self):
+        bekleme_bas = None
+        while True:
+            bag = None
+            yeni = False
+            with self._kosul:
+                self._bostakileri_temizle()
+                while not self._bosta and self._toplam >= self.max_boyut:
+                    if bekleme_bas is None:
+                        bekleme_bas = time.perf_counter()
+                    kalan = self.bekleme_limit_s - (time.perf_counter() - bekleme_bas)
+                    if kalan <= 0:
+                        raise TimeoutError("Bağlantı havuzu dolu, boş bağlantı beklenirken zaman aşımı")
+                    self._kosul.wait(kalan)
+                if bekleme_bas is not None:
+                    self._bekleme_kaydet(time.perf_counter() - bekleme_bas)
+                    bekleme_bas = None
+                if self._bosta:
+                    bag, son = self._bosta.pop()          # LIFO: en sıcak bağlantı
+                else:
+                    self._toplam += 1
+                    yeni = True
+
+            if yeni:
+                try:
+                    bag = self._fabrika()
+                except Exception:
+                    with self._kosul:
+                        self._toplam -= 1
+                        self._kosul.notify()
+                    raise
+                with self._kosul:
+                    self._istat["olusturulan"] += 1
+                return bag
+
+            if time.time() - son < self.kontrol_esigi_s or self._saglikli(bag):
+                with self._kosul:
+                    self._istat["yeniden_kullanim"] += 1
+                return bag
+
+            self._kapat(bag)
+            with self._kosul:
+                self._toplam -= 1
+                self._istat["saglik_hatasi"] += 1
+                self._kosul.notify()
+
+    def _iade_et(self, bag):
+        if not getattr(bag, "open", False):
+            with self._kosul:
+                self._toplam -= 1
+                self._istat["kapatilan"] += 1
+                self._kosul.notify()
+            return
+        with self._kosul:
+            self._bosta.append((bag, time.time()))
+            self._kosul.notify()
+
+    def _saglikli(self, bag) -> bool:
+        try:
+            bag.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _bostakileri_temizle(self):
+        # _kosul kilidi tutulurken çağrılır; liste eskiden yeniye sıralıdır.
+        sinir = time.time() - self.bosta_limit_s
+        while self._bosta and self._bosta[0][1] < sinir:
+            bag, _ = self._bosta.pop(0)
+            self._toplam -= 1
+            self._istat["kapatilan"] += 1
+            self._kapat(bag)
+
+    def _bekleme_kaydet(self, sure: float):
+        self._istat["bekleme_sayisi"] += 1
+        self._istat["toplam_bekleme_s"] += sure
+        self._istat["max_bekleme_s"] = max(self._istat["max_bekleme_s"], sure)
+
+    @staticmethod
+    def _kapat(bag):
+        try:
+            bag.close()
+        except Exception:
+            pass
+
+    def istatistik(self) -> Dict:
+        with self._kosul:
+            d = dict(self._istat)
+            d["boyut"] = self._toplam
+            d["bosta"] = len(self._bosta)
+            d["kullanimda"] = self._toplam - len(self._bosta)
+            d["max_boyut"] = self.max_boyut
+        d["ort_bekleme_s"] = d["toplam_bekleme_s"] / d["bekleme_sayisi"] if d["bekleme_sayisi"] else 0.0
+        return d
+
+    def kapat(self):
+        with self._kosul:
+            bostakiler, self._bosta = self._bosta, []
+            self._toplam -= len(bostakiler)
+            self._istat["kapatilan"] += len(bostakiler)
+        for bag, _ in bostakiler:
+            self._kapat(bag)
+
+
+class MySQLDepo(Depo):
+    """Yerel MySQL veritabanı; saklı yordamlar ve vw_siparis_oncelik kullanılır."""
+    ad = "mysql"
+
+    def __init__(self, fabrika=baglanti_ac, **havuz_ayarlari):
+        self.havuz = BaglantiHavuzu(fabrika, **havuz_ayarlari)
+
+    def baglanti(self):
+        """Havuzdan (thread başına) bir bağlantı ödünç alan context manager."""
+        return self.havuz.baglanti()
+
+    # ---- müşteriler
+    def musteri_listesi(self) -> List[Dict]:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("""
+                SELECT CustomerID, CustomerName, CustomerType, Budget, TotalSpent
+                FROM Customers ORDER BY CustomerID
+            """)
+            return cur.fetchall()
+
+    def musteri_getir(self, mid: int) -> Optional[Dict]:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("""
+                SELECT CustomerID, CustomerName, CustomerType, Budget, TotalSpent
+                FROM Customers WHERE CustomerID=%s
+            """, (mid,))
+            return cur.fetchone()
+
+    def musteri_sayisi(self) -> int:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("SELECT COUNT(*) AS c FROM Customers")
+            return int(cur.fetchone()["c"])
+
+    def musteri_ekle(self, ad: str, butce: float) -> int:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO Customers(CustomerName, Budget, CustomerType, TotalSpent)
+                VALUES (%s, %s, 'Standard', 0.00)
+                """,
+                (ad, butce)
+            )
+            return cur.lastrowid
+
+    def musteri_premium_ayarla(self, mid: int, toplam_harcama: Optional[float] = None):
+        with self.baglanti() as bag, bag.cursor() as cur:
+            if toplam_harcama is None:
+                cur.execute("""
+                    UPDATE Customers
+                    SET CustomerType='Premium'
+                    WHERE CustomerID=%s
+                """, (mid,))
+            else:
+                cur.execute(
+                    """
+                    UPDATE Customers
+                       SET CustomerType = 'Premium',
+                           TotalSpent   = %s
+                     WHERE CustomerID   = %s
+                    """,
+                    (toplam_harcama, mid)
+                )
+
+    # ---- ürünler
+    def urunler(self) -> List[Dict]:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("SELECT ProductID, ProductName, Stock, Price, Category FROM Products ORDER BY ProductID")
+            return cur.fetchall()
+
+    def urun_idyle(self, pid: int) -> Optional[Dict]:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("""
+                SELECT ProductID, ProductName, Stock, Price, Category
+                FROM Products WHERE ProductID=%s
+            """, (pid,))
+            return cur.fetchone()
+
+    def dusuk_stoklu_urunler(self, limit: int = 10) -> List[Dict]:
+        # Products(Stock) üzerinde indeks varsa tablo taranmaz, ilk `limit` satır okunur
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("""
+                SELECT ProductID, ProductName, Stock, Price, Category
+                FROM Products ORDER BY Stock, ProductID LIMIT %s
+            """, (limit,))
+            return cur.fetchall()
+
+    def urun_ekle(self, ad: str, stok: int, fiyat: float, kategori: str) -> int:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("""
+                INSERT INTO Products (ProductName, Stock, Price, Category)
+                VALUES (%s, %s, %s, %s)
+            """, (ad, stok, fiyat, kategori))
+            return cur.lastrowid
+
+    def urun_stok_guncelle(self, pid: int, stok: int):
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("UPDATE Products SET Stock=%s WHERE ProductID=%s", (stok, pid))
+
+    def urun_sil(self, pid: int):
+        with self.baglanti() as bag, bag.cursor() as cur:
+            # Order bağımlılığı varsa RESTRICT olabilir; hata yakalayalım
+            cur.execute("DELETE FROM Products WHERE ProductID=%s", (pid,))
+
+    # ---- siparişler
+    @staticmethod
+    def _siparis_kalemi(cur, musteri_id: int, urun_id: int, adet: int) -> SiparisSonucu:
+        """Açık transaction içinde siparişi oluşturup tamamlar (commit çağıranın işidir)."""
+        try:
+            return MySQLDepo._siparis_kalemi_isle(cur, musteri_id, urun_id, adet)
+        except pymysql.MySQLError as e:
+            hata = sp_hatasi(e)
+            if hata is e:
+                raise
+            raise hata from e
+
+    @staticmethod
+    def _siparis_kalemi_isle(cur, musteri_id: int, urun_id: int, adet: int) -> SiparisSonucu:
+        # sp_siparis_ver OrderID döndürmez ve LAST_INSERT_ID() prosedürün son
+        # INSERT'ine (başka bir tablo olabilir) aittir. Bu yüzden yordamdan önce
+        # müşterinin son OrderID'si okunur; müşteri başına siparişler sıralı
+        # işlendiğinden sonrasında oluşan tek sipariş budur. Tam bir aday yoksa
+        # tahmin edilmez, hata yükselir.
+        with METRIKLER.olc("siparis_onceki_id"):
+            cur.execute("SELECT COALESCE(MAX(OrderID), 0) AS son FROM Orders WHERE CustomerID=%s",
+                        (musteri_id,))
+            onceki = int(cur.fetchone()["son"])
+        with METRIKLER.olc("sp_siparis_ver"):
+            cur.callproc("sp_siparis_ver", (musteri_id, urun_id, adet))
+        cur.execute("SELECT OrderID FROM Orders WHERE CustomerID=%s AND OrderID>%s",
+                    (musteri_id, onceki))
+        adaylar = cur.fetchall()
+        if len(adaylar) != 1:
+            raise RuntimeError(f"Oluşturulan sipariş belirlenemedi ({len(adaylar)} aday)")
+        order_id = int(adaylar[0]["OrderID"])
+
+        with METRIKLER.olc("sp_siparis_tamamla"):
+            cur.callproc("sp_siparis_tamamla", (order_id,))
+        cur.execute("""
+            SELECT p.Stock, c.Budget, c.TotalSpent, c.CustomerType
+              FROM Products p JOIN Customers c ON c.CustomerID=%s
+             WHERE p.ProductID=%s
+        """, (musteri_id, urun_id))
+        d = cur.fetchone()
+        return SiparisSonucu(
+            order_id=order_id,
+            urun_id=urun_id, stok=int(d["Stock"]),
+            musteri_id=musteri_id, butce=float(d["Budget"]),
+            toplam_harcama=float(d["TotalSpent"]), musteri_tip=d["CustomerType"],
+        )
+
+    def siparis_ver_ve_tamamla(self, musteri_id: int, urun_id: int, adet: int) -> SiparisSonucu:
+        """
+        Siparişi tek bağlantıda, tek transaction içinde oluşturur ve tamamlar.
+        OrderID, müşterinin bu transaction'da oluşan bekleyen siparişinden okunur.
+        """
+        with self.baglanti() as bag:
+            bag.begin()
+            try:
+                with bag.cursor() as cur:
+                    sonuc = self._siparis_kalemi(cur, musteri_id, urun_id, adet)
+                bag.commit()
+            except Exception:
+                bag.rollback()
+                raise
+        return sonuc
+
+    def siparisleri_toplu_tamamla(self, kalemler: List[Tuple[int, int, int]]
+                                  ) -> List[Union[SiparisSonucu, Exception]]:
+        """
+        Tüm kalemleri tek transaction ve tek COMMIT ile işler. Her kalem kendi
+        SAVEPOINT'inde çalışır: stok/bakiye hatası yalnızca o kalemi geri alır.
+        SAVEPOINT'e dönülemiyorsa (ör. deadlock transaction'ı bitirdiyse) tüm
+        parti geri alınır ve hata yükseltilir.
+        """
+        sonuclar: List[Union[SiparisSonucu, Exception]] = []
+        with self.baglanti() as bag:
+            bag.begin()
+            try:
+                with bag.cursor() as cur:
+                    for mid, pid, adet in kalemler:
+                        cur.execute("SAVEPOINT kalem")
+                        try:
+                            sonuclar.append(self._siparis_kalemi(cur, mid, pid, adet))
+                        except (pymysql.MySQLError, RuntimeError) as e:
+                            cur.execute("ROLLBACK TO SAVEPOINT kalem")
+                            sonuclar.append(e)
+                        else:
+                            cur.execute("RELEASE SAVEPOINT kalem")
+                bag.commit()
+            except Exception:
+                bag.rollback()
+                raise
+        return sonuclar
+
+    def musteri_paneli(self, ilk_id: int = 0, limit: int = 200) -> List[Dict]:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("""
+                SELECT c.CustomerID, c.CustomerName, c.CustomerType, c.Budget, c.TotalSpent,
+                       COALESCE(v.Bekleme, 0) AS BeklemeSuresiSn,
+                       COALESCE(v.Skor, 0)    AS OncelikSkoru
+                  FROM Customers c
+                  LEFT JOIN (SELECT CustomerID, MAX(BeklemeSuresiSn) AS Bekleme, MAX(OncelikSkoru) AS Skor
+                               FROM vw_siparis_oncelik
+                              WHERE CustomerID >= %s
+                              GROUP BY CustomerID) v ON v.CustomerID = c.CustomerID
+                 WHERE c.CustomerID >= %s
+                 ORDER BY c.CustomerID
+                 LIMIT %s
+            """, (ilk_id, ilk_id, limit))
+            return cur.fetchall()
+
+    # ---- loglar
+    def loglari_yaz(self, satirlar: List[tuple]):
+        with self.baglanti() as bag, bag.cursor() as cur:
+            # pymysql executemany, INSERT ... VALUES için tek çok satırlı sorgu üretir
+            cur.executemany("""
+                INSERT INTO Logs (LogType, CustomerID, CustomerType, ProductName, Qty, ResultText, OrderID)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, satirlar)
+
+    # ---- toplu ürün aktarımı
+    def urun_sayisi(self) -> int:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("SELECT COUNT(*) AS c FROM Products")
+            return int(cur.fetchone()["c"])
+
+    def urun_sayfasi(self, ilk_id: int = 0, limit: int = 1000) -> List[Dict]:
+        with self.baglanti() as bag, bag.cursor() as cur:
+            cur.execute("""
+                SELECT ProductID, ProductName, Stock, Price, Category
+                FROM Products WHERE ProductID >= %s ORDER BY ProductID LIMIT %s
+            """, (ilk_id, limit))
+            return cur.fetchall()
+
+    def urunleri_toplu_yaz(self, satirlar: List[Tuple[str, int, float, str]]) -> Tuple[int, int]:
+        # Partideki tekrarlar da veritabanının gördüğü gibi birleştirilir: son satır geçerlidir
+        son = {ad_anahtari(s[0]): s for s in satirlar}
+        if not son:
+            return 0, 0
+        with self.baglanti() as bag:
+            bag.begin()
+            try:
+                with bag.cursor() as cur:
+                    adlar = [s[0] for s in son.values()]
+                    cur.execute("SELECT DISTINCT ProductName FROM Products WHERE ProductName IN (%s)"
+                                % ", ".join(["%s"] * len(adlar)), adlar)
+                    mevcut = {ad_anahtari(r["ProductName"]) for r in cur.fetchall()}
+                    guncel = [s for a, s in son.items() if a in mevcut]
+                    yeni = [s for a, s in son.items() if a not in mevcut]
+                    if guncel:
+                        # Tek UPDATE: partinin değerleri türetilmiş tabloyla ada göre eşlenir
+                        degerler = " UNION ALL ".join(
+                            ["SELECT %s AS ProductName, %s AS Stock, %s AS Price, %s AS Category"] * len(guncel))
+                        cur.execute(f"""
+                            UPDATE Products p JOIN ({degerler}) v ON v.ProductName = p.ProductName
+                               SET p.Stock = v.Stock, p.Price = v.Price, p.Category = v.Category
+                        """, [x for s in guncel for x in s])
+                    if yeni:
+                        cur.executemany("""
+                            INSERT INTO Products (ProductName, Stock, Price, Category)
+                            VALUES (%s, %s, %s, %s)
+                        """, yeni)
+                bag.commit()
+            except Exception:
+                bag.rollback()
+                raise
+        return len(yeni), len(guncel)
+
+    # ---- yaşam döngüsü
+    def istatistik(self) -> Dict:
+        return self.havuz.istatistik()
+
+    def kapat(self):
+        self.havuz.kapat()
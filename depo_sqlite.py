@@ -0,0 +1,326 @@
+import sqlite3, threading, time, random
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple, Union
+
+from depo import Depo, SiparisSonucu, SiparisHatasi
+from metrikler import METRIKLER
+
+
+# ===================== SQLite deposu =====================
+# MySQL şemasının, saklı yordamların (sp_siparis_ver / sp_siparis_tamamla) ve
+# vw_siparis_oncelik görünümünün gömülü karşılığı. Sunucu gerektirmediği için
+# benchmark ve başsız çalıştırmalar her makinede koşabilir.
+SEMA = """
+CREATE TABLE IF NOT EXISTS Customers (
+    CustomerID   INTEGER PRIMARY KEY AUTOINCREMENT,
+    CustomerName TEXT    NOT NULL,
+    Budget       REAL    NOT NULL DEFAULT 0,
+    CustomerType TEXT    NOT NULL DEFAULT 'Standard',
+    TotalSpent   REAL    NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS Products (
+    ProductID   INTEGER PRIMARY KEY AUTOINCREMENT,
+    ProductName TEXT    NOT NULL,
+    Stock       INTEGER NOT NULL DEFAULT 0,
+    Price       REAL    NOT NULL DEFAULT 0,
+    Category    TEXT
+);
+CREATE TABLE IF NOT EXISTS Orders (
+    OrderID     INTEGER PRIMARY KEY AUTOINCREMENT,
+    CustomerID  INTEGER NOT NULL REFERENCES Customers(CustomerID),
+    ProductID   INTEGER NOT NULL REFERENCES Products(ProductID),
+    Quantity    INTEGER NOT NULL,
+    TotalPrice  REAL    NOT NULL,
+    OrderDate   REAL    NOT NULL,              -- unix zamanı (sn)
+    OrderStatus TEXT    NOT NULL DEFAULT 'Pending'
+);
+CREATE TABLE IF NOT EXISTS Logs (
+    LogID        INTEGER PRIMARY KEY AUTOINCREMENT,
+    LogType      TEXT,
+    CustomerID   INTEGER,
+    CustomerType TEXT,
+    ProductName  TEXT,
+    Qty          INTEGER,
+    ResultText   TEXT,
+    OrderID      INTEGER,
+    LogDate      TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_orders_durum ON Orders(OrderStatus, CustomerID);
+CREATE INDEX IF NOT EXISTS idx_products_stok ON Products(Stock, ProductID);
+CREATE INDEX IF NOT EXISTS idx_products_ad ON Products(ProductName);
+CREATE VIEW IF NOT EXISTS vw_siparis_oncelik AS
+SELECT o.OrderID, c.CustomerID, c.CustomerName, c.CustomerType,
+       CAST(MAX(0, CAST(strftime('%s', 'now') AS REAL) - o.OrderDate) AS INTEGER) AS BeklemeSuresiSn,
+       (CASE WHEN c.CustomerType = 'Premium' THEN 20 ELSE 10 END)
+         + 0.5 * MAX(0, CAST(strftime('%s', 'now') AS REAL) - o.OrderDate) AS OncelikSkoru
+  FROM Orders o JOIN Customers c ON c.CustomerID = o.CustomerID
+ WHERE o.OrderStatus = 'Pending';
+"""
+
+ORNEK_KATEGORILER = ["Giyim", "Ayakkabı", "Çanta", "Saat & Aksesuar", "Spor & Outdoor", "Elektronik"]
+
+
+class SQLiteDepo(Depo):
+    """
+    Gömülü SQLite deposu (":memory:" ya da dosya). Tek bağlantı tüm
+    thread'lerce paylaşılır ve bir kilitle sıralanır; SQLite zaten tek
+    yazıcıya izin verdiği için bu, MySQL'deki satır kilitlerinin yerini tutar.
+    """
+    ad = "sqlite"
+
+    def __init__(self, yol: str = ":memory:", ornek_veri: bool = True,
+                 ornek_urun: int = 60, ornek_musteri: int = 50):
+        self.yol = yol
+        self._kilit = threading.RLock()
+        self._bag = sqlite3.connect(yol, check_same_thread=False, isolation_level=None)
+        self._bag.row_factory = sqlite3.Row
+        self._bag.execute("PRAGMA foreign_keys = ON")
+        if yol != ":memory:":
+            self._bag.execute("PRAGMA journal_mode = WAL")
+        self._bag.executescript(SEMA)
+        if ornek_veri:
+            self._ornek_veri(ornek_urun, ornek_musteri)
+
+    def _ornek_veri(self, urun_sayisi: int, musteri_sayisi: int):
+        """Boş veritabanına tekrarlanabilir örnek ürün ve müşteri ekler."""
+        rnd = random.Random(42)
+        with self._islem() as cur:
+            if cur.execute("SELECT COUNT(*) FROM Products").fetchone()[0] == 0:
+                cur.executemany(
+                    "INSERT INTO Products (ProductName, Stock, Price, Category) VALUES (?, ?, ?, ?)",
+                    [(f"{ORNEK_KATEGORILER[i % len(ORNEK_KATEGORILER)]} Ürün {i + 1}",
+                      rnd.randint(20, 200), round(rnd.uniform(50, 500), 2),
+                      ORNEK_KATEGORILER[i % len(ORNEK_KATEGORILER)])
+                     for i in range(urun_sayisi)])
+            if cur.execute("SELECT COUNT(*) FROM Customers").fetchone()[0] == 0:
+                cur.executemany(
+                    "INSERT INTO Customers (CustomerName, Budget, CustomerType, TotalSpent) VALUES (?, ?, ?, ?)",
+                    [(f"Müşteri {i + 1}", rnd.randint(5000, 50000),
+                      "Premium" if i % 5 == 0 else "Standard",
+                      rnd.randint(2000, 5000) if i % 5 == 0 else 0)
+                     for i in range(musteri_sayisi)])
+
+    @contextmanager
+    def _islem(self):
+        """Kilit altında BEGIN IMMEDIATE ... COMMIT; hata olursa ROLLBACK."""
+        with self._kilit:
+            cur = self._bag.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+            else:
+                cur.execute("COMMIT")
+            finally:
+                cur.close()
+
+    def _hepsi(self, sql: str, params=()) -> List[Dict]:
+        with self._kilit:
+            return [dict(r) for r in self._bag.execute(sql, params).fetchall()]
+
+    def _bir(self, sql: str, params=()) -> Optional[Dict]:
+        with self._kilit:
+            r = self._bag.execute(sql, params).fetchone()
+        return dict(r) if r is not None else None
+
+    # ---- müşteriler
+    def musteri_listesi(self) -> List[Dict]:
+        return self._hepsi("""
+            SELECT CustomerID, CustomerName, CustomerType, Budget, TotalSpent
+            FROM Customers ORDER BY CustomerID
+        """)
+
+    def musteri_getir(self, mid: int) -> Optional[Dict]:
+        return self._bir("""
+            SELECT CustomerID, CustomerName, CustomerType, Budget, TotalSpent
+            FROM Customers WHERE CustomerID=?
+        """, (mid,))
+
+    def musteri_sayisi(self) -> int:
+        return int(self._bir("SELECT COUNT(*) AS c FROM Customers")["c"])
+
+    def musteri_ekle(self, ad: str, butce: float) -> int:
+        with self._islem() as cur:
+            cur.execute("""
+                INSERT INTO Customers(CustomerName, Budget, CustomerType, TotalSpent)
+                VALUES (?, ?, 'Standard', 0.00)
+            """, (ad, butce))
+            return cur.lastrowid
+
+    def musteri_premium_ayarla(self, mid: int, toplam_harcama: Optional[float] = None):
+        with self._islem() as cur:
+            if toplam_harcama is None:
+                cur.execute("UPDATE Customers SET CustomerType='Premium' WHERE CustomerID=?", (mid,))
+            else:
+                cur.execute("UPDATE Customers SET CustomerType='Premium', TotalSpent=? WHERE CustomerID=?",
+                            (toplam_harcama, mid))
+
+    # ---- ürünler
+    def urunler(self) -> List[Dict]:
+        return self._hepsi("SELECT ProductID, ProductName, Stock, Price, Category FROM Products ORDER BY ProductID")
+
+    def urun_idyle(self, pid: int) -> Optional[Dict]:
+        return self._bir("""
+            SELECT ProductID, ProductName, Stock, Price, Category
+            FROM Products WHERE ProductID=?
+        """, (pid,))
+
+    def dusuk_stoklu_urunler(self, limit: int = 10) -> List[Dict]:
+        return self._hepsi("""
+            SELECT ProductID, ProductName, Stock, Price, Category
+            FROM Products ORDER BY Stock, ProductID LIMIT ?
+        """, (limit,))
+
+    def urun_ekle(self, ad: str, stok: int, fiyat: float, kategori: str) -> int:
+        with self._islem() as cur:
+            cur.execute("INSERT INTO Products (ProductName, Stock, Price, Category) VALUES (?, ?, ?, ?)",
+                        (ad, stok, fiyat, kategori))
+            return cur.lastrowid
+
+    def urun_stok_guncelle(self, pid: int, stok: int):
+        with self._islem() as cur:
+            cur.execute("UPDATE Products SET Stock=? WHERE ProductID=?", (stok, pid))
+
+    def urun_sil(self, pid: int):
+        with self._islem() as cur:
+            # Orders yabancı anahtarı MySQL'deki RESTRICT gibi davranır
+            cur.execute("DELETE FROM Products WHERE ProductID=?", (pid,))
+
+    # ---- siparişler (saklı yordamların karşılığı)
+    @staticmethod
+    def _sp_siparis_ver(cur, musteri_id: int, urun_id: int, adet: int) -> int:
+        if adet <= 0:
+            raise SiparisHatasi(SiparisHatasi.GECERSIZ_ADET, "Geçersiz adet")
+        u = cur.execute("SELECT Stock, Price FROM Products WHERE ProductID=?", (urun_id,)).fetchone()
+        if u is None:
+            raise SiparisHatasi(SiparisHatasi.URUN_YOK, "Ürün bulunamadı")
+        m = cur.execute("SELECT Budget FROM Customers WHERE CustomerID=?", (musteri_id,)).fetchone()
+        if m is None:
+            raise SiparisHatasi(SiparisHatasi.MUSTERI_YOK, "Müşteri bulunamadı")
+        tutar = float(u["Price"]) * adet
+        if u["Stock"] < adet:
+            raise SiparisHatasi(SiparisHatasi.STOK, "Yetersiz stok")
+        if float(m["Budget"]) < tutar:
+            raise SiparisHatasi(SiparisHatasi.BUTCE, "Yetersiz bakiye")
+        cur.execute("""
+            INSERT INTO Orders (CustomerID, ProductID, Quantity, TotalPrice, OrderDate, OrderStatus)
+            VALUES (?, ?, ?, ?, ?, 'Pending')
+        """, (musteri_id, urun_id, adet, tutar, time.time()))
+        return cur.lastrowid
+
+    @staticmethod
+    def _sp_siparis_tamamla(cur, order_id: int):
+        o = cur.execute("""
+            SELECT CustomerID, ProductID, Quantity, TotalPrice FROM Orders
+             WHERE OrderID=? AND OrderStatus='Pending'
+        """, (order_id,)).fetchone()
+        if o is None:
+            raise RuntimeError(f"Bekleyen sipariş bulunamadı: {order_id}")
+        cur.execute("UPDATE Products SET Stock = Stock - ? WHERE ProductID=? AND Stock >= ?",
+                    (o["Quantity"], o["ProductID"], o["Quantity"]))
+        if cur.rowcount != 1:
+            raise SiparisHatasi(SiparisHatasi.STOK, "Yetersiz stok")
+        cur.execute("""
+            UPDATE Customers SET Budget = Budget - ?, TotalSpent = TotalSpent + ?
+             WHERE CustomerID=? AND Budget >= ?
+        """, (o["TotalPrice"], o["TotalPrice"], o["CustomerID"], o["TotalPrice"]))
+        if cur.rowcount != 1:
+            raise SiparisHatasi(SiparisHatasi.BUTCE, "Yetersiz bakiye")
+        cur.execute("UPDATE Orders SET OrderStatus='Completed' WHERE OrderID=?", (order_id,))
+
+    def _siparis_kalemi(self, cur, musteri_id: int, urun_id: int, adet: int) -> SiparisSonucu:
+        with METRIKLER.olc("sp_siparis_ver"):
+            order_id = self._sp_siparis_ver(cur, musteri_id, urun_id, adet)
+        with METRIKLER.olc("sp_siparis_tamamla"):
+            self._sp_siparis_tamamla(cur, order_id)
+        d = cur.execute("""
+            SELECT p.Stock, c.Budget, c.TotalSpent, c.CustomerType
+              FROM Products p JOIN Customers c ON c.CustomerID=?
+             WHERE p.ProductID=?
+        """, (musteri_id, urun_id)).fetchone()
+        return SiparisSonucu(
+            order_id=order_id,
+            urun_id=urun_id, stok=int(d["Stock"]),
+            musteri_id=musteri_id, butce=float(d["Budget"]),
+            toplam_harcama=float(d["TotalSpent"]), musteri_tip=d["CustomerType"],
+        )
+
+    def siparis_ver_ve_tamamla(self, musteri_id: int, urun_id: int, adet: int) -> SiparisSonucu:
+        with self._islem() as cur:
+            return self._siparis_kalemi(cur, musteri_id, urun_id, adet)
+
+    def siparisleri_toplu_tamamla(self, kalemler: List[Tuple[int, int, int]]
+                                  ) -> List[Union[SiparisSonucu, Exception]]:
+        """Tek transaction, kalem başına SAVEPOINT (hatalı kalem tek başına geri alınır)."""
+        sonuclar: List[Union[SiparisSonucu, Exception]] = []
+        with self._islem() as cur:
+            for mid, pid, adet in kalemler:
+                cur.execute("SAVEPOINT kalem")
+                try:
+                    sonuclar.append(self._siparis_kalemi(cur, mid, pid, adet))
+                except RuntimeError as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT kalem")
+                    sonuclar.append(e)
+                cur.execute("RELEASE SAVEPOINT kalem")
+        return sonuclar
+
+    def musteri_paneli(self, ilk_id: int = 0, limit: int = 200) -> List[Dict]:
+        return self._hepsi("""
+            SELECT c.CustomerID, c.CustomerName, c.CustomerType, c.Budget, c.TotalSpent,
+                   COALESCE(v.Bekleme, 0) AS BeklemeSuresiSn,
+                   COALESCE(v.Skor, 0)    AS OncelikSkoru
+              FROM Customers c
+              LEFT JOIN (SELECT CustomerID, MAX(BeklemeSuresiSn) AS Bekleme, MAX(OncelikSkoru) AS Skor
+                           FROM vw_siparis_oncelik
+                          WHERE CustomerID >= ?
+                          GROUP BY CustomerID) v ON v.CustomerID = c.CustomerID
+             WHERE c.CustomerID >= ?
+             ORDER BY c.CustomerID
+             LIMIT ?
+        """, (ilk_id, ilk_id, limit))
+
+    # ---- loglar
+    def loglari_yaz(self, satirlar: List[tuple]):
+        with self._islem() as cur:
+            cur.executemany("""
+                INSERT INTO Logs (LogType, CustomerID, CustomerType, ProductName, Qty, ResultText, OrderID)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, satirlar)
+
+    # ---- toplu ürün aktarımı
+    def urun_sayisi(self) -> int:
+        return int(self._bir("SELECT COUNT(*) AS c FROM Products")["c"])
+
+    def urun_sayfasi(self, ilk_id: int = 0, limit: int = 1000) -> List[Dict]:
+        return self._hepsi("""
+            SELECT ProductID, ProductName, Stock, Price, Category
+            FROM Products WHERE ProductID >= ? ORDER BY ProductID LIMIT ?
+        """, (ilk_id, limit))
+
+    def urunleri_toplu_yaz(self, satirlar: List[Tuple[str, int, float, str]]) -> Tuple[int, int]:
+        son = {s[0]: s for s in satirlar}
+        adlar = list(son)
+        with self._islem() as cur:
+            mevcut = set()
+            # SQLite'ın sorgu başına parametre sınırı için IN listesi bölünür
+            for i in range(0, len(adlar), 500):
+                dilim = adlar[i:i + 500]
+                cur.execute("SELECT DISTINCT ProductName FROM Products WHERE ProductName IN (%s)"
+                            % ", ".join("?" * len(dilim)), dilim)
+                mevcut.update(r["ProductName"] for r in cur.fetchall())
+            guncel = [son[ad] for ad in adlar if ad in mevcut]
+            yeni = [son[ad] for ad in adlar if ad not in mevcut]
+            cur.executemany("UPDATE Products SET Stock=?, Price=?, Category=? WHERE ProductName=?",
+                            [(s[1], s[2], s[3], s[0]) for s in guncel])
+            cur.executemany("INSERT INTO Products (ProductName, Stock, Price, Category) VALUES (?, ?, ?, ?)", yeni)
+        return len(yeni), len(guncel)
+
+    # ---- yaşam döngüsü
+    def istatistik(self) -> Dict:
+        return {"depo": self.ad, "yol": self.yol}
+
+    def kapat(self):
+        with self._kilit:
+            self._bag.close()
@@ -0,0 +1,146 @@
+import time, json, bisect, threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+# ===================== Ölçüm (histogram / sayaç) =====================
+def _kova_sinirlari() -> List[float]:
+    # 0.05 ms … ~100 s arası geometrik kovalar (her kova ~%20 geniş)
+    sinirlar, s = [], 0.00005
+    while s < 100.0:
+        sinirlar.append(s)
+        s *= 1.2
+    return sinirlar
+
+
+KOVA_SINIRLARI = _kova_sinirlari()
+
+
+class Histogram:
+    """
+    Sabit, log-ölçekli kovalarla gecikme histogramı. ekle() O(log k) ve
+    bellek sabittir; yüzdelikler kova üst sınırından (~%20 hassasiyetle) okunur.
+    """
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._kovalar = [0] * (len(KOVA_SINIRLARI) + 1)
+        self.sayi = 0
+        self.toplam = 0.0
+        self.en_buyuk = 0.0
+
+    def ekle(self, sure_s: float):
+        i = bisect.bisect_left(KOVA_SINIRLARI, sure_s)
+        with self._kilit:
+            self._kovalar[i] += 1
+            self.sayi += 1
+            self.toplam += sure_s
+            if sure_s > self.en_buyuk:
+                self.en_buyuk = sure_s
+
+    def _yuzdelik(self, kovalar: List[int], sayi: int, q: float) -> float:
+        hedef = q * sayi
+        birikimli = 0
+        for i, n in enumerate(kovalar):
+            birikimli += n
+            if birikimli >= hedef:
+                return KOVA_SINIRLARI[i] if i < len(KOVA_SINIRLARI) else self.en_buyuk
+        return self.en_buyuk
+
+    def ozet(self) -> Dict[str, float]:
+        with self._kilit:
+            kovalar, sayi, toplam, en_buyuk = list(self._kovalar), self.sayi, self.toplam, self.en_buyuk
+        if not sayi:
+            return {"sayi": 0}
+
+        def ms(s: float) -> float:
+            return round(min(s, en_buyuk) * 1000.0, 2)
+
+        return {
+            "sayi": sayi,
+            "ort_ms": round(toplam / sayi * 1000.0, 2),
+            "p50_ms": ms(self._yuzdelik(kovalar, sayi, 0.50)),
+            "p90_ms": ms(self._yuzdelik(kovalar, sayi, 0.90)),
+            "p99_ms": ms(self._yuzdelik(kovalar, sayi, 0.99)),
+            "max_ms": round(en_buyuk * 1000.0, 2),
+        }
+
+
+class Metrikler:
+    """Aşama süreleri (histogram), sayaçlar ve anlık göstergeler için kayıt."""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._histogramlar: Dict[str, Histogram] = {}
+        self._sayaclar: Dict[str, int] = {}
+        self._gostergeler: Dict[str, float] = {}
+        self._baslangic = time.time()
+        self._son_hiz = (time.monotonic(), 0)
+
+    def _histogram(self, asama: str) -> Histogram:
+        h = self._histogramlar.get(asama)
+        if h is None:
+            with self._kilit:
+                h = self._histogramlar.setdefault(asama, Histogram())
+        return h
+
+    def sure_ekle(self, asama: str, sure_s: float):
+        self._histogram(asama).ekle(sure_s)
+
+    @contextmanager
+    def olc(self, asama: str):
+        bas = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._histogram(asama).ekle(time.perf_counter() - bas)
+
+    def say(self, ad: str, n: int = 1):
+        with self._kilit:
+            self._sayaclar[ad] = self._sayaclar.get(ad, 0) + n
+
+    def gosterge(self, ad: str, deger: float):
+        self._gostergeler[ad] = deger
+
+    def sayac(self, ad: str) -> int:
+        return self._sayaclar.get(ad, 0)
+
+    def siparis_hizi(self) -> float:
+        """Bir önceki çağrıdan bu yana tamamlanan sipariş/sn."""
+        simdi, n = time.monotonic(), self.sayac("siparis_tamamlanan")
+        onceki_t, onceki_n = self._son_hiz
+        self._son_hiz = (simdi, n)
+        return (n - onceki_n) / (simdi - onceki_t) if simdi > onceki_t else 0.0
+
+    def ozet(self) -> Dict:
+        with self._kilit:
+            histogramlar = dict(self._histogramlar)
+            sayaclar = dict(self._sayaclar)
+        gecen = max(1e-9, time.time() - self._baslangic)
+        return {
+            "calisma_s": round(gecen, 1),
+            "ort_siparis_s": round(sayaclar.get("siparis_tamamlanan", 0) / gecen, 3),
+            "sayaclar": sayaclar,
+            "gostergeler": dict(self._gostergeler),
+            "asamalar": {ad: h.ozet() for ad, h in sorted(histogramlar.items())},
+        }
+
+    def sifirla(self):
+        with self._kilit:
+            self._histogramlar.clear()
+            self._sayaclar.clear()
+            self._gostergeler.clear()
+            self._baslangic = time.time()
+            self._son_hiz = (time.monotonic(), 0)
+
+    def disa_aktar(self, yol: str, ek: Optional[Dict] = None):
+        """Özeti (ve varsa ek istatistikleri) JSON dosyasına yazar."""
+        veri = self.ozet()
+        veri["zaman"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        if ek:
+            veri.update(ek)
+        with open(yol, "w", encoding="utf-8") as f:
+            json.dump(veri, f, ensure_ascii=False, indent=2)
+
+
+METRIKLER = Metrikler()
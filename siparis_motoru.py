@@ -0,0 +1,804 @@
+import sys, time, random, threading, heapq, itertools, argparse, traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Callable
+
+from veritabani import (
+    KATALOG, MUSTERILER, musteri_listesi, siparis_ver_ve_tamamla, siparisleri_toplu_tamamla, premium_yap,
+    log_yaz, kaynaklari_kapat, depo_sec,
+)
+from depo import SiparisSonucu, SiparisHatasi
+from metrikler import METRIKLER
+
+
+# ===================== Sipariş motoru (Qt'den bağımsız) =====================
+_talep_sayaci = itertools.count(1)
+
+
+@dataclass
+class SiparisTalebi:
+    musteri_id: int; musteri_ad: str; musteri_tip: str
+    urun_id: int; urun_ad: str; adet: int; fiyat: float
+    kuyruga_giris: float = field(default_factory=lambda: time.time())
+    isleme_baslangic: Optional[float] = None  
+    talep_id: int = field(default_factory=lambda: next(_talep_sayaci))
+    son_tarih: Optional[float] = None           # bu andan sonra işlenmez (None: süresiz)
+    
+    @property
+    def temel(self) -> int:
+        return 20 if self.musteri_tip == "Premium" else 10
+
+    @property
+    def sabit_skor(self) -> float:
+        # skor = temel + 0.5·(şimdi - giriş); "şimdi" herkes için aynı olduğundan
+        # sıralama yalnızca temel - 0.5·giriş ile belirlenir ve zamanla değişmez.
+        return self.temel - 0.5 * self.kuyruga_giris
+
+    def skor(self, simdi: Optional[float] = None) -> float:
+        simdi = time.time() if simdi is None else simdi
+        bekleme = max(0.0, simdi - self.kuyruga_giris)
+        return self.temel + 0.5 * bekleme
+
+    def suresi_doldu(self, simdi: Optional[float] = None) -> bool:
+        simdi = time.time() if simdi is None else simdi
+        return self.son_tarih is not None and simdi >= self.son_tarih
+
+
+class OncelikKuyrugu:
+    """
+    Yaşlanan skorlu öncelik kuyruğu (max-heap).
+    push/pop O(log n), peek O(1), iptal O(log n) (tembel silme ile).
+    Son tarihi olan talepler ayrıca bir min-heap'te tutulur; süresi dolanlar
+    kuyruğun geri kalanını taramadan O(log n) ile çıkarılır.
+    Meşgul bir ürün / müşteri yüzünden alınamayan talepler o kaynağın park
+    heap'ine konur. Kaynak serbest kalınca park heap'i ana heap'e tek girdi
+    olarak döner; tepesi yine aynı kaynağa takılırsa heap bütünüyle O(1) ile
+    geri park edilir. Böylece seçim, sıcak bir ürünün binlerce talebi
+    beklerken de O(log n) kalır.
+    Thread-güvenli değildir; çağıran kendi kilidini tutar.
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []             # [-sabit_skor, sıra, talep | None]
+        self._kayit: Dict[int, list] = {}       # talep_id → heap girdisi
+        # engelleyen kaynak → park heap'i. Serbest bırakılan park heap'i ana heap'e
+        # [tepe anahtarı, tepe sırası, park heap'i] biçiminde tek girdi olarak döner.
+        self._park: Dict[tuple, List[list]] = {}
+        self._son_tarihler: List[tuple] = []    # (son_tarih, sıra, talep_id); tembel silme
+        self._sira = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._kayit)
+
+    def __bool__(self) -> bool:
+        return bool(self._kayit)
+
+    def __contains__(self, talep_id: int) -> bool:
+        return talep_id in self._kayit
+
+    def ekle(self, t: SiparisTalebi):
+        if t.talep_id in self._kayit:
+            raise ValueError(f"Talep zaten kuyrukta: {t.talep_id}")
+        girdi = [-t.sabit_skor, next(self._sira), t]
+        self._kayit[t.talep_id] = girdi
+        heapq.heappush(self._heap, girdi)
+        if t.son_tarih is not None:
+            heapq.heappush(self._son_tarihler, (t.son_tarih, girdi[1], t.talep_id))
+
+    def bak(self) -> Optional[SiparisTalebi]:
+        if not self._heap:
+            return None
+        x = self._heap[0][2]
+        return x[0][2] if isinstance(x, list) else x
+
+    def al(self) -> Optional[SiparisTalebi]:
+        return self.al_uygun(lambda t: None)
+
+    def al_uygun(self, engel) -> Optional[SiparisTalebi]:
+        """
+        engel(t) None dönen en yüksek öncelikli talebi çıkarır. engel(t) bir
+        kaynak anahtarı dönerse talep o anahtarın park heap'ine konur; kaynak
+        serbest_birak() ile açılınca aynı girdiyle (öncelik bozulmadan) geri döner.
+        """
+        bulunan = None
+        while self._heap:
+            girdi = heapq.heappop(self._heap)
+            x = girdi[2]
+            if x is None:
+                continue
+            if not isinstance(x, list):
+                anahtar = engel(x)
+                if anahtar is None:
+                    bulunan = x
+                    break
+                self._park_et(anahtar, [girdi])
+                continue
+            # Serbest bırakılmış park heap'i (girdi[3]: park edildiği kaynak)
+            self._olu_tepeyi_at(x)
+            if not x:
+                continue
+            if x[0][:2] != girdi[:2]:
+                # Tepe iptal / zaman aşımıyla değişmiş: güncel öncelikle yeniden sıraya gir
+                self._park_heapini_don(girdi[3], x)
+                continue
+            t = x[0][2]
+            anahtar = engel(t)
+            if anahtar == girdi[3]:
+                # Kaynak yeniden meşgul: heap bütünüyle geri park edilir
+                self._park_et(anahtar, x)
+                continue
+            ust = heapq.heappop(x)
+            self._park_heapini_don(girdi[3], x)
+            if anahtar is None:
+                bulunan = t
+                break
+            self._park_et(anahtar, [ust])
+        if bulunan is not None:
+            del self._kayit[bulunan.talep_id]
+        self._tepeyi_temizle()
+        return bulunan
+
+    def serbest_birak(self, anahtar: tuple):
+        """Kaynağı bekleyen park edilmiş talepleri yeniden seçilebilir yapar."""
+        park = self._park.pop(anahtar, None)
+        if park:
+            self._park_heapini_don(anahtar, park)
+
+    def _park_et(self, anahtar: tuple, park: List[list]):
+        mevcut = self._park.get(anahtar)
+        if not mevcut:
+            self._park[anahtar] = park
+            return
+        # Küçük heap büyüğüne katılır
+        if len(mevcut) < len(park):
+            mevcut, park = park, mevcut
+            self._park[anahtar] = mevcut
+        for g in park:
+            heapq.heappush(mevcut, g)
+
+    def _park_heapini_don(self, anahtar: tuple, park: List[list]):
+        self._olu_tepeyi_at(park)
+        if park:
+            heapq.heappush(self._heap, [park[0][0], park[0][1], park, anahtar])
+
+    @staticmethod
+    def _olu_tepeyi_at(park: List[list]):
+        while park and park[0][2] is None:
+            heapq.heappop(park)
+
+    def iptal(self, talep_id: int) -> Optional[SiparisTalebi]:
+        girdi = self._kayit.pop(talep_id, None)
+        if girdi is None:
+            return None
+        t, girdi[2] = girdi[2], None
+        self._tepeyi_temizle()
+        return t
+
+    def en_yakin_son_tarih(self) -> Optional[float]:
+        self._son_tarih_tepesini_temizle()
+        return self._son_tarihler[0][0] if self._son_tarihler else None
+
+    def suresi_dolanlari_al(self, simdi: float) -> List[SiparisTalebi]:
+        """Son tarihi simdi'ye kadar dolmuş talepleri (son tarih sırasıyla) çıkarır."""
+        dolan = []
+        self._son_tarih_tepesini_temizle()
+        while self._son_tarihler and self._son_tarihler[0][0] <= simdi:
+            _, _, talep_id = heapq.heappop(self._son_tarihler)
+            t = self.iptal(talep_id)
+            if t is not None:
+                dolan.append(t)
+            self._son_tarih_tepesini_temizle()
+        return dolan
+
+    def _canli_mi(self, son_tarih_girdisi: tuple) -> bool:
+        girdi = self._kayit.get(son_tarih_girdisi[2])
+        # Aynı talep çıkarılıp yeniden eklendiyse eski girdi ölüdür
+        return girdi is not None and girdi[1] == son_tarih_girdisi[1]
+
+    def _son_tarih_tepesini_temizle(self):
+        while self._son_tarihler and not self._canli_mi(self._son_tarihler[0]):
+            heapq.heappop(self._son_tarihler)
+
+    def _tepeyi_temizle(self):
+        # Tepede iptal edilmiş girdi bırakmayız → bak() her zaman O(1).
+        # Tepedeki park heap'inin de ölü tepesi atılır, boşalan heap çıkarılır.
+        while self._heap:
+            x = self._heap[0][2]
+            if x is None:
+                heapq.heappop(self._heap)
+                continue
+            if isinstance(x, list):
+                self._olu_tepeyi_at(x)
+                if not x:
+                    heapq.heappop(self._heap)
+                    continue
+                if x[0][:2] != self._heap[0][:2]:
+                    # Park heap'inin tepesi değişti: güncel öncelikle yeniden sıraya gir
+                    girdi = heapq.heappop(self._heap)
+                    self._park_heapini_don(girdi[3], x)
+                    continue
+            break
+        # Çok sayıda ölü girdi birikirse heap'leri sıkıştır
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._kayit):
+            self._heap = [g for g in self._heap if g[2] is not None]
+            heapq.heapify(self._heap)
+        if len(self._son_tarihler) > 64 and len(self._son_tarihler) > 2 * len(self._kayit):
+            self._son_tarihler = [g for g in self._son_tarihler if self._canli_mi(g)]
+            heapq.heapify(self._son_tarihler)
+
+    def kopya(self) -> List[SiparisTalebi]:
+        """Sırasız, O(n) kopya; sıralama kilit dışında yapılabilsin diye."""
+        return [g[2] for g in self._kayit.values()]
+
+
+class StokButceDefteri:
+    """
+    Kuyruktaki ve işlemdeki siparişlerin stok / bütçe ayırmaları.
+    Kullanılabilir miktar önbellekteki kesin değerden (KATALOG / MUSTERILER)
+    ayrılanların düşülmesiyle bulunur; karşılanamayan sipariş kuyruğa hiç
+    girmeden SiparisHatasi ile reddedilir. Ayırma sipariş tamamlanınca,
+    hata, zaman aşımı ya da iptalde bırakılır. Son kararı yine veritabanı verir.
+    """
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._stok: Dict[int, int] = {}             # ProductID → ayrılan adet
+        self._butce: Dict[int, float] = {}          # CustomerID → ayrılan tutar
+        self._ayirmalar: Dict[int, tuple] = {}      # talep_id → (urun_id, adet, musteri_id, tutar)
+        self._surum = 0                             # her tamamla()'da artar (önbellek değerleri değişti)
+
+    def __len__(self) -> int:
+        return len(self._ayirmalar)
+
+    def ayir(self, t: SiparisTalebi):
+        if t.adet <= 0:
+            raise SiparisHatasi(SiparisHatasi.GECERSIZ_ADET, "Geçersiz adet")
+        tutar = t.fiyat * t.adet
+        while True:
+            # Önbellek okumaları (soğuksa tablo yüklemesi) defter kilidi dışında yapılır.
+            # Arada bir sipariş tamamlandıysa okunan değerler bayattır: yeniden okunur.
+            surum = self._surum
+            u = KATALOG.idyle(t.urun_id)
+            if u is None:
+                raise SiparisHatasi(SiparisHatasi.URUN_YOK, f"Ürün bulunamadı: {t.urun_ad}")
+            m = MUSTERILER.getir(t.musteri_id)
+            if m is None:
+                raise SiparisHatasi(SiparisHatasi.MUSTERI_YOK, f"Müşteri bulunamadı: {t.musteri_ad}")
+            with self._kilit:
+                if surum == self._surum:
+                    self._ayir(t, u, m, tutar)
+                    return
+
+    def _ayir(self, t: SiparisTalebi, u: Dict, m: Dict, tutar: float):
+        # _kilit tutulurken çağrılır
+        if t.talep_id in self._ayirmalar:
+            raise ValueError(f"Talep zaten ayrılmış: {t.talep_id}")
+        kalan_stok = int(u["Stock"]) - self._stok.get(t.urun_id, 0)
+        if kalan_stok < t.adet:
+            raise SiparisHatasi(SiparisHatasi.STOK,
+                                f"Yetersiz stok: {t.urun_ad} (kullanılabilir {max(0, kalan_stok)}, istenen {t.adet})")
+        kalan_butce = float(m["Budget"] or 0) - self._butce.get(t.musteri_id, 0.0)
+        if kalan_butce < tutar:
+            raise SiparisHatasi(SiparisHatasi.BUTCE,
+                                f"Yetersiz bakiye: {t.musteri_ad} (kullanılabilir {max(0.0, kalan_butce):.2f}, "
+                                f"gereken {tutar:.2f})")
+        self._ayirmalar[t.talep_id] = (t.urun_id, t.adet, t.musteri_id, tutar)
+        self._stok[t.urun_id] = self._stok.get(t.urun_id, 0) + t.adet
+        self._butce[t.musteri_id] = self._butce.get(t.musteri_id, 0.0) + tutar
+
+    def _birak(self, talep_id: int):
+        # _kilit tutulurken çağrılır
+        a = self._ayirmalar.pop(talep_id, None)
+        if a is None:
+            return
+        urun_id, adet, musteri_id, tutar = a
+        if self._stok[urun_id] <= adet:
+            del self._stok[urun_id]
+        else:
+            self._stok[urun_id] -= adet
+        # Birikmiş kayan nokta artığı kalmasın: müşterinin son ayırması gidince kaydı sil
+        if self._butce[musteri_id] <= tutar + 1e-6:
+            del self._butce[musteri_id]
+        else:
+            self._butce[musteri_id] -= tutar
+
+    def birak(self, talep_id: int):
+        with self._kilit:
+            self._birak(talep_id)
+
+    def tamamla(self, talep_id: int, sonuc: SiparisSonucu) -> bool:
+        """
+        Ayırmayı bırakır ve kesin stok / müşteri değerlerini önbelleklere aynı
+        adımda yazar (arada sipariş iki kez düşülmüş görünmez). Premium terfisi
+        gerekiyorsa True döner.
+        """
+        with self._kilit:
+            self._birak(talep_id)
+            self._surum += 1
+            KATALOG.stok_ayarla(sonuc.urun_id, sonuc.stok)
+            return MUSTERILER.sonuc_uygula(sonuc)
+
+
+def talep_olustur(musteri: Dict, urun: Dict, adet: int) -> SiparisTalebi:
+    """Customers / Products satırlarından bir sipariş talebi kurar."""
+    return SiparisTalebi(
+        int(musteri["CustomerID"]), musteri["CustomerName"], musteri["CustomerType"],
+        int(urun["ProductID"]), urun["ProductName"], int(adet), float(urun["Price"])
+    )
+
+
+# Paralel sipariş işçisi sayısı; havuz boyutunu aşmamalı (her işçi bir bağlantı tutar)
+ISCI_SAYISI = 4
+# Bir işçinin tek transaction'da işleyeceği en fazla sipariş (1: partisiz)
+PARTI_BOYUTU = 8
+# Admin işleminin ürün kilidini en fazla bekleyeceği süre (sn)
+URUN_KILIDI_BEKLEME_S = 5.0
+
+
+class SiparisMotoru:
+    """
+    Kuyruk, skorlama, zaman aşımı, sipariş işleme ve Premium terfisini yürüten
+    saf Python motoru. Stok / bütçe ayırması kuyruğa eklerken yapılır; karşılanamayan
+    sipariş hemen reddedilir. Dış dünyaya olaylarla konuşur:
+
+      log(tip, mesaj)            islem_sonucu(tip, detay)
+      kuyruk_farki(fark)         isleniyor(bool)
+
+    Geri çağrılar işçi thread'lerinden çağrılır; hızlı olmalı ve motoru
+    kilitlememelidir (Qt tarafında sinyal yayınlamak yeterlidir).
+    """
+    OLAYLAR = ("log", "kuyruk_farki", "islem_sonucu", "isleniyor")
+
+    def __init__(self, timeout_s=15, isci_sayisi=ISCI_SAYISI, snapshot_hz=4.0, parti_boyutu=PARTI_BOYUTU,
+                 isleme_gecikmesi_s=0.0):
+        self._lock = threading.Lock()
+        # Boşta bekleyen işçiler yoklama yapmaz; kuyruğa ekleme, kilit bırakma
+        # ve durdurma bu koşulla onları uyandırır.
+        self._kosul = threading.Condition(self._lock)
+        self._kuyruk = OncelikKuyrugu()
+        self._defter = StokButceDefteri()
+        self._run = True
+        self.timeout_s = timeout_s
+        self.isci_sayisi = max(1, int(isci_sayisi))
+        self.parti_boyutu = max(1, int(parti_boyutu))
+        # Simülasyon için parti başına yapay işleme süresi (0: yok)
+        self.isleme_gecikmesi_s = max(0.0, float(isleme_gecikmesi_s))
+        # İşlemdeki siparişlerin ürün / müşteri kilitleri: yalnızca aynı ürüne
+        # veya aynı müşterinin bütçesine dokunan siparişler sıralanır.
+        self._mesgul_urunler: set = set()
+        self._mesgul_musteriler: set = set()
+        # Admin'in kilit beklediği ürünler (ürün → bekleyen sayısı): işçiler bunları almaz
+        self._admin_bekleyen: Dict[int, int] = {}
+        self._aktif_isci = 0
+        # Kuyruk görüntüsü en fazla snapshot_hz kez/sn, fark olarak yayınlanır
+        self.snapshot_araligi_s = 1.0 / snapshot_hz
+        self._snapshot_olayi = threading.Event()
+        self._aboneler: Dict[str, List[Callable]] = {o: [] for o in self.OLAYLAR}
+        self._threadler: List[threading.Thread] = []
+
+    # ---- olay arayüzü
+    def abone_ol(self, olay: str, fn: Callable):
+        if olay not in self._aboneler:
+            raise ValueError(f"Bilinmeyen olay: {olay}")
+        self._aboneler[olay].append(fn)
+
+    def abonelikten_cik(self, olay: str, fn: Callable):
+        try:
+            self._aboneler[olay].remove(fn)
+        except (KeyError, ValueError):
+            pass
+
+    def _yayinla(self, olay: str, *args):
+        for fn in list(self._aboneler[olay]):
+            try:
+                fn(*args)
+            except Exception:
+                # Bir abonenin hatası işçi thread'ini düşürmemeli
+                traceback.print_exc()
+
+    # ---- yaşam döngüsü
+    def baslat(self):
+        self._threadler = [threading.Thread(target=self._isci_dongusu, name=f"siparis-isci-{i + 1}", daemon=True)
+                           for i in range(self.isci_sayisi)]
+        self._threadler.append(threading.Thread(target=self._snapshot_dongusu, name="kuyruk-snapshot", daemon=True))
+        for th in self._threadler:
+            th.start()
+
+    def durdur(self):
+        with self._kosul:
+            self._run = False
+            self._kosul.notify_all()
+
+    def bekle(self, zaman_asimi_s: Optional[float] = None):
+        for th in self._threadler:
+            th.join(zaman_asimi_s)
+
+    # ---- kuyruk işlemleri
+    def kuyruga_ekle(self, t: SiparisTalebi):
+        """
+        Talebin stok ve bütçesini ayırıp kuyruğa ekler. Karşılanamıyorsa kuyruğa
+        girmez: "red" sonucu yayınlanır ve SiparisHatasi yükseltilir.
+        """
+        try:
+            self._defter.ayir(t)
+        except SiparisHatasi as e:
+            self._reddet(t, e)
+            raise
+        if t.son_tarih is None and self.timeout_s:
+            t.son_tarih = t.kuyruga_giris + self.timeout_s
+        with self._kosul:
+            self._kuyruk.ekle(t)
+            METRIKLER.gosterge("kuyruk_derinligi", len(self._kuyruk))
+            METRIKLER.gosterge("ayrilan_talep", len(self._defter))
+            # Koşul admin bekleyicisiyle paylaşılır: notify() yalnızca onu uyandırıp işçileri
+            # uyutabilirdi. İşçiler talebi alır ya da beklemeyi yeni son tarihe göre hesaplar.
+            self._kosul.notify_all()
+        METRIKLER.say("kuyruga_eklenen")
+        self._yayinla("log", "Bilgi", f"Kuyruğa eklendi → {t.musteri_ad}/{t.urun_ad} x{t.adet}")
+        log_yaz("Bilgi", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Kuyruğa eklendi")
+        self._snapshot_iste()
+
+    def iptal_et(self, talep_id: int) -> bool:
+        """Henüz işlenmemiş bir talebi kuyruktan çıkarır."""
+        with self._lock:
+            t = self._kuyruk.iptal(talep_id)
+        if t is None:
+            return False
+        self._defter.birak(t.talep_id)
+        self._yayinla("log", "Bilgi", f"İptal edildi → {t.musteri_ad}/{t.urun_ad} x{t.adet}")
+        log_yaz("Bilgi", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "İptal edildi")
+        self._snapshot_iste()
+        return True
+
+    def kuyruk_uzunlugu(self) -> int:
+        with self._lock:
+            return len(self._kuyruk)
+
+    @contextmanager
+    def urun_kilidi(self, urun_id: int, zaman_asimi_s: float = URUN_KILIDI_BEKLEME_S):
+        """
+        Admin işlemleri için: ürünü işlemdeki siparişlerle çakışmayacak şekilde
+        kilitler. Bekleme süresince işçiler bu ürünün yeni siparişlerini almaz;
+        yalnızca işlemdeki parti beklenir. Süre dolarsa TimeoutError yükselir.
+        """
+        with self._kosul:
+            self._admin_bekleyen[urun_id] = self._admin_bekleyen.get(urun_id, 0) + 1
+            try:
+                alindi = self._kosul.wait_for(lambda: urun_id not in self._mesgul_urunler, zaman_asimi_s)
+                if alindi:
+                    self._mesgul_urunler.add(urun_id)
+            finally:
+                n = self._admin_bekleyen.pop(urun_id) - 1
+                if n:
+                    self._admin_bekleyen[urun_id] = n
+                elif urun_id not in self._mesgul_urunler:
+                    # Vazgeçildi: bekleme yüzünden park edilen siparişler yeniden alınabilir
+                    self._kuyruk.serbest_birak(("urun", urun_id))
+                    self._kosul.notify_all()
+            if not alindi:
+                raise TimeoutError(f"Ürün işlenen siparişlerle meşgul; {zaman_asimi_s:g} sn içinde kilitlenemedi")
+        try:
+            yield
+        finally:
+            with self._kosul:
+                self._urunu_serbest_birak(urun_id)
+                self._kosul.notify_all()
+
+    def _engel(self, t: SiparisTalebi) -> Optional[tuple]:
+        # Talebi bekleten kaynak: talep bu anahtarın altına park edilir
+        if t.urun_id in self._mesgul_urunler or t.urun_id in self._admin_bekleyen:
+            return ("urun", t.urun_id)
+        if t.musteri_id in self._mesgul_musteriler:
+            return ("musteri", t.musteri_id)
+        return None
+
+    def _urunu_serbest_birak(self, urun_id: int):
+        # _lock tutulurken çağrılır; admin bekliyorsa park edilenler onda kalır
+        self._mesgul_urunler.discard(urun_id)
+        if urun_id not in self._admin_bekleyen:
+            self._kuyruk.serbest_birak(("urun", urun_id))
+
+    def _musteriyi_serbest_birak(self, musteri_id: int):
+        # _lock tutulurken çağrılır
+        self._mesgul_musteriler.discard(musteri_id)
+        self._kuyruk.serbest_birak(("musteri", musteri_id))
+
+    def _sec(self) -> List[SiparisTalebi]:
+        """
+        _lock tutulurken çağrılır. En yüksek öncelikli, birbiriyle ve işlemdeki
+        siparişlerle çakışmayan en fazla parti_boyutu talebi sırayla çıkarır.
+        """
+        parti: List[SiparisTalebi] = []
+        while len(parti) < self.parti_boyutu:
+            t = self._kuyruk.al_uygun(self._engel)
+            if t is None:
+                break
+            self._mesgul_urunler.add(t.urun_id)
+            self._mesgul_musteriler.add(t.musteri_id)
+            parti.append(t)
+        if parti:
+            self._aktif_isci += 1
+            METRIKLER.gosterge("kuyruk_derinligi", len(self._kuyruk))
+            METRIKLER.gosterge("aktif_isci", self._aktif_isci)
+        return parti
+
+    def _geri_koy(self, parti: List[SiparisTalebi]):
+        # _lock tutulurken çağrılır: durdurulurken alınmış ama işlenmemiş talepler
+        for t in parti:
+            self._urunu_serbest_birak(t.urun_id)
+            self._musteriyi_serbest_birak(t.musteri_id)
+            self._kuyruk.ekle(t)
+        if parti:
+            self._aktif_isci -= 1
+
+    def _birak(self, parti: List[SiparisTalebi]):
+        with self._kosul:
+            for t in parti:
+                self._urunu_serbest_birak(t.urun_id)
+                self._musteriyi_serbest_birak(t.musteri_id)
+            self._aktif_isci -= 1
+            # Bu ürün/müşteri yüzünden park edilen talepler artık alınabilir
+            self._kosul.notify_all()
+            bitti = self._aktif_isci == 0
+            METRIKLER.gosterge("aktif_isci", self._aktif_isci)
+        if bitti:
+            self._yayinla("isleniyor", False)
+
+    # ---- kuyruk görüntüsü
+    def _snapshot_iste(self):
+        self._snapshot_olayi.set()
+
+    @staticmethod
+    def _snapshot_satiri(t: SiparisTalebi, simdi: float) -> Dict:
+        return {
+            "id": t.talep_id, "anahtar": t.sabit_skor,
+            "musteri": t.musteri_ad, "tip": t.musteri_tip,
+            "urun": t.urun_ad, "adet": t.adet,
+            "bekleme": int(simdi - t.kuyruga_giris),
+            "skor": round(t.skor(simdi), 1)
+        }
+
+    def _snapshot_dongusu(self):
+        onceki: Dict[int, tuple] = {}     # talep_id → (sabit_skor, bekleme, skor) son yayında
+        while self._run:
+            if not self._snapshot_olayi.wait(0.5):
+                continue
+            self._snapshot_olayi.clear()
+            with self._lock:
+                talepler = self._kuyruk.kopya()
+            onceki = self._fark_yayinla(talepler, onceki)
+            # Hız sınırı: bu arada gelen istekler bir sonraki yayında birleşir
+            time.sleep(self.snapshot_araligi_s)
+
+    def _fark_yayinla(self, talepler: List[SiparisTalebi], onceki: Dict[int, tuple]) -> Dict[int, tuple]:
+        simdi = time.time()
+        simdiki: Dict[int, tuple] = {}
+        eklenen, guncel = [], []
+        for t in talepler:
+            bek, skor = int(simdi - t.kuyruga_giris), round(t.skor(simdi), 1)
+            simdiki[t.talep_id] = (t.sabit_skor, bek, skor)
+            eski = onceki.get(t.talep_id)
+            if eski is None:
+                eklenen.append(self._snapshot_satiri(t, simdi))
+            elif eski[1:] != (bek, skor):
+                guncel.append({"id": t.talep_id, "anahtar": t.sabit_skor, "bekleme": bek, "skor": skor})
+        silinen = [{"id": tid, "anahtar": d[0]} for tid, d in onceki.items() if tid not in simdiki]
+        if eklenen or silinen or guncel:
+            self._yayinla("kuyruk_farki", {"eklenen": eklenen, "silinen": silinen, "guncel": guncel})
+        return simdiki
+
+    # ---- işleme
+    def _isci_dongusu(self):
+        while True:
+            dolan: List[SiparisTalebi] = []
+            with self._kosul:
+                dolan += self._kuyruk.suresi_dolanlari_al(time.time())
+                parti = self._sec()
+                while not parti and self._run and not dolan:
+                    # En yakın son tarihe kadar uyur; o an geldiğinde süresi dolanları çıkarır
+                    son = self._kuyruk.en_yakin_son_tarih()
+                    self._kosul.wait(None if son is None else max(0.0, son - time.time()))
+                    dolan += self._kuyruk.suresi_dolanlari_al(time.time())
+                    parti = self._sec()
+                if dolan:
+                    METRIKLER.gosterge("kuyruk_derinligi", len(self._kuyruk))
+                if not self._run:
+                    self._geri_koy(parti)
+                    parti = []
+                ilk = bool(parti) and self._aktif_isci == 1
+            if dolan:
+                self._suresi_dolanlari_bildir(dolan)
+            if not parti:
+                if not self._run:
+                    return
+                continue
+            if ilk:
+                self._yayinla("isleniyor", True)
+            try:
+                self._isle(parti)
+            finally:
+                self._birak(parti)
+                self._snapshot_iste()
+
+    def _isle(self, parti: List[SiparisTalebi]):
+        baslangic = time.time()
+        for t in parti:
+            t.isleme_baslangic = baslangic
+            METRIKLER.sure_ekle("kuyruk_bekleme", baslangic - t.kuyruga_giris)
+            self._yayinla("log", "Bilgi", f"İşleniyor: {t.musteri_ad} → {t.urun_ad} x{t.adet}")
+            log_yaz("Bilgi", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "İşleme alındı")
+
+        if self.isleme_gecikmesi_s:
+            with METRIKLER.olc("isleme_gecikmesi"):
+                time.sleep(self.isleme_gecikmesi_s)
+
+        # Yapay gecikme sırasında süresi dolanlar veritabanına gitmez
+        simdi = time.time()
+        gecerli = [t for t in parti if not t.suresi_doldu(simdi)]
+        if len(gecerli) < len(parti):
+            self._suresi_dolanlari_bildir([t for t in parti if t.suresi_doldu(simdi)])
+        if not gecerli:
+            return
+
+        # Tek sipariş doğrudan, birden fazlası tek transaction + SAVEPOINT ile işlenir
+        try:
+            with METRIKLER.olc("siparis_db"):
+                if len(gecerli) == 1:
+                    t = gecerli[0]
+                    sonuclar = [siparis_ver_ve_tamamla(t.musteri_id, t.urun_id, t.adet)]
+                else:
+                    sonuclar = siparisleri_toplu_tamamla([(t.musteri_id, t.urun_id, t.adet) for t in gecerli])
+        except Exception as e:
+            sonuclar = [e] * len(gecerli)
+        METRIKLER.say("parti")
+        METRIKLER.say("parti_siparis", len(gecerli))
+
+        for t, sonuc in zip(gecerli, sonuclar):
+            try:
+                if isinstance(sonuc, Exception):
+                    raise sonuc
+                self._basarili(t, sonuc)
+            except Exception as e:
+                self._hatali(t, e)
+
+    def _suresi_dolanlari_bildir(self, dolan: List[SiparisTalebi]):
+        """Süresi dolan talepleri tek log satırında özetler; her biri için sonuç olayı yayınlar."""
+        METRIKLER.say("zaman_asimi", len(dolan))
+        if len(dolan) == 1:
+            t = dolan[0]
+            self._yayinla("log", "Hata", f"Zaman aşımı: {t.musteri_ad} / {t.urun_ad}")
+        else:
+            self._yayinla("log", "Hata", f"Zaman aşımı: {len(dolan)} sipariş kuyruktan çıkarıldı")
+        for t in dolan:
+            self._defter.birak(t.talep_id)
+            log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Zaman aşımı")
+            self._yayinla("islem_sonucu", "timeout",
+                          {"mesaj": f"Zaman aşımı: {t.musteri_ad} / {t.urun_ad}", **self._zamanlama(t)})
+        self._snapshot_iste()
+
+    def _basarili(self, t: SiparisTalebi, sonuc: SiparisSonucu):
+        oid = sonuc.order_id
+        terfi = self._defter.tamamla(t.talep_id, sonuc)
+        METRIKLER.say("siparis_tamamlanan")
+        METRIKLER.sure_ekle("uctan_uca", time.time() - t.kuyruga_giris)
+
+        ok_msg = f"Tamamlandı: {t.musteri_ad} → {t.urun_ad} x{t.adet}"
+        self._yayinla("log", "Bilgi", ok_msg)
+        log_yaz("Bilgi", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, ok_msg, order_id=oid)
+        # Değişen ürün ve müşteri sonuçla birlikte gelir; arayüz yalnızca onları tazeler
+        self._yayinla("islem_sonucu", "basari", {"mesaj": ok_msg, "order_id": oid,
+                                                  "urun_id": t.urun_id, "stok": sonuc.stok,
+                                                  "musteri_id": t.musteri_id,
+                                                  **self._zamanlama(t)})
+
+        with METRIKLER.olc("premium_kontrol"):
+            if terfi:
+                premium_yap(t.musteri_id)
+                self._yayinla("log", "Bilgi", f"{t.musteri_ad} artık Premium müşteri oldu! 🎉")
+                log_yaz("Bilgi", t.musteri_id, sonuc.musteri_tip, None, None, "Premium'a yükseltildi")
+
+    def _hatali(self, t: SiparisTalebi, e: Exception):
+        self._defter.birak(t.talep_id)
+        err = str(e)
+        kod = e.kod if isinstance(e, SiparisHatasi) else "veritabani"
+        self._yayinla("log", "Hata", err)
+        if kod == SiparisHatasi.STOK:
+            METRIKLER.say("stok_hatasi")
+            log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Yetersiz stok")
+            # Ayırma geçtiği halde veritabanı reddetti: önbellekteki stok bayat
+            KATALOG.urun_yenile(t.urun_id)
+        elif kod == SiparisHatasi.BUTCE:
+            METRIKLER.say("butce_hatasi")
+            log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Yetersiz bakiye")
+            MUSTERILER.yenile(t.musteri_id)
+        elif isinstance(e, SiparisHatasi):
+            METRIKLER.say("siparis_hatasi")
+            log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, err)
+        else:
+            METRIKLER.say("db_hatasi")
+            log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, "Veritabanı hatası: " + err)
+        self._yayinla("islem_sonucu", "hata", {"mesaj": err, "kod": kod, **self._zamanlama(t)})
+
+    def _reddet(self, t: SiparisTalebi, e: SiparisHatasi):
+        """Ayırması yapılamayan talep: kuyruğa ve veritabanı işine hiç girmez."""
+        METRIKLER.say("erken_red")
+        METRIKLER.say(f"red_{e.kod}")
+        log_yaz("Hata", t.musteri_id, t.musteri_tip, t.urun_ad, t.adet, f"Reddedildi: {e}")
+        self._yayinla("islem_sonucu", "red", {"mesaj": str(e), "kod": e.kod, **self._zamanlama(t)})
+
+    @staticmethod
+    def _zamanlama(t: SiparisTalebi) -> Dict:
+        """Sonuç olaylarına eklenen ölçüm alanları (kuyruk bekleme ve uçtan uca süre)."""
+        simdi = time.time()
+        return {
+            "talep_id": t.talep_id,
+            # İşlenmeden süresi dolan talebin beklemesi çıkarıldığı ana kadardır
+            "kuyruk_bekleme_s": (t.isleme_baslangic or simdi) - t.kuyruga_giris,
+            "sure_s": simdi - t.kuyruga_giris,
+        }
+
+
+# ===================== Komut satırı (başsız çalıştırma) =====================
+def rastgele_talep(musteriler: List[Dict], urunler: List[Dict]) -> SiparisTalebi:
+    """Simülasyon için rastgele müşteri / ürün / adet seçer."""
+    return talep_olustur(random.choice(musteriler), random.choice(urunler), random.randint(1, 3))
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Sipariş motorunu arayüz olmadan çalıştırır.")
+    p.add_argument("--isci", type=int, default=ISCI_SAYISI, help="paralel işçi sayısı")
+    p.add_argument("--parti", type=int, default=PARTI_BOYUTU,
+                   help="bir transaction'da işlenecek en fazla sipariş (1: partisiz)")
+    p.add_argument("--timeout", type=float, default=15, help="sipariş zaman aşımı (sn)")
+    p.add_argument("--gecikme", type=float, default=0, help="parti başına yapay işleme süresi (sn)")
+    p.add_argument("--sure", type=float, default=0, help="bu kadar saniye sonra dur (0: Ctrl+C'ye kadar)")
+    p.add_argument("--simulasyon", type=float, default=0, metavar="ARALIK_S",
+                   help="her ARALIK_S saniyede bir rastgele sipariş üret (0: kapalı)")
+    p.add_argument("--sessiz", action="store_true", help="sipariş loglarını yazdırma")
+    p.add_argument("--depo", help="mysql, sqlite (bellek içi) ya da sqlite:dosya.db")
+    args = p.parse_args(argv)
+
+    if args.depo:
+        depo_sec(args.depo)
+
+    motor = SiparisMotoru(timeout_s=args.timeout, isci_sayisi=args.isci, parti_boyutu=args.parti,
+                         isleme_gecikmesi_s=args.gecikme)
+    if not args.sessiz:
+        motor.abone_ol("log", lambda tip, msg: print(f"({tip}) {msg}", flush=True))
+    sayac = {"basari": 0, "hata": 0, "timeout": 0, "red": 0}
+    motor.abone_ol("islem_sonucu", lambda tip, detay: sayac.__setitem__(tip, sayac.get(tip, 0) + 1))
+    motor.baslat()
+
+    musteriler = musteri_listesi() if args.simulasyon else []
+    urunler = KATALOG.tum() if args.simulasyon else []
+    bitis = time.monotonic() + args.sure if args.sure else None
+    uret = bool(args.simulasyon and musteriler and urunler)
+    sonraki = time.monotonic()
+    try:
+        while bitis is None or time.monotonic() < bitis:
+            simdi = time.monotonic()
+            # Geride kalınan tüm aralıklar için üretilir: hız döngü adımıyla sınırlanmaz
+            while uret and simdi >= sonraki and (bitis is None or sonraki < bitis):
+                try:
+                    motor.kuyruga_ekle(rastgele_talep(musteriler, urunler))
+                except SiparisHatasi as e:
+                    if not args.sessiz:
+                        print(f"(Hata) Reddedildi: {e}", flush=True)
+                sonraki += args.simulasyon
+            bekle = sonraki - time.monotonic() if uret else 0.05
+            if bitis is not None:
+                bekle = min(bekle, bitis - time.monotonic())
+            time.sleep(max(0.0, min(bekle, 0.05)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        motor.durdur()
+        motor.bekle()
+        kaynaklari_kapat()
+    print(f"Bitti → başarılı: {sayac['basari']}, hata: {sayac['hata']}, zaman aşımı: {sayac['timeout']}, "
+          f"reddedilen: {sayac['red']}, kuyrukta kalan: {motor.kuyruk_uzunlugu()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+import os, sys
+
+import pytest
+
+# Testler bellek içi SQLite deposuyla çalışır; modüller depo adını içe aktarılırken okur
+os.environ.setdefault("SIPARIS_DEPO", "sqlite")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def depo():
+    """Her test için örnek verili yeni bir bellek içi SQLite deposu; önbellekler sıfırlanır."""
+    from depo_sqlite import SQLiteDepo
+    from veritabani import depo_sec
+    d = SQLiteDepo(":memory:", ornek_urun=20, ornek_musteri=10)
+    depo_sec(d)
+    yield d
+    d.kapat()
@@ -0,0 +1,129 @@
+import random
+
+from siparis_motoru import OncelikKuyrugu, SiparisTalebi
+
+
+def talep(urun_id=1, musteri_id=1, giris=0.0, tip="Standard", son_tarih=None):
+    return SiparisTalebi(musteri_id, "m", tip, urun_id, "u", 1, 1.0,
+                         kuyruga_giris=giris, son_tarih=son_tarih)
+
+
+def engel_fn(mesgul_urunler, mesgul_musteriler=()):
+    def engel(t):
+        if t.urun_id in mesgul_urunler:
+            return ("urun", t.urun_id)
+        if t.musteri_id in mesgul_musteriler:
+            return ("musteri", t.musteri_id)
+        return None
+    return engel
+
+
+def test_skor_ve_yaslanma_sirasi():
+    q = OncelikKuyrugu()
+    eski, yeni, premium = talep(giris=0.0), talep(giris=10.0), talep(giris=10.0, tip="Premium")
+    for t in (yeni, eski, premium):
+        q.ekle(t)
+    # Premium +10 temel puanla 10 sn önce gelen standart talebi geçer (20 - 5 > 10 - 0)
+    assert [q.al(), q.al(), q.al()] == [premium, eski, yeni]
+    assert q.al() is None and len(q) == 0
+
+
+def test_iptal_tepeden_ve_ortadan():
+    q = OncelikKuyrugu()
+    a, b, c = talep(giris=0), talep(giris=1), talep(giris=2)
+    for t in (a, b, c):
+        q.ekle(t)
+    assert q.iptal(a.talep_id) is a
+    assert q.bak() is b
+    assert q.iptal(c.talep_id) is c
+    assert q.iptal(c.talep_id) is None
+    assert len(q) == 1 and q.al() is b
+
+
+def test_park_edilen_serbest_birakilinca_onceligiyle_doner():
+    q = OncelikKuyrugu()
+    a1, a2, b = talep(urun_id=1, giris=0), talep(urun_id=1, giris=1), talep(urun_id=2, giris=2)
+    for t in (a1, a2, b):
+        q.ekle(t)
+    mesgul = set()
+    assert q.al_uygun(engel_fn(mesgul)) is a1
+    mesgul.add(1)
+    # a2 park edilir, b alınır
+    assert q.al_uygun(engel_fn(mesgul)) is b
+    assert q.al_uygun(engel_fn(mesgul)) is None and len(q) == 1
+    mesgul.discard(1)
+    q.serbest_birak(("urun", 1))
+    assert q.bak() is a2
+    assert q.al_uygun(engel_fn(mesgul)) is a2
+
+
+def test_serbest_birakma_sonrasi_iptal_bak_bos_donmez():
+    q = OncelikKuyrugu()
+    a, b, c = talep(urun_id=1, giris=1), talep(urun_id=1, giris=0), talep(urun_id=2, giris=5)
+    q.ekle(a); q.ekle(b)
+    mesgul = {1}
+    assert q.al() is b
+    assert q.al_uygun(engel_fn(mesgul)) is None       # a, b'nin arkasında park edilir
+    q.ekle(c)
+    q.serbest_birak(("urun", 1))
+    q.iptal(a.talep_id)
+    assert len(q) == 1
+    assert q.bak() is c
+
+
+def test_serbest_birakilan_park_heapinde_sure_dolumu():
+    q = OncelikKuyrugu()
+    a = talep(urun_id=1, giris=0, son_tarih=10.0)
+    a2 = talep(urun_id=1, giris=1, son_tarih=100.0)
+    c = talep(urun_id=2, giris=5)
+    q.ekle(a); q.ekle(a2)
+    assert q.al_uygun(engel_fn({1})) is None
+    q.ekle(c)
+    q.serbest_birak(("urun", 1))
+    assert q.suresi_dolanlari_al(50.0) == [a]
+    assert len(q) == 2
+    assert q.bak() is a2
+    assert q.al() is a2 and q.al() is c and q.bak() is None
+
+
+def test_rastgele_islemler_kaba_kuvvetle_ayni_secimi_yapar():
+    rnd = random.Random(7)
+    for _ in range(200):
+        q = OncelikKuyrugu()
+        canli, alinan = {}, []
+        mesgul_u, mesgul_m = set(), set()
+        engel = engel_fn(mesgul_u, mesgul_m)
+        simdi = 0.0
+        for _ in range(300):
+            r = rnd.random()
+            simdi += 0.1
+            if r < 0.4:
+                t = talep(rnd.randint(1, 3), rnd.randint(1, 4), rnd.uniform(0, 100),
+                          "Premium" if rnd.random() < 0.3 else "Standard",
+                          simdi + rnd.uniform(0, 10) if rnd.random() < 0.5 else None)
+                q.ekle(t)
+                canli[t.talep_id] = t
+            elif r < 0.47 and canli:
+                tid = rnd.choice(list(canli))
+                assert q.iptal(tid) is canli.pop(tid)
+            elif r < 0.52:
+                for t in q.suresi_dolanlari_al(simdi):
+                    assert t.son_tarih <= simdi
+                    del canli[t.talep_id]
+            elif r < 0.77:
+                # Eşit skorda ekleme sırası (sıra numarası) belirleyicidir
+                uygun = [t for t in canli.values() if engel(t) is None]
+                beklenen = max(uygun, key=lambda t: (t.sabit_skor, -q._kayit[t.talep_id][1]), default=None)
+                t = q.al_uygun(engel)
+                assert t is beklenen
+                if t is not None:
+                    del canli[t.talep_id]
+                    mesgul_u.add(t.urun_id); mesgul_m.add(t.musteri_id)
+                    alinan.append(t)
+            elif alinan:
+                t = alinan.pop(rnd.randrange(len(alinan)))
+                mesgul_u.discard(t.urun_id); q.serbest_birak(("urun", t.urun_id))
+                mesgul_m.discard(t.musteri_id); q.serbest_birak(("musteri", t.musteri_id))
+            assert len(q) == len(canli)
+            tepe = q.bak()
+            assert tepe is None or tepe.talep_id in canli
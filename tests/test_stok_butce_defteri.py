@@ -0,0 +1,87 @@
+import random
+import time
+
+import pytest
+
+from depo import SiparisHatasi
+from siparis_motoru import SiparisMotoru, talep_olustur
+from veritabani import KATALOG, MUSTERILER, urun_ekle, urun_bilgi_adla
+
+
+def dusuk_stoklu_urun(stok=5, fiyat=10.0):
+    urun_ekle("Az Stoklu", stok, fiyat, "Test")
+    return urun_bilgi_adla("Az Stoklu")
+
+
+def bitene_kadar_bekle(motor, zaman_asimi_s=20.0):
+    son = time.monotonic() + zaman_asimi_s
+    while motor.kuyruk_uzunlugu() or len(motor._defter):
+        assert time.monotonic() < son, "motor kuyruğu zamanında boşaltmadı"
+        time.sleep(0.01)
+
+
+def test_ayirma_kuyruktakileri_de_sayar(depo):
+    motor = SiparisMotoru()         # işçi başlatılmaz: talepler kuyrukta kalır
+    u = dusuk_stoklu_urun(stok=5)
+    m = MUSTERILER.getir(1)
+    motor.kuyruga_ekle(talep_olustur(m, u, 3))
+    with pytest.raises(SiparisHatasi) as e:
+        motor.kuyruga_ekle(talep_olustur(m, u, 3))
+    assert e.value.kod == SiparisHatasi.STOK
+    motor.kuyruga_ekle(talep_olustur(m, u, 2))
+    assert motor.kuyruk_uzunlugu() == 2 and len(motor._defter) == 2
+
+
+def test_butce_ve_gecersiz_adet_reddi(depo):
+    motor = SiparisMotoru()
+    m = MUSTERILER.getir(1)
+    u = dusuk_stoklu_urun(stok=1000, fiyat=m["Budget"] / 2 + 1)
+    motor.kuyruga_ekle(talep_olustur(m, u, 1))
+    with pytest.raises(SiparisHatasi) as e:
+        motor.kuyruga_ekle(talep_olustur(m, u, 1))
+    assert e.value.kod == SiparisHatasi.BUTCE
+    with pytest.raises(SiparisHatasi) as e:
+        motor.kuyruga_ekle(talep_olustur(m, u, 0))
+    assert e.value.kod == SiparisHatasi.GECERSIZ_ADET
+    assert len(motor._defter) == 1
+
+
+def test_iptal_ayirmayi_birakir(depo):
+    motor = SiparisMotoru()
+    u = dusuk_stoklu_urun(stok=5)
+    m = MUSTERILER.getir(1)
+    t = talep_olustur(m, u, 5)
+    motor.kuyruga_ekle(t)
+    assert motor.iptal_et(t.talep_id)
+    assert not motor.iptal_et(t.talep_id)
+    assert motor.kuyruk_uzunlugu() == 0 and len(motor._defter) == 0
+    # Bırakılan stok yeniden ayrılabilir
+    motor.kuyruga_ekle(talep_olustur(m, u, 5))
+
+
+def test_calisma_sonunda_defter_bos_ve_onbellekler_veritabaniyla_ayni(depo):
+    rnd = random.Random(7)
+    dusuk_stoklu_urun(stok=15)
+    motor = SiparisMotoru(isci_sayisi=4, parti_boyutu=4)
+    sonuclar = {}
+    motor.abone_ol("islem_sonucu", lambda tip, d: sonuclar.__setitem__(tip, sonuclar.get(tip, 0) + 1))
+    motor.baslat()
+    try:
+        musteriler, urunler = MUSTERILER.tum(), KATALOG.tum()
+        for _ in range(400):
+            try:
+                motor.kuyruga_ekle(talep_olustur(rnd.choice(musteriler), rnd.choice(urunler), rnd.randint(1, 4)))
+            except SiparisHatasi:
+                pass
+        bitene_kadar_bekle(motor)
+    finally:
+        motor.durdur()
+        motor.bekle(5)
+    assert sonuclar.get("basari", 0) > 0
+    assert sonuclar.get("hata", 0) == 0 and sonuclar.get("timeout", 0) == 0
+    assert len(motor._defter) == 0
+    assert {int(u["ProductID"]): u["Stock"] for u in KATALOG.tum()} == \
+           {int(u["ProductID"]): u["Stock"] for u in depo.urunler()}
+    alanlar = ("Budget", "TotalSpent", "CustomerType")
+    assert {int(m["CustomerID"]): tuple(m[a] for a in alanlar) for m in MUSTERILER.tum()} == \
+           {int(m["CustomerID"]): tuple(m[a] for a in alanlar) for m in depo.musteri_listesi()}
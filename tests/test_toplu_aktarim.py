@@ -0,0 +1,62 @@
+import pytest
+
+from toplu_aktarim import satir_dogrula, urunleri_ice_aktar, urunleri_disa_aktar
+from veritabani import KATALOG, urun_bilgi_adla
+
+
+def satir(ad="Kalem", stok="10", fiyat="2.5", kategori="Kırtasiye"):
+    return {"ProductName": ad, "Stock": stok, "Price": fiyat, "Category": kategori}
+
+
+def test_gecerli_satir_temizlenir():
+    assert satir_dogrula(satir(ad="  Kalem ", fiyat="2,5", kategori=" Kırtasiye")) == \
+           ("Kalem", 10, 2.5, "Kırtasiye")
+
+
+@pytest.mark.parametrize("alanlar", [
+    {"ad": "  "}, {"kategori": ""}, {"stok": "on"}, {"stok": "1.5"}, {"stok": "-1"},
+    {"fiyat": ""}, {"fiyat": "-0.1"}, {"fiyat": "nan"}, {"fiyat": "inf"}, {"fiyat": "-inf"},
+])
+def test_gecersiz_satir_reddedilir(alanlar):
+    with pytest.raises(ValueError):
+        satir_dogrula(satir(**alanlar))
+
+
+def test_ice_aktarma_ada_gore_gunceller_ve_ekler(depo, tmp_path):
+    mevcut = KATALOG.tum()[0]
+    yol = tmp_path / "urunler.csv"
+    yol.write_text(
+        "ProductName,Stock,Price,Category\n"
+        f"{mevcut['ProductName']},7,1.25,Yeni\n"
+        "Silgi,3,0.5,Kırtasiye\n"
+        "Bozuk,x,1,Kırtasiye\n"
+        "Silgi,4,0.75,Kırtasiye\n",
+        encoding="utf-8")
+    n = depo.urun_sayisi()
+    rapor = urunleri_ice_aktar(str(yol), parti_boyutu=2)
+    assert (rapor["okunan"], rapor["hatali"]) == (4, 1)
+    assert rapor["hatalar"][0][0] == 4
+    # Aynı ad iki partiye düştü: ilk partide eklenir, ikincide güncellenir
+    assert (rapor["eklenen"], rapor["guncellenen"]) == (1, 2)
+    assert depo.urun_sayisi() == n + 1
+    # Katalog geçersiz kılındı: okumalar veritabanındaki yeni değerleri görür
+    g = urun_bilgi_adla(mevcut["ProductName"])
+    assert (g["ProductID"], g["Stock"], g["Price"], g["Category"]) == (mevcut["ProductID"], 7, 1.25, "Yeni")
+    s = urun_bilgi_adla("Silgi")
+    assert (s["Stock"], s["Price"]) == (4, 0.75)
+
+
+def test_eksik_baslik_hata_verir(depo, tmp_path):
+    yol = tmp_path / "urunler.csv"
+    yol.write_text("ProductName,Stock,Price\nKalem,1,1\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        urunleri_ice_aktar(str(yol))
+
+
+def test_disa_ve_geri_ice_aktarma_degistirmez(depo, tmp_path):
+    yol = tmp_path / "urunler.csv"
+    assert urunleri_disa_aktar(str(yol), parti_boyutu=7) == depo.urun_sayisi()
+    once = depo.urunler()
+    rapor = urunleri_ice_aktar(str(yol))
+    assert (rapor["eklenen"], rapor["guncellenen"], rapor["hatali"]) == (0, len(once), 0)
+    assert depo.urunler() == once
@@ -0,0 +1,156 @@
+"""
+Ürün kataloğu için toplu CSV içe / dışa aktarma.
+
+İçe aktarma dosyayı satır satır okur, her satırı doğrular ve partiler halinde
+tek transaction'lık çok satırlı yazımlarla (ada göre upsert) depoya gönderir;
+bellekte hiçbir zaman bir partiden fazlası tutulmaz. Dışa aktarma Products'ı
+ID'ye göre sayfa sayfa (keyset) okuyup doğrudan dosyaya yazar.
+
+    python toplu_aktarim.py ice urunler.csv --depo sqlite:deneme.db
+    python toplu_aktarim.py disa urunler.csv
+"""
+import os, sys, csv, math, time, argparse
+from typing import List, Dict, Tuple, Optional, Callable, Iterator
+
+from veritabani import KATALOG, aktif_depo, depo_sec, kaynaklari_kapat
+from metrikler import METRIKLER
+
+
+CSV_ALANLARI = ("ProductName", "Stock", "Price", "Category")
+PARTI_BOYUTU = 2000
+HATA_LIMITI = 100          # raporda örnek olarak tutulan en fazla hatalı satır
+
+# ilerleme(oran 0..1, işlenen satır)
+Ilerleme = Callable[[float, int], None]
+
+
+def satir_dogrula(satir: Dict[str, str]) -> Tuple[str, int, float, str]:
+    """Admin formundaki kurallar: ad ve kategori boş olamaz, stok/fiyat negatif olamaz."""
+    ad = (satir.get("ProductName") or "").strip()
+    if not ad:
+        raise ValueError("Ürün adı boş")
+    try:
+        stok = int((satir.get("Stock") or "").strip())
+    except ValueError:
+        raise ValueError(f"Geçersiz stok: {satir.get('Stock')!r}")
+    try:
+        fiyat = float((satir.get("Price") or "").strip().replace(",", "."))
+    except ValueError:
+        raise ValueError(f"Geçersiz fiyat: {satir.get('Price')!r}")
+    if not math.isfinite(fiyat):
+        raise ValueError(f"Geçersiz fiyat: {satir.get('Price')!r}")
+    if stok < 0 or fiyat < 0:
+        raise ValueError("Stok ve fiyat negatif olamaz")
+    kategori = (satir.get("Category") or "").strip()
+    if not kategori:
+        raise ValueError("Kategori boş")
+    return ad, stok, fiyat, kategori
+
+
+def _sayarak_oku(f, okunan: List[int]) -> Iterator[str]:
+    # csv.reader'a satırları verirken okunan karakteri sayar (ilerleme oranı için)
+    for satir in f:
+        okunan[0] += len(satir)
+        yield satir
+
+
+def urunleri_ice_aktar(yol: str, parti_boyutu: int = PARTI_BOYUTU,
+                       ilerleme: Optional[Ilerleme] = None) -> Dict:
+    """
+    CSV'yi (başlık: ProductName, Stock, Price, Category) akış halinde aktarır.
+    Hatalı satırlar atlanır ve raporlanır; bitince katalog bir kez geçersiz kılınır.
+    """
+    depo = aktif_depo()
+    boyut = max(1, os.path.getsize(yol))
+    rapor = {"okunan": 0, "eklenen": 0, "guncellenen": 0, "hatali": 0, "hatalar": [], "sure_s": 0.0}
+    bas = time.perf_counter()
+    okunan = [0]
+    parti: List[Tuple[str, int, float, str]] = []
+
+    def yaz():
+        with METRIKLER.olc("toplu_aktarim_parti"):
+            eklenen, guncellenen = depo.urunleri_toplu_yaz(parti)
+        rapor["eklenen"] += eklenen
+        rapor["guncellenen"] += guncellenen
+        parti.clear()
+        if ilerleme:
+            ilerleme(min(1.0, okunan[0] / boyut), rapor["okunan"])
+
+    try:
+        with open(yol, newline="", encoding="utf-8-sig") as f:
+            okuyucu = csv.DictReader(_sayarak_oku(f, okunan))
+            eksik = [a for a in CSV_ALANLARI if a not in (okuyucu.fieldnames or ())]
+            if eksik:
+                raise ValueError(f"CSV başlığında eksik sütun: {', '.join(eksik)}")
+            for satir in okuyucu:
+                rapor["okunan"] += 1
+                try:
+                    parti.append(satir_dogrula(satir))
+                except ValueError as e:
+                    rapor["hatali"] += 1
+                    if len(rapor["hatalar"]) < HATA_LIMITI:
+                        rapor["hatalar"].append((okuyucu.line_num, str(e)))
+                    continue
+                if len(parti) >= parti_boyutu:
+                    yaz()
+            if parti:
+                yaz()
+    finally:
+        # Kısmen aktarılmış partiler de yazılmış olabilir: katalog her durumda tazelenir
+        KATALOG.gecersiz_kil()
+    rapor["sure_s"] = round(time.perf_counter() - bas, 3)
+    if ilerleme:
+        ilerleme(1.0, rapor["okunan"])
+    return rapor
+
+
+def urunleri_disa_aktar(yol: str, parti_boyutu: int = 5000,
+                        ilerleme: Optional[Ilerleme] = None) -> int:
+    """Products'ı ID sırasında sayfa sayfa okuyup CSV'ye yazar; yazılan satır sayısını döner."""
+    depo = aktif_depo()
+    toplam = max(1, depo.urun_sayisi())
+    yazilan, ilk_id = 0, 0
+    with open(yol, "w", newline="", encoding="utf-8") as f:
+        yazici = csv.writer(f)
+        yazici.writerow(CSV_ALANLARI)
+        while True:
+            sayfa = depo.urun_sayfasi(ilk_id, parti_boyutu)
+            yazici.writerows([u[a] for a in CSV_ALANLARI] for u in sayfa)
+            yazilan += len(sayfa)
+            if ilerleme:
+                ilerleme(min(1.0, yazilan / toplam), yazilan)
+            if len(sayfa) < parti_boyutu:
+                break
+            ilk_id = int(sayfa[-1]["ProductID"]) + 1
+    return yazilan
+
+
+# ===================== Komut satırı =====================
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Ürünleri CSV'den içe ya da CSV'ye dışa aktarır.")
+    p.add_argument("yon", choices=("ice", "disa"))
+    p.add_argument("dosya")
+    p.add_argument("--parti", type=int, default=PARTI_BOYUTU, help="transaction başına satır")
+    p.add_argument("--depo", help="mysql, sqlite (bellek içi) ya da sqlite:dosya.db")
+    args = p.parse_args(argv)
+
+    if args.depo:
+        depo_sec(args.depo)
+    try:
+        if args.yon == "ice":
+            rapor = urunleri_ice_aktar(args.dosya, args.parti)
+            print(f"Okunan: {rapor['okunan']}, eklenen: {rapor['eklenen']}, güncellenen: {rapor['guncellenen']}, "
+                  f"hatalı: {rapor['hatali']} ({rapor['sure_s']} sn)")
+            for satir_no, hata in rapor["hatalar"][:10]:
+                print(f"  satır {satir_no}: {hata}")
+        else:
+            bas = time.perf_counter()
+            n = urunleri_disa_aktar(args.dosya, args.parti)
+            print(f"Yazılan: {n} ürün ({time.perf_counter() - bas:.3f} sn)")
+    finally:
+        kaynaklari_kapat()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
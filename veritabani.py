@@ -0,0 +1,499 @@
+import os, time, bisect, threading, queue, random
+from typing import List, Dict, Optional, Tuple, Union
+
+from depo import Depo, SiparisSonucu
+from metrikler import METRIKLER
+
+
+# ===================== Depo seçimi =====================
+# "mysql" (varsayılan), "sqlite" (bellek içi) ya da "sqlite:dosya.db".
+# Başlangıçta depo_sec() ile ya da SIPARIS_DEPO ortam değişkeniyle seçilir.
+VARSAYILAN_DEPO = os.environ.get("SIPARIS_DEPO", "mysql")
+
+_depo: Optional[Depo] = None
+_depo_kilit = threading.Lock()
+
+
+def depo_olustur(tanim: str) -> Depo:
+    tur, _, yol = tanim.partition(":")
+    if tur == "mysql":
+        from depo_mysql import MySQLDepo
+        return MySQLDepo()
+    if tur == "sqlite":
+        from depo_sqlite import SQLiteDepo
+        return SQLiteDepo(yol or ":memory:")
+    raise ValueError(f"Bilinmeyen depo: {tanim!r} (mysql, sqlite, sqlite:dosya.db)")
+
+
+def depo_sec(depo) -> Depo:
+    """Aktif depoyu ayarlar (tanım metni ya da Depo nesnesi); önbellekler sıfırlanır."""
+    global _depo
+    yeni = depo_olustur(depo) if isinstance(depo, str) else depo
+    with _depo_kilit:
+        _depo = yeni
+    KATALOG.gecersiz_kil()
+    MUSTERILER.gecersiz_kil()
+    return yeni
+
+
+def aktif_depo() -> Depo:
+    global _depo
+    if _depo is None:
+        with _depo_kilit:
+            if _depo is None:
+                _depo = depo_olustur(VARSAYILAN_DEPO)
+    return _depo
+
+
+# ===================== DB yardımcıları =====================
+def musteri_listesi() -> List[Dict]:
+    return MUSTERILER.tum()
+
+def musteri_getir(mid: int) -> Optional[Dict]:
+    return MUSTERILER.getir(mid)
+
+def _musterileri_db() -> List[Dict]:
+    return aktif_depo().musteri_listesi()
+
+def _musteri_db_getir(mid: int) -> Optional[Dict]:
+    return aktif_depo().musteri_getir(mid)
+
+def _urunleri_db() -> List[Dict]:
+    return aktif_depo().urunler()
+
+def _urun_db_idyle(pid: int) -> Optional[Dict]:
+    return aktif_depo().urun_idyle(pid)
+
+
+class UrunKatalogu:
+    """
+    Products tablosunun paylaşılan bellek içi kopyası.
+    ProductID'ye göre tutulur; ProductName indeksi, ad önekiyle arama için
+    sıralı ad listesi ve kategori kovaları vardır.
+    İlk erişimde tek sorguyla yüklenir, sonra ekle/stok/sil işlemleriyle yamalanır.
+    """
+
+    def __init__(self, yukleyici=_urunleri_db):
+        self._yukleyici = yukleyici
+        self._kilit = threading.RLock()
+        self._urunler: Dict[int, Dict] = {}             # ProductID → satır (ID sırasında)
+        self._ad_indeksi: Dict[str, int] = {}           # ProductName → ProductID
+        self._kategoriler: Dict[str, Dict[int, None]] = {}  # Category → sıralı ID kümesi
+        self._ad_sirali: List[Tuple[str, int]] = []     # (küçük harf ad, ProductID) sıralı
+        self._yuklendi = False
+
+    def _hazirla(self):
+        # _kilit tutulurken çağrılır
+        if self._yuklendi:
+            return
+        self._urunler.clear(); self._ad_indeksi.clear(); self._kategoriler.clear()
+        for u in self._yukleyici():
+            self._indeksle(dict(u), sirali=False)
+        # Sıralı liste toplu yüklemede tek seferde kurulur (tek tek insort O(n²) olurdu)
+        self._ad_sirali = sorted((u["ProductName"].casefold(), pid) for pid, u in self._urunler.items())
+        self._yuklendi = True
+
+    def _indeksle(self, u: Dict, sirali: bool = True):
+        pid = int(u["ProductID"])
+        self._urunler[pid] = u
+        self._ad_indeksi.setdefault(u["ProductName"], pid)
+        self._kategoriler.setdefault(u.get("Category"), {})[pid] = None
+        if sirali:
+            bisect.insort(self._ad_sirali, (u["ProductName"].casefold(), pid))
+
+    def _indeksten_cikar(self, u: Dict):
+        pid = int(u["ProductID"])
+        self._urunler.pop(pid, None)
+        anahtar = (u["ProductName"].casefold(), pid)
+        i = bisect.bisect_left(self._ad_sirali, anahtar)
+        if i < len(self._ad_sirali) and self._ad_sirali[i] == anahtar:
+            del self._ad_sirali[i]
+        kova = self._kategoriler.get(u.get("Category"))
+        if kova is not None:
+            kova.pop(pid, None)
+            if not kova:
+                del self._kategoriler[u.get("Category")]
+        if self._ad_indeksi.get(u["ProductName"]) == pid:
+            del self._ad_indeksi[u["ProductName"]]
+            # Aynı adlı başka ürün varsa (nadir) indeksi ona devret
+            for diger in self._urunler.values():
+                if diger["ProductName"] == u["ProductName"]:
+                    self._ad_indeksi[u["ProductName"]] = int(diger["ProductID"])
+                    break
+
+    @property
+    def yuklu(self) -> bool:
+        """Okumalar veritabanına gitmeden bellekten yapılabilir mi (kilit almaz)."""
+        return self._yuklendi
+
+    def yukle(self):
+        with self._kilit:
+            self._hazirla()
+
+    def tum(self) -> List[Dict]:
+        with self._kilit:
+            self._hazirla()
+            return [dict(u) for u in self._urunler.values()]
+
+    def idyle(self, pid: int) -> Optional[Dict]:
+        with self._kilit:
+            self._hazirla()
+            u = self._urunler.get(int(pid))
+            return dict(u) if u else None
+
+    def adla(self, ad: str) -> Optional[Dict]:
+        with self._kilit:
+            self._hazirla()
+            pid = self._ad_indeksi.get(ad)
+            return dict(self._urunler[pid]) if pid is not None else None
+
+    def kategori(self, kategori: str) -> List[Dict]:
+        with self._kilit:
+            self._hazirla()
+            return [dict(self._urunler[pid]) for pid in self._kategoriler.get(kategori, ())]
+
+    def ara(self, onek: str, limit: int = 50) -> List[Dict]:
+        """
+        Adı önekle başlayan ürünler (büyük/küçük harf duyarsız, ada göre sıralı).
+        Önek bir sayıysa o ID'li ürün listenin başına eklenir.
+        """
+        onek = onek.strip()
+        anahtar = onek.casefold()
+        with self._kilit:
+            self._hazirla()
+            sonuc: List[Dict] = []
+            if onek.isdigit() and int(onek) in self._urunler:
+                sonuc.append(dict(self._urunler[int(onek)]))
+            i = bisect.bisect_left(self._ad_sirali, (anahtar,))
+            while len(sonuc) < limit and i < len(self._ad_sirali):
+                ad, pid = self._ad_sirali[i]
+                if not ad.startswith(anahtar):
+                    break
+                if not sonuc or int(sonuc[0]["ProductID"]) != pid:
+                    sonuc.append(dict(self._urunler[pid]))
+                i += 1
+            return sonuc
+
+    def kategori_listesi(self) -> Dict[str, List[str]]:
+        """{kategori: [ürün adları]} — kategoriler alfabetik sırada."""
+        with self._kilit:
+            self._hazirla()
+            return {k: [self._urunler[pid]["ProductName"] for pid in kova]
+                    for k, kova in sorted(self._kategoriler.items(), key=lambda x: (x[0] is None, x[0] or ""))}
+
+    def ekle(self, u: Dict):
+        with self._kilit:
+            if self._yuklendi:
+                self._indeksle(dict(u))
+
+    def stok_ayarla(self, pid: int, stok: int):
+        with self._kilit:
+            u = self._urunler.get(int(pid))
+            if u is not None:
+                u["Stock"] = stok
+
+    def sil(self, pid: int):
+        with self._kilit:
+            u = self._urunler.get(int(pid))
+            if u is not None:
+                self._indeksten_cikar(u)
+
+    def urun_yenile(self, pid: int):
+        """Tek bir ürünü veritabanından tazeler (sipariş tamamlanınca)."""
+        u = _urun_db_idyle(pid)
+        with self._kilit:
+            if not self._yuklendi:
+                return
+            eski = self._urunler.get(int(pid))
+            if u is None:
+                if eski is not None:
+                    self._indeksten_cikar(eski)
+            elif eski is not None and eski["ProductName"] == u["ProductName"] \
+                    and eski.get("Category") == u.get("Category"):
+                eski.update(u)
+            else:
+                if eski is not None:
+                    self._indeksten_cikar(eski)
+                self._indeksle(dict(u))
+
+    def gecersiz_kil(self):
+        with self._kilit:
+            self._yuklendi = False
+
+
+KATALOG = UrunKatalogu()
+
+
+def urunleri_getir() -> List[Dict]:
+    return KATALOG.tum()
+
+
+def urun_bilgi_adla(urun_ad: str) -> Optional[Dict]:
+    return KATALOG.adla(urun_ad)
+
+def urun_ara(onek: str, limit: int = 50) -> List[Dict]:
+    """Admin seçicileri için ad önekiyle (ya da ID ile) ürün arama; katalog önbelleğinden."""
+    return KATALOG.ara(onek, limit)
+
+def urun_bilgi_idyle(pid: int) -> Optional[Dict]:
+    return KATALOG.idyle(pid)
+
+def dusuk_stoklu_urunler(limit: int = 10) -> List[Dict]:
+    """Stok grafiği için en düşük stoklu ürünler (sıralama ve LIMIT veritabanında)."""
+    return aktif_depo().dusuk_stoklu_urunler(limit)
+
+def urun_ekle(product_name: str, stock: int, price: float, category: str):
+    pid = aktif_depo().urun_ekle(product_name, stock, price, category)
+    KATALOG.ekle({"ProductID": pid, "ProductName": product_name,
+                  "Stock": stock, "Price": price, "Category": category})
+
+
+def urun_stok_guncelle(product_id: int, new_stock: int):
+    aktif_depo().urun_stok_guncelle(product_id, new_stock)
+    KATALOG.stok_ayarla(product_id, new_stock)
+
+def urun_sil(product_id: int):
+    aktif_depo().urun_sil(product_id)
+    KATALOG.sil(product_id)
+
+# Bu toplam harcamaya ulaşan Standard müşteri Premium'a yükseltilir
+PREMIUM_ESIGI = 2000
+
+
+class MusteriOnbellegi:
+    """
+    Customers tablosunun (Budget, TotalSpent, CustomerType) write-through kopyası.
+    Sipariş sonuçları (SiparisSonucu) ve Premium terfisi önce veritabanına
+    yazılır, ardından buraya uygulanır; okumalar ve terfi kararı bellekten yapılır.
+    """
+
+    def __init__(self, yukleyici=_musterileri_db, tek_yukleyici=_musteri_db_getir):
+        self._yukleyici = yukleyici
+        self._tek_yukleyici = tek_yukleyici
+        self._kilit = threading.RLock()
+        self._musteriler: Dict[int, Dict] = {}          # CustomerID → satır (ID sırasında)
+        self._yuklendi = False
+
+    def _hazirla(self):
+        # _kilit tutulurken çağrılır
+        if self._yuklendi:
+            return
+        self._musteriler = {int(m["CustomerID"]): dict(m) for m in self._yukleyici()}
+        self._yuklendi = True
+
+    @property
+    def yuklu(self) -> bool:
+        """Okumalar veritabanına gitmeden bellekten yapılabilir mi (kilit almaz)."""
+        return self._yuklendi
+
+    def yukle(self):
+        with self._kilit:
+            self._hazirla()
+
+    def tum(self) -> List[Dict]:
+        with self._kilit:
+            self._hazirla()
+            return [dict(m) for m in self._musteriler.values()]
+
+    def getir(self, mid: int) -> Optional[Dict]:
+        with self._kilit:
+            self._hazirla()
+            m = self._musteriler.get(int(mid))
+            if m is None:
+                # Başka bir yoldan eklenmiş olabilir: tek satırı getirip ekle
+                m = self._tek_yukleyici(int(mid))
+                if m is None:
+                    return None
+                m = self._musteriler[int(mid)] = dict(m)
+            return dict(m)
+
+    def sonuc_uygula(self, sonuc: SiparisSonucu) -> bool:
+        """
+        Tamamlanan siparişin güncel müşteri değerlerini yazar. Müşteri eşiği
+        geçtiyse ve henüz Premium değilse True döner (terfi kararı bellekten).
+        """
+        with self._kilit:
+            m = self._musteriler.get(sonuc.musteri_id)
+            if m is not None:
+                m["Budget"] = sonuc.butce
+                m["TotalSpent"] = sonuc.toplam_harcama
+                m["CustomerType"] = sonuc.musteri_tip
+        return sonuc.toplam_harcama >= PREMIUM_ESIGI and sonuc.musteri_tip != "Premium"
+
+    def premium_ayarla(self, mid: int, toplam_harcama: Optional[float] = None):
+        with self._kilit:
+            m = self._musteriler.get(int(mid))
+            if m is not None:
+                m["CustomerType"] = "Premium"
+                if toplam_harcama is not None:
+                    m["TotalSpent"] = toplam_harcama
+
+    def yenile(self, mid: int):
+        """Tek müşteriyi veritabanından tazeler (önbellek bayat çıktığında)."""
+        m = self._tek_yukleyici(int(mid))
+        with self._kilit:
+            if m is None:
+                self._musteriler.pop(int(mid), None)
+            elif self._yuklendi or int(mid) in self._musteriler:
+                self._musteriler[int(mid)] = dict(m)
+
+    def gecersiz_kil(self):
+        with self._kilit:
+            self._yuklendi = False
+            self._musteriler = {}
+
+
+MUSTERILER = MusteriOnbellegi()
+
+
+def siparis_ver_ve_tamamla(musteri_id: int, urun_id: int, adet: int) -> SiparisSonucu:
+    """Siparişi tek transaction içinde oluşturup tamamlar; kesin OrderID ve güncel değerleri döner."""
+    return aktif_depo().siparis_ver_ve_tamamla(musteri_id, urun_id, adet)
+
+def siparisleri_toplu_tamamla(kalemler: List[Tuple[int, int, int]]) -> List[Union[SiparisSonucu, Exception]]:
+    """(musteri_id, urun_id, adet) kalemlerini tek transaction'da işler; kalem başına sonuç ya da hata."""
+    return aktif_depo().siparisleri_toplu_tamamla(kalemler)
+
+def premium_yap(musteri_id: int):
+    aktif_depo().musteri_premium_ayarla(musteri_id)
+    MUSTERILER.premium_ayarla(musteri_id)
+
+def musteri_paneli(ilk_id: int = 0, limit: int = 200) -> List[Dict]:
+    """Müşteri paneli için bir sayfa: müşteri + en uzun bekleme / en yüksek skor (tek sorgu)."""
+    return aktif_depo().musteri_paneli(ilk_id, limit)
+
+class LogYazici:
+    """
+    Logs tablosu için arka planda toplu yazan (write-behind) log havuzu.
+    Kayıtlar sınırlı bir kuyrukta biriktirilir; parti boyutu dolunca ya da
+    bekleme süresi geçince tek bir toplu INSERT ile yazılır.
+    Kuyruk doluysa kayıt düşürülür (sıcak yol asla bloklanmaz).
+    """
+
+    def __init__(self, kapasite: int = 10000, parti_boyutu: int = 200, aralik_s: float = 0.5):
+        self._kuyruk: "queue.Queue[tuple]" = queue.Queue(maxsize=kapasite)
+        self.parti_boyutu = parti_boyutu
+        self.aralik_s = aralik_s
+        self._thread: Optional[threading.Thread] = None
+        self._baslat_kilit = threading.Lock()
+        self._dur = threading.Event()
+        self._sayac_kilit = threading.Lock()
+        self.sayaclar = {"alinan": 0, "yazilan": 0, "dusurulen": 0, "hatali": 0, "parti": 0}
+
+    def yaz(self, kayit: tuple):
+        self._baslat()
+        try:
+            self._kuyruk.put_nowait(kayit)
+        except queue.Full:
+            self._say("dusurulen")
+            return
+        self._say("alinan")
+
+    def _say(self, anahtar: str, n: int = 1):
+        with self._sayac_kilit:
+            self.sayaclar[anahtar] += n
+
+    def _baslat(self):
+        if self._thread is not None:
+            return
+        with self._baslat_kilit:
+            if self._thread is None and not self._dur.is_set():
+                self._thread = threading.Thread(target=self._dongu, name="log-yazici", daemon=True)
+                self._thread.start()
+
+    def _dongu(self):
+        while not self._dur.is_set():
+            parti = self._parti_topla()
+            if parti:
+                self._yaz_db(parti)
+        # Kapanışta kalanları boşalt
+        while True:
+            parti = []
+            try:
+                while len(parti) < self.parti_boyutu:
+                    parti.append(self._kuyruk.get_nowait())
+            except queue.Empty:
+                pass
+            if not parti:
+                break
+            self._yaz_db(parti)
+
+    def _parti_topla(self) -> List[tuple]:
+        try:
+            parti = [self._kuyruk.get(timeout=self.aralik_s)]
+        except queue.Empty:
+            return []
+        son = time.monotonic() + self.aralik_s
+        while len(parti) < self.parti_boyutu:
+            kalan = son - time.monotonic()
+            if kalan <= 0 or self._dur.is_set():
+                break
+            try:
+                parti.append(self._kuyruk.get(timeout=kalan))
+            except queue.Empty:
+                break
+        return parti
+
+    def _yaz_db(self, parti: List[tuple]):
+        try:
+            with METRIKLER.olc("log_db_parti"):
+                aktif_depo().loglari_yaz(parti)
+            self._say("yazilan", len(parti))
+            self._say("parti")
+        except Exception:
+            # Logs tablosu yoksa projeyi kırmamak için yutuyoruz.
+            self._say("hatali", len(parti))
+
+    def kapat(self, zaman_asimi_s: float = 5.0):
+        """Kuyruktaki kayıtları yazar ve arka plan thread'ini durdurur."""
+        self._dur.set()
+        th = self._thread
+        if th is not None:
+            th.join(zaman_asimi_s)
+
+    def istatistik(self) -> Dict:
+        with self._sayac_kilit:
+            d = dict(self.sayaclar)
+        d["bekleyen"] = self._kuyruk.qsize()
+        return d
+
+
+LOG_YAZICI = LogYazici()
+
+
+def log_yaz(log_type: str, customer_id: Optional[int], customer_type: Optional[str],
+            product_name: Optional[str], qty: Optional[int], result_text: str,
+            order_id: Optional[int] = None):
+    """
+    Logs tablosu (varsa) için bir yardımcı; kaydı arka plan yazıcısına bırakır.
+    Schema: LogType, CustomerID, CustomerType, ProductName, Qty, ResultText, OrderID, LogDate (DEFAULT).
+    """
+    with METRIKLER.olc("log_yaz"):
+        LOG_YAZICI.yaz((log_type, customer_id, customer_type, product_name, qty, result_text, order_id))
+
+def ensure_initial_customers():
+    """
+    Veritabanında yeterli müşteri yoksa tek seferlik başlangıç verisi ekler.
+    Koşul: Başlangıçta atanan Premium müşterilerin TotalSpent (ToplamHarcama) >= 2000 olmalı.
+    """
+    depo = aktif_depo()
+    if depo.musteri_sayisi() >= 5:
+        return
+
+    hedef_adet = random.randint(5, 10)
+    musteri_adlari = [f"Müşteri {chr(65+i)}" for i in range(hedef_adet)]
+    eklenen_idler = [depo.musteri_ekle(ad, random.randint(500, 3000)) for ad in musteri_adlari]
+
+    premium_adet = min(2, len(eklenen_idler))
+    premium_idler = random.sample(eklenen_idler, k=premium_adet)
+
+    for cid in premium_idler:
+        depo.musteri_premium_ayarla(cid, random.randint(2000, 5000))
+    MUSTERILER.gecersiz_kil()
+
+
+def kaynaklari_kapat():
+    """Bekleyen logları yazar ve depoyu (bağlantı havuzunu) kapatır (uygulama çıkışında)."""
+    LOG_YAZICI.kapat()
+    if _depo is not None:
+        _depo.kapat()